@@ -0,0 +1,293 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Shared by several tables, so created once up front rather than per table
+bet_type = postgresql.ENUM('POPULARITY', 'PRICE', 'AVAILABILITY', name='bettype', create_type=False)
+bet_outcome = postgresql.ENUM('PENDING', 'WON', 'LOST', name='betoutcome', create_type=False)
+trade_type = postgresql.ENUM('BUY', 'SELL', name='tradetype', create_type=False)
+order_type = postgresql.ENUM('MARKET', 'LIMIT', 'STOP', name='ordertype', create_type=False)
+order_status = postgresql.ENUM('PENDING', 'EXECUTED', 'CANCELLED', name='orderstatus', create_type=False)
+ENUMS = (bet_type, bet_outcome, trade_type, order_type, order_status)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum in ENUMS:
+        enum.create(bind, checkfirst=True)
+
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=320), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('weedcoins_balance', sa.Float(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('is_admin', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+
+    op.create_table('strains',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('slug', sa.String(length=255), nullable=False),
+        sa.Column('current_price', sa.Float(), nullable=False),
+        sa.Column('base_price', sa.Float(), nullable=False),
+        sa.Column('popularity_score', sa.Float(), nullable=False),
+        sa.Column('volatility_score', sa.Float(), nullable=False),
+        sa.Column('favorite_count', sa.Integer(), nullable=False),
+        sa.Column('pharmacy_count', sa.Integer(), nullable=False),
+        sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_strains_id'), 'strains', ['id'], unique=False)
+    op.create_index(op.f('ix_strains_name'), 'strains', ['name'], unique=True)
+    op.create_index(op.f('ix_strains_slug'), 'strains', ['slug'], unique=True)
+
+    op.create_table('achievements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('badge_icon', sa.String(length=255), nullable=True),
+        sa.Column('criteria_type', sa.String(length=50), nullable=False),
+        sa.Column('criteria_value', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_achievements_id'), 'achievements', ['id'], unique=False)
+
+    op.create_table('price_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('strain_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['strain_id'], ['strains.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_history_id'), 'price_history', ['id'], unique=False)
+    op.create_index(op.f('ix_price_history_strain_id'), 'price_history', ['strain_id'], unique=False)
+    op.create_index(op.f('ix_price_history_timestamp'), 'price_history', ['timestamp'], unique=False)
+
+    op.create_table('market_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('strain_id', sa.Integer(), nullable=True),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('impact', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['strain_id'], ['strains.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_market_events_id'), 'market_events', ['id'], unique=False)
+    op.create_index(op.f('ix_market_events_strain_id'), 'market_events', ['strain_id'], unique=False)
+    op.create_index(op.f('ix_market_events_created_at'), 'market_events', ['created_at'], unique=False)
+
+    op.create_table('portfolios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('strain_id', sa.Integer(), nullable=False),
+        sa.Column('shares_owned', sa.Float(), nullable=False),
+        sa.Column('avg_buy_price', sa.Float(), nullable=False),
+        sa.Column('total_invested', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['strain_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'strain_id', name='_user_strain_uc')
+    )
+    op.create_index(op.f('ix_portfolios_id'), 'portfolios', ['id'], unique=False)
+    op.create_index(op.f('ix_portfolios_user_id'), 'portfolios', ['user_id'], unique=False)
+    op.create_index(op.f('ix_portfolios_strain_id'), 'portfolios', ['strain_id'], unique=False)
+
+    op.create_table('trades',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('strain_id', sa.Integer(), nullable=False),
+        sa.Column('type', trade_type, nullable=False),
+        sa.Column('shares', sa.Float(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('total_cost', sa.Float(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['strain_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trades_id'), 'trades', ['id'], unique=False)
+    op.create_index(op.f('ix_trades_user_id'), 'trades', ['user_id'], unique=False)
+    op.create_index(op.f('ix_trades_strain_id'), 'trades', ['strain_id'], unique=False)
+    op.create_index(op.f('ix_trades_timestamp'), 'trades', ['timestamp'], unique=False)
+
+    op.create_table('trade_orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('strain_id', sa.Integer(), nullable=False),
+        sa.Column('order_type', order_type, nullable=False),
+        sa.Column('trade_type', trade_type, nullable=False),
+        sa.Column('shares', sa.Float(), nullable=False),
+        sa.Column('target_price', sa.Float(), nullable=True),
+        sa.Column('status', order_status, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('executed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['strain_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trade_orders_id'), 'trade_orders', ['id'], unique=False)
+    op.create_index(op.f('ix_trade_orders_user_id'), 'trade_orders', ['user_id'], unique=False)
+    op.create_index(op.f('ix_trade_orders_strain_id'), 'trade_orders', ['strain_id'], unique=False)
+    op.create_index(op.f('ix_trade_orders_created_at'), 'trade_orders', ['created_at'], unique=False)
+
+    op.create_table('futures_bets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('bet_type', bet_type, nullable=False),
+        sa.Column('target_strain_id', sa.Integer(), nullable=False),
+        sa.Column('prediction', sa.Text(), nullable=False),
+        sa.Column('stake', sa.Float(), nullable=False),
+        sa.Column('odds', sa.Float(), nullable=False),
+        sa.Column('potential_payout', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('settled', sa.Boolean(), nullable=False),
+        sa.Column('outcome', bet_outcome, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['target_strain_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_futures_bets_id'), 'futures_bets', ['id'], unique=False)
+    op.create_index(op.f('ix_futures_bets_user_id'), 'futures_bets', ['user_id'], unique=False)
+    op.create_index(op.f('ix_futures_bets_target_strain_id'), 'futures_bets', ['target_strain_id'], unique=False)
+    op.create_index(op.f('ix_futures_bets_expires_at'), 'futures_bets', ['expires_at'], unique=False)
+    op.create_index('ix_futures_bets_user_id_created_at', 'futures_bets', ['user_id', 'created_at'], unique=False)
+
+    op.create_table('head_to_head_bets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('strain_a_id', sa.Integer(), nullable=False),
+        sa.Column('strain_b_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=50), nullable=False),
+        sa.Column('prediction', sa.String(length=50), nullable=False),
+        sa.Column('stake', sa.Float(), nullable=False),
+        sa.Column('odds', sa.Float(), nullable=False),
+        sa.Column('potential_payout', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('settled', sa.Boolean(), nullable=False),
+        sa.Column('outcome', bet_outcome, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['strain_a_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['strain_b_id'], ['strains.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_head_to_head_bets_id'), 'head_to_head_bets', ['id'], unique=False)
+    op.create_index(op.f('ix_head_to_head_bets_user_id'), 'head_to_head_bets', ['user_id'], unique=False)
+    op.create_index(op.f('ix_head_to_head_bets_expires_at'), 'head_to_head_bets', ['expires_at'], unique=False)
+    op.create_index('ix_head_to_head_bets_user_id_created_at', 'head_to_head_bets', ['user_id', 'created_at'], unique=False)
+
+    op.create_table('prop_bets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('bet_description', sa.Text(), nullable=False),
+        sa.Column('bet_type', sa.String(length=50), nullable=False),
+        sa.Column('stake', sa.Float(), nullable=False),
+        sa.Column('odds', sa.Float(), nullable=False),
+        sa.Column('potential_payout', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('settled', sa.Boolean(), nullable=False),
+        sa.Column('outcome', bet_outcome, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_prop_bets_id'), 'prop_bets', ['id'], unique=False)
+    op.create_index(op.f('ix_prop_bets_user_id'), 'prop_bets', ['user_id'], unique=False)
+    op.create_index(op.f('ix_prop_bets_expires_at'), 'prop_bets', ['expires_at'], unique=False)
+    op.create_index('ix_prop_bets_user_id_created_at', 'prop_bets', ['user_id', 'created_at'], unique=False)
+
+    op.create_table('user_achievements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('achievement_id', sa.Integer(), nullable=False),
+        sa.Column('unlocked_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['achievement_id'], ['achievements.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'achievement_id', name='_user_achievement_uc')
+    )
+    op.create_index(op.f('ix_user_achievements_id'), 'user_achievements', ['id'], unique=False)
+    op.create_index(op.f('ix_user_achievements_user_id'), 'user_achievements', ['user_id'], unique=False)
+    op.create_index(op.f('ix_user_achievements_achievement_id'), 'user_achievements', ['achievement_id'], unique=False)
+
+    op.create_table('achievement_progress',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('trades_count', sa.Integer(), nullable=False),
+        sa.Column('profit_streak', sa.Integer(), nullable=False),
+        sa.Column('best_profit_streak', sa.Integer(), nullable=False),
+        sa.Column('futures_wins', sa.Integer(), nullable=False),
+        sa.Column('best_won_odds', sa.Float(), nullable=False),
+        sa.Column('peak_balance', sa.Float(), nullable=False),
+        sa.Column('max_trade_value', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.create_table('leaderboards',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('weekly_profit', sa.Float(), nullable=False),
+        sa.Column('all_time_profit', sa.Float(), nullable=False),
+        sa.Column('prediction_accuracy', sa.Float(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=True),
+        sa.Column('period', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_leaderboards_id'), 'leaderboards', ['id'], unique=False)
+    op.create_index(op.f('ix_leaderboards_user_id'), 'leaderboards', ['user_id'], unique=False)
+    op.create_index(op.f('ix_leaderboards_period'), 'leaderboards', ['period'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('leaderboards')
+    op.drop_table('achievement_progress')
+    op.drop_table('user_achievements')
+    op.drop_table('prop_bets')
+    op.drop_table('head_to_head_bets')
+    op.drop_table('futures_bets')
+    op.drop_table('trade_orders')
+    op.drop_table('trades')
+    op.drop_table('portfolios')
+    op.drop_table('market_events')
+    op.drop_table('price_history')
+    op.drop_table('achievements')
+    op.drop_table('strains')
+    op.drop_table('users')
+
+    bind = op.get_bind()
+    for enum in reversed(ENUMS):
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,59 @@
+"""composite and partial indexes for hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BET_TABLES = ('futures_bets', 'head_to_head_bets', 'prop_bets')
+
+# (name, table, columns, extra create_index kwargs)
+INDEXES = [
+    ('ix_price_history_strain_id_timestamp', 'price_history', ['strain_id', 'timestamp'],
+     {'postgresql_include': ['price']}),
+    ('ix_trades_user_id_timestamp', 'trades', ['user_id', 'timestamp'], {}),
+    ('ix_leaderboards_period_weekly_profit', 'leaderboards', ['period', 'weekly_profit'],
+     {'postgresql_include': ['user_id']}),
+    ('ix_leaderboards_period_all_time_profit', 'leaderboards', ['period', 'all_time_profit'],
+     {'postgresql_include': ['user_id']}),
+    ('ix_leaderboards_period_prediction_accuracy', 'leaderboards', ['period', 'prediction_accuracy'],
+     {'postgresql_include': ['user_id']}),
+] + [
+    (f'ix_{table}_open_expires_at', table, ['expires_at'],
+     {'postgresql_where': sa.text('settled = false'), 'sqlite_where': sa.text('settled = 0')})
+    for table in BET_TABLES
+]
+
+# Single-column indexes that are now a prefix of one of the composites above
+REDUNDANT_INDEXES = [
+    ('ix_price_history_strain_id', 'price_history', ['strain_id']),
+    ('ix_trades_user_id', 'trades', ['user_id']),
+    ('ix_leaderboards_period', 'leaderboards', ['period']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; it keeps trades and
+    # bets writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, **kwargs)
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""append-only weedcoin ledger
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('weedcoin_ledger',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('reason', sa.String(length=30), nullable=False),
+        sa.Column('reference', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_weedcoin_ledger_user_id_id', 'weedcoin_ledger', ['user_id', 'id'], unique=False)
+
+    op.add_column('users', sa.Column('ledger_through_id', sa.BigInteger(), server_default='0', nullable=False))
+
+    # Open every account with its current balance, so the ledger alone
+    # reconstructs it; the snapshot restarts at zero below every entry
+    op.execute(
+        "INSERT INTO weedcoin_ledger (user_id, amount, reason) "
+        "SELECT id, weedcoins_balance, 'opening_balance' FROM users"
+    )
+    op.execute("UPDATE users SET weedcoins_balance = 0, ledger_through_id = 0")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE users SET weedcoins_balance = weedcoins_balance + COALESCE(("
+        "SELECT SUM(amount) FROM weedcoin_ledger "
+        "WHERE weedcoin_ledger.user_id = users.id AND weedcoin_ledger.id > users.ledger_through_id"
+        "), 0)"
+    )
+    op.drop_column('users', 'ledger_through_id')
+    op.drop_index('ix_weedcoin_ledger_user_id_id', table_name='weedcoin_ledger')
+    op.drop_table('weedcoin_ledger')
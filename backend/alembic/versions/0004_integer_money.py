@@ -0,0 +1,59 @@
+"""store weedcoin amounts as integer micro-coins
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+MICROS_PER_COIN = 1000000
+
+BET_TABLES = ('futures_bets', 'head_to_head_bets', 'prop_bets')
+
+# (table, [(column, nullable)])
+MONEY_COLUMNS = [
+    ('users', [('weedcoins_balance', False)]),
+    ('weedcoin_ledger', [('amount', False)]),
+    ('strains', [('current_price', False), ('base_price', False)]),
+    ('price_history', [('price', False)]),
+    ('trades', [('price', False), ('total_cost', False)]),
+    ('trade_orders', [('target_price', True)]),
+    ('portfolios', [('avg_buy_price', False), ('total_invested', False)]),
+] + [
+    (table, [('stake', False), ('potential_payout', False)]) for table in BET_TABLES
+]
+
+
+def _convert(from_type, to_type, expression):
+    bind = op.get_bind()
+    for table, columns in MONEY_COLUMNS:
+        if bind.dialect.name == 'postgresql':
+            for column, nullable in columns:
+                op.alter_column(
+                    table, column, type_=to_type, existing_type=from_type, existing_nullable=nullable,
+                    postgresql_using=expression.format(column=column)
+                )
+        else:
+            # SQLite cannot ALTER a column type: rewrite the values, then rebuild the table
+            op.execute(f"UPDATE {table} SET " + ", ".join(
+                f"{column} = {expression.format(column=column)}" for column, _ in columns
+            ))
+            with op.batch_alter_table(table) as batch_op:
+                for column, nullable in columns:
+                    batch_op.alter_column(column, type_=to_type, existing_type=from_type, existing_nullable=nullable)
+
+
+def upgrade() -> None:
+    _convert(sa.Float(), sa.BigInteger(), f"CAST(round({{column}} * {MICROS_PER_COIN}) AS BIGINT)")
+
+
+def downgrade() -> None:
+    _convert(sa.BigInteger(), sa.Float(), f"CAST({{column}} AS DOUBLE PRECISION) / {MICROS_PER_COIN}")
@@ -0,0 +1,30 @@
+"""index trades on (user_id, timestamp, id) for keyset pagination
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; it keeps trades writable
+    # while the index builds. The new index covers the old one's queries.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_trades_user_id_timestamp_id', 'trades', ['user_id', 'timestamp', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_trades_user_id_timestamp', table_name='trades', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_trades_user_id_timestamp', 'trades', ['user_id', 'timestamp'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_trades_user_id_timestamp_id', table_name='trades', postgresql_concurrently=True)
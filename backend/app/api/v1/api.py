@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, trading, portfolio, betting, leaderboard
+from app.api.v1.endpoints import auth, trading, portfolio, betting, leaderboard, admin
 
 api_router = APIRouter()
 
@@ -8,3 +8,4 @@ api_router.include_router(trading.router, prefix="/trading", tags=["trading"])
 api_router.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"])
 api_router.include_router(betting.router, prefix="/betting", tags=["betting"])
 api_router.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.db.session import (
+    get_db, pool_limits, engine, pool_metrics, async_engine, async_pool_metrics,
+    async_replica_engine, async_replica_pool_metrics
+)
+from app.db.replica import replica_router
+from app.db.pool import pool_status
+from app.core.config import settings
+from app.core.principal import Principal
+from app.services.exposure_tracker import exposure_tracker
+from app.api.v1.endpoints.auth import get_current_admin_user
+from app.core.admission import admission_controller
+from app.core.rate_limit import rate_limit_stats
+from app.core.cache import strain_cache
+from app.core.profiler import profiler
+
+router = APIRouter()
+
+
+@router.get("/exposure")
+def get_house_exposure(admin: Principal = Depends(get_current_admin_user)):
+    """Get what the house owes on unsettled bets, by strain, bet type and expiry day."""
+    return exposure_tracker.snapshot()
+
+
+@router.post("/exposure/rebuild")
+def rebuild_house_exposure(
+    admin: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute house exposure from the bet tables (reconciliation)."""
+    counted = exposure_tracker.rebuild(db)
+    return {"open_bets": counted, "exposure": exposure_tracker.snapshot()}
+
+
+@router.get("/load-shedding")
+def get_load_shedding_stats(admin: Principal = Depends(get_current_admin_user)):
+    """Get this worker's admission control and rate limiting counters."""
+    return {
+        "admission": admission_controller.stats(),
+        "rate_limited": dict(rate_limit_stats)
+    }
+
+
+@router.get("/metrics/cache")
+def get_cache_metrics(admin: Principal = Depends(get_current_admin_user)):
+    """Get this worker's read-through cache hit, load and coalescing counters."""
+    return {"strains": strain_cache.stats()}
+
+
+@router.get("/profiles")
+def list_profiles(admin: Principal = Depends(get_current_admin_user)):
+    """List recent request and task profiles from every worker, newest first."""
+    return profiler.profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, admin: Principal = Depends(get_current_admin_user)):
+    """Get a profile's call tree and SQL timeline."""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(admin: Principal = Depends(get_current_admin_user)):
+    """Get this worker's connection pool occupancy and checkout wait metrics."""
+    sync_size, sync_overflow = pool_limits(asyncio_engine=False)
+    async_size, async_overflow = pool_limits(asyncio_engine=True)
+    return {
+        "mode": settings.DB_POOL_MODE,
+        "configured": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "sync": {"pool_size": sync_size, "max_overflow": sync_overflow},
+            "async": {"pool_size": async_size, "max_overflow": async_overflow},
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS
+        },
+        **pool_status(engine, pool_metrics),
+        "async": pool_status(async_engine.sync_engine, async_pool_metrics),
+        "replica": {
+            "async": pool_status(async_replica_engine.sync_engine, async_replica_pool_metrics),
+            "routing": replica_router.stats()
+        } if async_replica_engine is not None else None
+    }
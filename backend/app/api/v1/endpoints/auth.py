@@ -1,13 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash_async,
+    verify_and_update_password_async,
+    PasswordHashingBusy,
+)
 from app.core.config import settings
+from app.core.principal import Principal, principal_cache
+from app.core.money import MoneyOut, to_micros
+from app.services.ledger import Ledger
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter()
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+
 
 class UserRegister(BaseModel):
     email: EmailStr
@@ -29,17 +42,81 @@ class UserResponse(BaseModel):
     id: int
     email: str
     username: str
-    weedcoins_balance: float
+    weedcoins_balance: MoneyOut
     
     class Config:
         from_attributes = True
 
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """
+    Get the authenticated principal from a JWT token.
+    
+    Served from the principal cache when possible, so most requests
+    authenticate without touching the database.
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    principal = principal_cache.get(int(user_id))
+    if principal is None:
+        user = db.query(User).filter(User.id == int(user_id)).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        principal = Principal.from_user(user)
+        principal_cache.set(principal)
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    return principal
+
+
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Get current user, requiring operator privileges."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    
+    return current_user
+
+
+def _password_hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Register a new user with starting WeedCoins."""
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == user_data.email).first()
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,35 +124,61 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
+    existing_username = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == user_data.username).first()
+    )
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
+    # Hash password off the request path
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordHashingBusy:
+        raise _password_hashing_busy()
+    
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=hashed_password,
-        weedcoins_balance=settings.INITIAL_WEEDCOINS
+        hashed_password=hashed_password
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    def save():
+        db.add(new_user)
+        db.flush()
+        # The starting grant goes through the ledger like every other balance change
+        balance = Ledger(db).credit(new_user.id, to_micros(settings.INITIAL_WEEDCOINS), "signup")
+        db.commit()
+        return balance
     
-    return new_user
+    balance = await run_in_threadpool(save)
+    
+    return UserResponse(
+        id=new_user.id,
+        email=new_user.email,
+        username=new_user.username,
+        weedcoins_balance=balance
+    )
 
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login and return JWT access token."""
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == user_data.email).first()
+    )
+    
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_and_update_password_async(user_data.password, user.hashed_password)
+        except PasswordHashingBusy:
+            raise _password_hashing_busy()
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -88,6 +191,14 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
+    # Stored hash predates the current work factor
+    if new_hash:
+        def rehash():
+            user.hashed_password = new_hash
+            db.commit()
+        
+        await run_in_threadpool(rehash)
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -95,41 +206,15 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get current user information."""
-    return current_user
-
-
-# Dependency to get current user from token
-from fastapi.security import OAuth2PasswordBearer
-from app.core.security import decode_access_token
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
-
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get current user from JWT token."""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    return user
+    # Balance is included, so read it from the ledger rather than the cache
+    return UserResponse(
+        id=current_user.id,
+        email=current_user.email,
+        username=current_user.username,
+        weedcoins_balance=Ledger(db).balance(current_user.id)
+    )
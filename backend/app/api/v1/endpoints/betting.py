@@ -1,25 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from app.db.session import get_db
-from app.models.user import User
-from app.models.bet import FuturesBet, HeadToHeadBet, PropBet, BetType
+from app.core.principal import Principal
+from app.models.bet import BetType
 from app.services.betting_engine import BettingEngine
+from app.services.odds_engine import odds_engine, futures_market, head_to_head_market, prop_market
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.rate_limit import rate_limit
+from app.core.money import MoneyIn, coins
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 router = APIRouter()
 
+# Micro-coin fields of placement results and history entries
+BET_MONEY_FIELDS = ("stake", "potential_payout", "new_balance")
+
 
 class FuturesBetRequest(BaseModel):
     bet_type: BetType
     target_strain_id: int
     prediction: str
-    stake: float
-    odds: float
+    stake: MoneyIn
     expires_at: datetime
+    min_odds: Optional[float] = None
 
 
 class HeadToHeadBetRequest(BaseModel):
@@ -27,23 +32,68 @@ class HeadToHeadBetRequest(BaseModel):
     strain_b_id: int
     metric: str
     prediction: str
-    stake: float
-    odds: float
+    stake: MoneyIn
     expires_at: datetime
+    min_odds: Optional[float] = None
 
 
 class PropBetRequest(BaseModel):
     bet_description: str
     bet_type: str
-    stake: float
-    odds: float
+    stake: MoneyIn
     expires_at: datetime
+    min_odds: Optional[float] = None
+
+
+@router.get("/bets/odds/futures")
+def quote_futures_odds(
+    bet_type: BetType,
+    target_strain_id: int,
+    prediction: str,
+    db: Session = Depends(get_db)
+):
+    """Get the current odds for a futures prediction."""
+    try:
+        market, outcome = futures_market(bet_type, target_strain_id, prediction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"odds": odds_engine.quote(db, market, outcome)}
+
 
+@router.get("/bets/odds/head-to-head")
+def quote_head_to_head_odds(
+    strain_a_id: int,
+    strain_b_id: int,
+    metric: str,
+    prediction: str,
+    db: Session = Depends(get_db)
+):
+    """Get the current odds for a head-to-head prediction."""
+    try:
+        market, outcome = head_to_head_market(strain_a_id, strain_b_id, metric, prediction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"odds": odds_engine.quote(db, market, outcome)}
 
-@router.post("/bets/futures")
+
+@router.get("/bets/odds/prop")
+def quote_prop_odds(
+    bet_type: str,
+    bet_description: str,
+    db: Session = Depends(get_db)
+):
+    """Get the current odds for a proposition bet."""
+    try:
+        market, outcome = prop_market(bet_type, bet_description)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"odds": odds_engine.quote(db, market, outcome)}
+
+
+@router.post("/bets/futures", dependencies=[Depends(rate_limit("bet", get_current_user))])
 def place_futures_bet(
     bet_request: FuturesBetRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Place a futures bet."""
@@ -56,18 +106,18 @@ def place_futures_bet(
             target_strain_id=bet_request.target_strain_id,
             prediction=bet_request.prediction,
             stake=bet_request.stake,
-            odds=bet_request.odds,
-            expires_at=bet_request.expires_at
+            expires_at=bet_request.expires_at,
+            min_odds=bet_request.min_odds
         )
-        return result
+        return coins(result, BET_MONEY_FIELDS)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/bets/head-to-head")
+@router.post("/bets/head-to-head", dependencies=[Depends(rate_limit("bet", get_current_user))])
 def place_head_to_head_bet(
     bet_request: HeadToHeadBetRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Place a head-to-head bet."""
@@ -81,18 +131,18 @@ def place_head_to_head_bet(
             metric=bet_request.metric,
             prediction=bet_request.prediction,
             stake=bet_request.stake,
-            odds=bet_request.odds,
-            expires_at=bet_request.expires_at
+            expires_at=bet_request.expires_at,
+            min_odds=bet_request.min_odds
         )
-        return result
+        return coins(result, BET_MONEY_FIELDS)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/bets/prop")
+@router.post("/bets/prop", dependencies=[Depends(rate_limit("bet", get_current_user))])
 def place_prop_bet(
     bet_request: PropBetRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Place a proposition bet."""
@@ -104,81 +154,30 @@ def place_prop_bet(
             bet_description=bet_request.bet_description,
             bet_type=bet_request.bet_type,
             stake=bet_request.stake,
-            odds=bet_request.odds,
-            expires_at=bet_request.expires_at
+            expires_at=bet_request.expires_at,
+            min_odds=bet_request.min_odds
         )
-        return result
+        return coins(result, BET_MONEY_FIELDS)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/bets/my-bets")
 def get_my_bets(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user's betting history."""
-    futures_bets = db.query(FuturesBet).filter(
-        FuturesBet.user_id == current_user.id
-    ).order_by(desc(FuturesBet.created_at)).limit(limit).all()
-    
-    h2h_bets = db.query(HeadToHeadBet).filter(
-        HeadToHeadBet.user_id == current_user.id
-    ).order_by(desc(HeadToHeadBet.created_at)).limit(limit).all()
+    """Get user's betting history across all bet types, newest first."""
+    engine = BettingEngine(db)
     
-    prop_bets = db.query(PropBet).filter(
-        PropBet.user_id == current_user.id
-    ).order_by(desc(PropBet.created_at)).limit(limit).all()
+    try:
+        page = engine.get_bet_history(current_user.id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "futures_bets": [
-            {
-                "id": bet.id,
-                "bet_type": bet.bet_type,
-                "target_strain_id": bet.target_strain_id,
-                "prediction": bet.prediction,
-                "stake": bet.stake,
-                "odds": bet.odds,
-                "potential_payout": bet.potential_payout,
-                "expires_at": bet.expires_at,
-                "settled": bet.settled,
-                "outcome": bet.outcome,
-                "created_at": bet.created_at
-            }
-            for bet in futures_bets
-        ],
-        "head_to_head_bets": [
-            {
-                "id": bet.id,
-                "strain_a_id": bet.strain_a_id,
-                "strain_b_id": bet.strain_b_id,
-                "metric": bet.metric,
-                "prediction": bet.prediction,
-                "stake": bet.stake,
-                "odds": bet.odds,
-                "potential_payout": bet.potential_payout,
-                "expires_at": bet.expires_at,
-                "settled": bet.settled,
-                "outcome": bet.outcome,
-                "created_at": bet.created_at
-            }
-            for bet in h2h_bets
-        ],
-        "prop_bets": [
-            {
-                "id": bet.id,
-                "bet_description": bet.bet_description,
-                "bet_type": bet.bet_type,
-                "stake": bet.stake,
-                "odds": bet.odds,
-                "potential_payout": bet.potential_payout,
-                "expires_at": bet.expires_at,
-                "settled": bet.settled,
-                "outcome": bet.outcome,
-                "created_at": bet.created_at
-            }
-            for bet in prop_bets
-        ]
+        "bets": [coins(bet, BET_MONEY_FIELDS) for bet in page["bets"]],
+        "next_cursor": page["next_cursor"]
     }
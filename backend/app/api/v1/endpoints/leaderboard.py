@@ -1,29 +1,33 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
+from app.db.session import get_async_read_db
+from app.core.cache import leaderboard_generation, achievement_generation
+from app.core.conditional import conditional_get
 from app.models.gamification import Leaderboard, Achievement, UserAchievement
 from app.models.user import User
 from typing import List
 
 router = APIRouter()
 
+leaderboard_validators = Depends(conditional_get(leaderboard_generation))
 
-@router.get("/leaderboard/weekly")
-def get_weekly_leaderboard(
+
+@router.get("/leaderboard/weekly", dependencies=[leaderboard_validators])
+async def get_weekly_leaderboard(
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get weekly profit leaderboard."""
-    leaderboard = db.query(
-        Leaderboard, User
-    ).join(
-        User, Leaderboard.user_id == User.id
-    ).filter(
-        Leaderboard.period == "weekly"
-    ).order_by(
-        desc(Leaderboard.weekly_profit)
-    ).limit(limit).all()
+    leaderboard = (await db.execute(
+        select(Leaderboard, User).join(
+            User, Leaderboard.user_id == User.id
+        ).filter(
+            Leaderboard.period == "weekly"
+        ).order_by(
+            desc(Leaderboard.weekly_profit)
+        ).limit(limit)
+    )).all()
     
     return [
         {
@@ -36,21 +40,21 @@ def get_weekly_leaderboard(
     ]
 
 
-@router.get("/leaderboard/all-time")
-def get_all_time_leaderboard(
+@router.get("/leaderboard/all-time", dependencies=[leaderboard_validators])
+async def get_all_time_leaderboard(
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get all-time profit leaderboard."""
-    leaderboard = db.query(
-        Leaderboard, User
-    ).join(
-        User, Leaderboard.user_id == User.id
-    ).filter(
-        Leaderboard.period == "all_time"
-    ).order_by(
-        desc(Leaderboard.all_time_profit)
-    ).limit(limit).all()
+    leaderboard = (await db.execute(
+        select(Leaderboard, User).join(
+            User, Leaderboard.user_id == User.id
+        ).filter(
+            Leaderboard.period == "all_time"
+        ).order_by(
+            desc(Leaderboard.all_time_profit)
+        ).limit(limit)
+    )).all()
     
     return [
         {
@@ -63,21 +67,21 @@ def get_all_time_leaderboard(
     ]
 
 
-@router.get("/leaderboard/accuracy")
-def get_accuracy_leaderboard(
+@router.get("/leaderboard/accuracy", dependencies=[leaderboard_validators])
+async def get_accuracy_leaderboard(
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get prediction accuracy leaderboard."""
-    leaderboard = db.query(
-        Leaderboard, User
-    ).join(
-        User, Leaderboard.user_id == User.id
-    ).filter(
-        Leaderboard.period == "all_time"
-    ).order_by(
-        desc(Leaderboard.prediction_accuracy)
-    ).limit(limit).all()
+    leaderboard = (await db.execute(
+        select(Leaderboard, User).join(
+            User, Leaderboard.user_id == User.id
+        ).filter(
+            Leaderboard.period == "all_time"
+        ).order_by(
+            desc(Leaderboard.prediction_accuracy)
+        ).limit(limit)
+    )).all()
     
     return [
         {
@@ -90,10 +94,10 @@ def get_accuracy_leaderboard(
     ]
 
 
-@router.get("/achievements")
-def get_all_achievements(db: Session = Depends(get_db)):
+@router.get("/achievements", dependencies=[Depends(conditional_get(achievement_generation))])
+async def get_all_achievements(db: AsyncSession = Depends(get_async_read_db)):
     """Get all available achievements."""
-    achievements = db.query(Achievement).all()
+    achievements = (await db.scalars(select(Achievement))).all()
     
     return [
         {
@@ -109,15 +113,15 @@ def get_all_achievements(db: Session = Depends(get_db)):
 
 
 @router.get("/achievements/user/{user_id}")
-def get_user_achievements(user_id: int, db: Session = Depends(get_db)):
+async def get_user_achievements(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get achievements unlocked by a specific user."""
-    user_achievements = db.query(
-        UserAchievement, Achievement
-    ).join(
-        Achievement, UserAchievement.achievement_id == Achievement.id
-    ).filter(
-        UserAchievement.user_id == user_id
-    ).all()
+    user_achievements = (await db.execute(
+        select(UserAchievement, Achievement).join(
+            Achievement, UserAchievement.achievement_id == Achievement.id
+        ).filter(
+            UserAchievement.user_id == user_id
+        )
+    )).all()
     
     return [
         {
@@ -1,32 +1,45 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.core.principal import Principal
+from app.core.money import coins
+from app.core.query_budget import query_budget
 from app.services.market_engine import MarketEngine
 from app.api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
 
+PORTFOLIO_MONEY_FIELDS = ("weedcoins_balance", "holdings_value", "total_value")
+HOLDING_MONEY_FIELDS = ("avg_buy_price", "current_price", "current_value", "profit_loss")
 
-@router.get("/portfolio")
-def get_portfolio(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+
+def _portfolio_in_coins(portfolio: dict) -> dict:
+    result = coins(portfolio, PORTFOLIO_MONEY_FIELDS)
+    result["holdings"] = [coins(holding, HOLDING_MONEY_FIELDS) for holding in portfolio["holdings"]]
+    return result
+
+
+@router.get("/portfolio", dependencies=[Depends(query_budget(5))])
+async def get_portfolio(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's current portfolio with total value."""
-    engine = MarketEngine(db)
-    portfolio = engine.calculate_portfolio_value(current_user.id)
-    return portfolio
+    portfolio = await db.run_sync(
+        lambda session: MarketEngine(session).calculate_portfolio_value(current_user.id)
+    )
+    return _portfolio_in_coins(portfolio)
 
 
-@router.get("/portfolio/performance")
-def get_portfolio_performance(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/portfolio/performance", dependencies=[Depends(query_budget(5))])
+async def get_portfolio_performance(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get portfolio performance metrics."""
-    engine = MarketEngine(db)
-    portfolio = engine.calculate_portfolio_value(current_user.id)
+    portfolio = _portfolio_in_coins(await db.run_sync(
+        lambda session: MarketEngine(session).calculate_portfolio_value(current_user.id)
+    ))
     
     # Calculate best and worst performers
     holdings = portfolio.get("holdings", [])
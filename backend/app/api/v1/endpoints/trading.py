@@ -1,18 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.db.session import get_db
-from app.models.user import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select, tuple_
+from app.db.session import async_read_session_factory, get_async_db, get_async_read_db
+from app.db.replica import replica_router
+from app.core.principal import Principal
+from app.core.money import MoneyOut, coins, from_micros
+from app.core.cache import strain_cache
+from app.core.conditional import conditional_get
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.query_budget import query_budget
 from app.models.strain import Strain, PriceHistory
 from app.models.trade import Trade
 from app.services.market_engine import MarketEngine
+from app.services.market_snapshot import market_snapshot, reference_prices_query
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.rate_limit import rate_limit
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import AsyncIterator, List, Literal, Optional
 from datetime import datetime, timedelta
+import csv
+import io
+import json
 
 router = APIRouter()
 
+TRADE_MONEY_FIELDS = ("price", "total_cost", "proceeds", "new_balance")
+
+TRADE_HISTORY_COLUMNS = (
+    Trade.id, Trade.strain_id, Trade.type, Trade.shares, Trade.price, Trade.total_cost, Trade.timestamp
+)
+EXPORT_FIELDS = ("id", "strain_id", "type", "shares", "price", "total_cost", "timestamp")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+# Rows fetched from the server-side cursor, and encoded, per chunk of an export
+TRADE_EXPORT_BATCH_SIZE = 1000
+
+# Strain data only changes when the strain cache generation is bumped
+strain_validators = Depends(conditional_get(strain_cache.generation))
+
 
 class TradeRequest(BaseModel):
     strain_id: int
@@ -23,7 +49,7 @@ class StrainResponse(BaseModel):
     id: int
     name: str
     slug: str
-    current_price: float
+    current_price: MoneyOut
     favorite_count: int
     pharmacy_count: int
     change_24h: Optional[float] = None
@@ -32,41 +58,49 @@ class StrainResponse(BaseModel):
         from_attributes = True
 
 
-class TradeResponse(BaseModel):
-    id: int
-    strain_id: int
-    type: str
-    shares: float
-    price: float
-    total_cost: float
-    timestamp: datetime
-    
-    class Config:
-        from_attributes = True
-
-
-@router.get("/strains", response_model=List[StrainResponse])
-def list_strains(
+@router.get("/strains", response_model=List[StrainResponse], dependencies=[strain_validators, Depends(query_budget(3))])
+async def list_strains(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    session_factory=Depends(async_read_session_factory)
 ):
     """List all tradable strains with current prices."""
-    strains = db.query(Strain).offset(skip).limit(limit).all()
+    generation = strain_cache.generation.value
+    if generation is not None:
+        accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+        page = await market_snapshot.page(generation, skip, limit, accepts_gzip)
+        if page is not None:
+            # Pre-rendered bytes, sent without validation or encoding
+            body, encoding = page
+            headers = {**response.headers, "Vary": "Accept-Encoding"}
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            return Response(content=body, media_type="application/json", headers=headers)
+    
+    return await strain_cache.get_or_load(f"list:{skip}:{limit}", lambda: _load_strains(session_factory, skip, limit))
+
+
+async def _load_strains(session_factory, skip: int, limit: int) -> List[dict]:
+    # The cache may share this load with other requests and let it outlive
+    # this one, so it must not use the request's session
+    async with session_factory() as db:
+        strains = (await db.scalars(select(Strain).order_by(Strain.id).offset(skip).limit(limit))).all()
+        if not strains:
+            return []
+        
+        # Price from 24 hours ago for the whole page in one query, not one per strain
+        reference_prices = dict((await db.execute(reference_prices_query(strain.id for strain in strains))).all())
     
     # Calculate 24h change for each strain
     result = []
     for strain in strains:
-        # Get price from 24 hours ago
-        yesterday = datetime.utcnow() - timedelta(hours=24)
-        old_price_record = db.query(PriceHistory).filter(
-            PriceHistory.strain_id == strain.id,
-            PriceHistory.timestamp >= yesterday
-        ).order_by(PriceHistory.timestamp).first()
+        old_price = reference_prices.get(strain.id)
         
         change_24h = None
-        if old_price_record and old_price_record.price > 0:
-            change_24h = ((strain.current_price - old_price_record.price) / old_price_record.price) * 100
+        if old_price:
+            change_24h = ((strain.current_price - old_price) / old_price) * 100
         
         strain_dict = {
             "id": strain.id,
@@ -82,91 +116,189 @@ def list_strains(
     return result
 
 
-@router.get("/strains/{strain_id}")
-def get_strain_detail(strain_id: int, db: Session = Depends(get_db)):
+@router.get("/strains/{strain_id}", dependencies=[strain_validators, Depends(query_budget(3))])
+async def get_strain_detail(strain_id: int, session_factory=Depends(async_read_session_factory)):
     """Get detailed strain data with price history."""
-    strain = db.query(Strain).filter(Strain.id == strain_id).first()
-    if not strain:
+    detail = await strain_cache.get_or_load(f"detail:{strain_id}", lambda: _load_strain_detail(session_factory, strain_id))
+    if detail is None:
         raise HTTPException(status_code=404, detail="Strain not found")
+    return detail
+
+
+async def _load_strain_detail(session_factory, strain_id: int) -> Optional[dict]:
+    # Own session for the same reason as _load_strains
+    async with session_factory() as db:
+        strain = await db.get(Strain, strain_id)
+        if not strain:
+            return None
+        
+        # Get price history (last 90 days)
+        ninety_days_ago = datetime.utcnow() - timedelta(days=90)
+        price_history = (await db.scalars(
+            select(PriceHistory).filter(
+                PriceHistory.strain_id == strain_id,
+                PriceHistory.timestamp >= ninety_days_ago
+            ).order_by(PriceHistory.timestamp)
+        )).all()
     
-    # Get price history (last 90 days)
-    ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-    price_history = db.query(PriceHistory).filter(
-        PriceHistory.strain_id == strain_id,
-        PriceHistory.timestamp >= ninety_days_ago
-    ).order_by(PriceHistory.timestamp).all()
-    
-    return {
+    # jsonable_encoder turns the timestamps into strings so the result can be cached
+    return jsonable_encoder({
         "id": strain.id,
         "name": strain.name,
         "slug": strain.slug,
-        "current_price": strain.current_price,
-        "base_price": strain.base_price,
+        "current_price": from_micros(strain.current_price),
+        "base_price": from_micros(strain.base_price),
         "popularity_score": strain.popularity_score,
         "volatility_score": strain.volatility_score,
         "favorite_count": strain.favorite_count,
         "pharmacy_count": strain.pharmacy_count,
         "price_history": [
             {
-                "price": ph.price,
+                "price": from_micros(ph.price),
                 "volume": ph.volume,
                 "timestamp": ph.timestamp
             }
             for ph in price_history
         ]
-    }
+    })
 
 
-@router.post("/trades/buy")
-def buy_shares(
+@router.post("/trades/buy", dependencies=[Depends(rate_limit("trade", get_current_user))])
+async def buy_shares(
     trade_request: TradeRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute a market buy order."""
-    engine = MarketEngine(db)
-    
+    # MarketEngine (and the event subscribers it triggers) is sync code; run_sync
+    # drives it on the async connection without tying up a threadpool worker
     try:
-        result = engine.execute_market_buy(
-            user_id=current_user.id,
-            strain_id=trade_request.strain_id,
-            shares=trade_request.shares
+        result = await db.run_sync(
+            lambda session: MarketEngine(session).execute_market_buy(
+                user_id=current_user.id,
+                strain_id=trade_request.strain_id,
+                shares=trade_request.shares
+            )
         )
-        return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    # After run_sync, so the Redis round-trip does not hold the connection
+    await replica_router.mark_write_async(current_user.id)
+    return coins(result, TRADE_MONEY_FIELDS)
 
 
-@router.post("/trades/sell")
-def sell_shares(
+@router.post("/trades/sell", dependencies=[Depends(rate_limit("trade", get_current_user))])
+async def sell_shares(
     trade_request: TradeRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute a market sell order."""
-    engine = MarketEngine(db)
-    
+    # MarketEngine (and the event subscribers it triggers) is sync code; run_sync
+    # drives it on the async connection without tying up a threadpool worker
     try:
-        result = engine.execute_market_sell(
-            user_id=current_user.id,
-            strain_id=trade_request.strain_id,
-            shares=trade_request.shares
+        result = await db.run_sync(
+            lambda session: MarketEngine(session).execute_market_sell(
+                user_id=current_user.id,
+                strain_id=trade_request.strain_id,
+                shares=trade_request.shares
+            )
         )
-        return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    # After run_sync, so the Redis round-trip does not hold the connection
+    await replica_router.mark_write_async(current_user.id)
+    return coins(result, TRADE_MONEY_FIELDS)
 
 
-@router.get("/trades/history", response_model=List[TradeResponse])
-def get_trade_history(
-    skip: int = Query(0, ge=0),
+@router.get("/trades/history", dependencies=[Depends(query_budget(3))])
+async def get_trade_history(
+    cursor: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get user's trade history, newest first, a page at a time."""
+    # Keyed on (timestamp, id) rather than an offset, so every page is a
+    # bounded range scan of ix_trades_user_id_timestamp_id however deep it is
+    query = select(*TRADE_HISTORY_COLUMNS).where(Trade.user_id == current_user.id)
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if len(position) != 2:
+                raise ValueError("Invalid cursor")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(Trade.timestamp, Trade.id) < tuple_(*position))
+    
+    rows = (await db.execute(
+        query.order_by(desc(Trade.timestamp), desc(Trade.id)).limit(limit + 1)
+    )).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    
+    return {"trades": [_trade_entry(row) for row in rows], "next_cursor": next_cursor}
+
+
+@router.get("/trades/export", dependencies=[Depends(rate_limit("export", get_current_user))])
+async def export_trade_history(
+    request: Request,
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get user's trade history with pagination."""
-    trades = db.query(Trade).filter(
-        Trade.user_id == current_user.id
-    ).order_by(desc(Trade.timestamp)).offset(skip).limit(limit).all()
+    """Download user's full trade history, oldest first, as CSV or NDJSON."""
+    session_factory = await async_read_session_factory(request)
+    return StreamingResponse(
+        _export_trades(session_factory, current_user.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trades.{format}"'}
+    )
+
+
+def _trade_entry(row) -> dict:
+    """A trade history row as served to clients, with prices in WeedCoins."""
+    return {
+        "id": row.id,
+        "strain_id": row.strain_id,
+        "type": row.type.value,
+        "shares": row.shares,
+        "price": from_micros(row.price),
+        "total_cost": from_micros(row.total_cost),
+        "timestamp": row.timestamp
+    }
+
+
+async def _export_trades(session_factory, user_id: int, format: str) -> AsyncIterator[str]:
+    """
+    Yield a user's trades in encoded chunks of TRADE_EXPORT_BATCH_SIZE rows.
     
-    return trades
+    The rows come from a server-side cursor, so memory stays flat however
+    many trades there are. The body is sent after the route's dependencies
+    have exited, so the stream opens and closes its own session.
+    """
+    async with session_factory() as db:
+        result = await db.stream(
+            select(*TRADE_HISTORY_COLUMNS).where(
+                Trade.user_id == user_id
+            ).order_by(Trade.timestamp, Trade.id).execution_options(yield_per=TRADE_EXPORT_BATCH_SIZE)
+        )
+        
+        if format == "csv":
+            yield ",".join(EXPORT_FIELDS) + "\r\n"
+        
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                entry = _trade_entry(row)
+                entry["timestamp"] = entry["timestamp"].isoformat()
+                if format == "csv":
+                    writer.writerow([entry[field] for field in EXPORT_FIELDS])
+                else:
+                    buffer.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            yield buffer.getvalue()
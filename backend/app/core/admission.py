@@ -0,0 +1,113 @@
+from typing import Dict, Optional
+from app.core.config import settings
+from app.db.session import pool_limits
+import json
+
+# (method, path prefix, priority); first match wins, other API requests are "low"
+ROUTE_PRIORITIES = (
+    ("POST", "/api/v1/trading/trades/", "high"),
+    ("POST", "/api/v1/betting/bets/", "normal"),
+    ("POST", "/api/v1/auth/", "normal"),
+    ("GET", "/api/v1/portfolio/", "normal"),
+)
+
+API_PREFIX = "/api/v1/"
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Priority of a request, or None if it is not subject to admission control."""
+    if not path.startswith(API_PREFIX):
+        return None
+
+    for route_method, prefix, priority in ROUTE_PRIORITIES:
+        if method == route_method and path.startswith(prefix):
+            return priority
+    return "low"
+
+
+class AdmissionController:
+    """
+    Priority-aware cap on requests in flight in one worker.
+
+    Each priority may only fill its share of ``max_in_flight`` (see
+    ADMISSION_THRESHOLDS), so as load rises low-priority reads are shed
+    first and trade writes keep the last database connections instead of
+    queueing on an exhausted pool.
+    """
+
+    def __init__(self, max_in_flight: int, thresholds: Dict[str, float]):
+        self.max_in_flight = max_in_flight
+        self.limits = {priority: max(1, int(max_in_flight * share)) for priority, share in thresholds.items()}
+        self.in_flight = 0
+        self.admitted: Dict[str, int] = {priority: 0 for priority in thresholds}
+        self.shed: Dict[str, int] = {priority: 0 for priority in thresholds}
+
+    def try_acquire(self, priority: str) -> bool:
+        if self.in_flight >= self.limits[priority]:
+            self.shed[priority] += 1
+            return False
+
+        self.in_flight += 1
+        self.admitted[priority] += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "limits": self.limits,
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed)
+        }
+
+
+def default_max_in_flight() -> int:
+    """Every connection the worker's sync and asyncio pools may open."""
+    return sum(pool_limits(asyncio_engine=False)) + sum(pool_limits(asyncio_engine=True))
+
+
+# Global admission controller instance (counters are only touched on the event loop)
+admission_controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT or default_max_in_flight(),
+    thresholds=settings.ADMISSION_THRESHOLDS
+)
+
+SHED_RESPONSE_BODY = json.dumps({"detail": "Server overloaded, please retry shortly"}).encode()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds API requests with 503 when their priority's share is full."""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = classify(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.controller.try_acquire(priority):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": SHED_RESPONSE_BODY})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,260 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.redis import get_redis, get_async_redis
+from app.models.strain import Strain
+from app.models.gamification import Achievement, Leaderboard
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "cache:{namespace}:generation"
+MODIFIED_KEY = "cache:{namespace}:modified"
+ENTRY_KEY = "cache:{namespace}:{generation}:{params}"
+
+_MISSING = object()
+
+
+class GenerationCounter:
+    """
+    Shared version number of a group of data, bumped on every committed change.
+
+    Readers use it to key cache entries and as an HTTP validator, so it is
+    read from Redis at most every ``check_seconds`` per worker. ``current``
+    returns None while Redis is unreachable, as then it cannot be trusted.
+    """
+
+    def __init__(self, namespace: str, check_seconds: float):
+        self.namespace = namespace
+        self.check_seconds = check_seconds
+        self.value: Optional[int] = None
+        self.modified_at: Optional[float] = None  # Unix time of the last bump
+        self._available = False
+        self._checked_at = float("-inf")
+
+    async def current(self) -> Optional[int]:
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            self._checked_at = time.monotonic()
+            try:
+                value, modified_at = await get_async_redis().mget(
+                    GENERATION_KEY.format(namespace=self.namespace),
+                    MODIFIED_KEY.format(namespace=self.namespace)
+                )
+                self.value = int(value) if value is not None else 0
+                self.modified_at = float(modified_at) if modified_at is not None else None
+                self._available = True
+            except Exception:
+                self._available = False
+                logger.warning("Could not read %s generation", self.namespace, exc_info=True)
+        return self.value if self._available else None
+
+    def bump(self) -> int:
+        """Start a new generation; call after the change is committed."""
+        modified_at = time.time()
+        pipe = get_redis().pipeline()
+        pipe.incr(GENERATION_KEY.format(namespace=self.namespace))
+        pipe.set(MODIFIED_KEY.format(namespace=self.namespace), modified_at)
+        value, _ = pipe.execute()
+        # This worker sees the new generation immediately, others within check_seconds
+        self.value, self.modified_at, self._available = value, modified_at, True
+        self._checked_at = time.monotonic()
+        return value
+
+
+class ReadThroughCache:
+    """
+    Two-level read-through cache for data that only changes in known writes.
+
+    Entries live in Redis (shared by every worker) and in a small in-process
+    LRU in front of it. Keys embed the namespace's ``GenerationCounter``, so
+    a committed change invalidates every entry at once by bumping it; old
+    generations are never read again and simply expire.
+
+    Concurrent misses for one key are collapsed: within a worker they await
+    the same load, and across workers a short Redis lock lets one of them
+    query the database while the others wait for its result. Values must be
+    JSON-serializable. If Redis is unavailable every call just loads.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        l1_size: int,
+        generation_check_seconds: float,
+        lock_seconds: float
+    ):
+        self.namespace = namespace
+        self.generation = GenerationCounter(namespace, generation_check_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.l1_size = l1_size
+        self.lock_seconds = lock_seconds
+        self._l1: "OrderedDict[str, tuple]" = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters = {"l1_hits": 0, "redis_hits": 0, "loads": 0, "coalesced": 0, "redis_errors": 0}
+
+    async def get_or_load(self, params: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value for ``params``, calling ``loader`` on a miss.
+
+        Args:
+            params: Stable string form of the query parameters
+            loader: Coroutine function computing the value from the database
+        """
+        generation = await self.generation.current()
+        if generation is None:
+            # Without the generation a cached entry could be stale
+            self.counters["redis_errors"] += 1
+            self.counters["loads"] += 1
+            return await loader()
+        key = ENTRY_KEY.format(namespace=self.namespace, generation=generation, params=params)
+
+        value = self._l1_get(key)
+        if value is not _MISSING:
+            self.counters["l1_hits"] += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+        else:
+            pending = asyncio.ensure_future(self._fill(key, loader))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting does not cancel the load for the rest
+        return await asyncio.shield(pending)
+
+    async def _fill(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self._read_through(key, loader)
+        if value is not None:
+            self._l1_set(key, value)
+        return value
+
+    async def _read_through(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        client = get_async_redis()
+        lock_key = f"{key}:lock"
+        owner = False
+        try:
+            cached = await client.get(key)
+            if cached is None:
+                owner = bool(await client.set(lock_key, 1, nx=True, px=int(self.lock_seconds * 1000)))
+                if not owner:
+                    # Another worker is loading this entry; wait for its result
+                    cached = await self._wait_for(client, key)
+            if cached is not None:
+                self.counters["redis_hits"] += 1
+                return json.loads(cached)
+        except Exception:
+            self.counters["redis_errors"] += 1
+            logger.warning("Cache read failed for %s, loading from the database", key, exc_info=True)
+
+        self.counters["loads"] += 1
+        value = await loader()
+        if value is None:
+            return value
+
+        try:
+            await client.set(key, json.dumps(value), ex=self.ttl_seconds)
+            if owner:
+                await client.delete(lock_key)
+        except Exception:
+            self.counters["redis_errors"] += 1
+            logger.warning("Cache write failed for %s", key, exc_info=True)
+        return value
+
+    async def _wait_for(self, client, key: str) -> Optional[bytes]:
+        # Gives up after the lock's lifetime and loads itself if the owner died
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached = await client.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    def _l1_get(self, key: str) -> Any:
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISSING
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._l1[key]
+                return _MISSING
+
+            self._l1.move_to_end(key)
+            return value
+
+    def _l1_set(self, key: str, value: Any):
+        with self._l1_lock:
+            self._l1[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._l1_lock:
+            l1_entries = len(self._l1)
+        return {
+            "generation": self.generation.value,
+            "l1_entries": l1_entries,
+            "in_flight": len(self._inflight),
+            **self.counters
+        }
+
+
+def bump_on_commit(counter: GenerationCounter, *models):
+    """
+    Bump ``counter`` after any session commits an ORM insert, update or
+    delete of ``models``. Bulk ``update()``/``delete()`` statements bypass
+    these events and must bump the counter themselves.
+    """
+    def mark(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault("bump_generations", set()).add(counter)
+
+    for model in models:
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, name, mark)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_generations(session):
+    for counter in session.info.pop("bump_generations", ()):
+        try:
+            counter.bump()
+        except Exception:
+            # Readers keep the old generation until its cache entries expire
+            logger.warning("Could not bump %s generation", counter.namespace, exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_generations(session):
+    session.info.pop("bump_generations", None)
+
+
+# Global strain cache instance
+strain_cache = ReadThroughCache(
+    "strains",
+    ttl_seconds=settings.STRAIN_CACHE_TTL_SECONDS,
+    l1_size=settings.CACHE_L1_SIZE,
+    generation_check_seconds=settings.CACHE_GENERATION_CHECK_SECONDS,
+    lock_seconds=settings.CACHE_LOCK_SECONDS
+)
+
+# Global generation counter instances for data served with HTTP validators only
+leaderboard_generation = GenerationCounter("leaderboards", settings.CACHE_GENERATION_CHECK_SECONDS)
+achievement_generation = GenerationCounter("achievements", settings.CACHE_GENERATION_CHECK_SECONDS)
+
+bump_on_commit(strain_cache.generation, Strain)
+bump_on_commit(leaderboard_generation, Leaderboard)
+bump_on_commit(achievement_generation, Achievement)
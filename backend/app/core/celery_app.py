@@ -1,11 +1,13 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from app.core.config import settings
+from app.core.metrics import mark_process_dead
 
 celery_app = Celery(
     "strain_exchange",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.data_sync", "app.tasks.market_events", "app.tasks.bet_settlement"]
+    include=["app.tasks.data_sync", "app.tasks.market_events", "app.tasks.bet_settlement", "app.tasks.ledger_compaction"]
 )
 
 # Configure Celery
@@ -20,9 +22,23 @@ celery_app.conf.update(
             "task": "app.tasks.data_sync.sync_strain_data_task",
             "schedule": 300.0,  # 5 minutes
         },
+        "settle-due-bets": {
+            "task": "app.tasks.bet_settlement.settle_due_bets_task",
+            "schedule": float(settings.SETTLEMENT_POLL_SECONDS),
+        },
+        "compact-ledger": {
+            "task": "app.tasks.ledger_compaction.compact_ledger_task",
+            "schedule": float(settings.LEDGER_COMPACTION_SECONDS),
+        },
         "settle-expired-bets-hourly": {
             "task": "app.tasks.bet_settlement.settle_expired_bets_task",
             "schedule": 3600.0,  # 1 hour
         },
     },
 )
+
+
+@worker_process_shutdown.connect
+def retire_worker_process_metrics(pid=None, **kwargs):
+    """Stop counting an exiting pool process's live gauges."""
+    mark_process_dead(pid)
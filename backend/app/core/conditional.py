@@ -0,0 +1,60 @@
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response
+from app.core.cache import GenerationCounter
+from typing import Optional
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as for GET in RFC 9110
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _not_modified_since(if_modified_since: str, modified_at: Optional[float]) -> bool:
+    if modified_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have whole-second precision
+    return int(modified_at) <= since.timestamp()
+
+
+def conditional_get(counter: GenerationCounter):
+    """
+    Route dependency answering conditional GETs from a generation counter.
+
+    Declared in the route's ``dependencies`` it runs before the session
+    dependency, so an unchanged resource is answered with 304 Not Modified
+    without a database query or serialization. Otherwise it sets ETag and
+    Last-Modified on the response. Nothing is sent while the counter is
+    unavailable.
+    """
+    async def dependency(request: Request, response: Response):
+        generation = await counter.current()
+        if generation is None:
+            return
+
+        etag = f'"{counter.namespace}-{generation}-{int(counter.modified_at or 0)}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if counter.modified_at is not None:
+            headers["Last-Modified"] = formatdate(counter.modified_at, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = if_modified_since is not None and _not_modified_since(
+                if_modified_since, counter.modified_at
+            )
+
+        if not_modified:
+            # Starlette sends 304 exceptions without a body
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
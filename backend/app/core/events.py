@@ -0,0 +1,35 @@
+from collections import defaultdict
+from typing import Callable, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Published by MarketEngine after a buy or sell commits
+TRADE_EXECUTED = "trade_executed"
+
+# Published by BettingEngine after a bet is settled
+BET_SETTLED = "bet_settled"
+
+_subscribers: Dict[str, List[Callable]] = defaultdict(list)
+
+
+def subscribe(event_type: str, handler: Callable):
+    """Register ``handler(db, payload)`` to be called for an event type."""
+    if handler not in _subscribers[event_type]:
+        _subscribers[event_type].append(handler)
+
+
+def publish(event_type: str, db, payload: Dict):
+    """
+    Deliver an event to its subscribers, in process.
+
+    Events are published after the originating transaction has committed,
+    so a failing subscriber is logged and rolled back but never undoes or
+    fails the trade or settlement that raised the event.
+    """
+    for handler in _subscribers.get(event_type, ()):
+        try:
+            handler(db, payload)
+        except Exception:
+            logger.exception("Subscriber %s failed on %s", getattr(handler, "__name__", handler), event_type)
+            db.rollback()
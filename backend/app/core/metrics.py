@@ -0,0 +1,197 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import os
+import time
+
+# With PROMETHEUS_MULTIPROC_DIR set (shared by the uvicorn and Celery
+# workers), every process writes its samples there and /metrics serves
+# their aggregate. Gauges then need a multiprocess_mode; "livesum" adds up
+# the values of the processes that are still alive, which is why exiting
+# processes call mark_process_dead and the directory is emptied before the
+# services start (see docker-compose.yml).
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+DB_STATEMENTS = Counter(
+    "db_statements_total", "SQL statements executed, by route template or task", ["route"]
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time, by route template or task", ["route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections", "Open WebSocket connections", multiprocess_mode="livesum"
+)
+WEBSOCKET_MESSAGES = Counter(
+    "websocket_messages_total", "WebSocket messages", ["direction"]
+)
+TASK_SECONDS = Histogram(
+    "task_duration_seconds", "Background task run time", ["task"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+TASK_ROWS = Counter(
+    "task_rows_total", "Rows processed by background tasks", ["task"]
+)
+TASK_FAILURES = Counter(
+    "task_failures_total", "Background task runs that raised", ["task"]
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(http_scope: Optional[dict]) -> str:
+    """Path template of the route matched for an ASGI scope, e.g. ``/api/v1/trading/strains/{strain_id}``."""
+    # The router stores the matched route in the ASGI scope once it has dispatched the request
+    route = http_scope.get("route") if http_scope is not None else None
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class StatementScope:
+    """SQL statements run on behalf of one request or task run."""
+
+    __slots__ = ("label", "http_scope", "durations")
+
+    def __init__(self, label: Optional[str] = None, http_scope: Optional[dict] = None):
+        self.label = label
+        self.http_scope = http_scope
+        self.durations: List[float] = []
+
+    def route(self) -> str:
+        if self.label is not None:
+            return self.label
+        return route_template(self.http_scope)
+
+    def flush(self):
+        if not self.durations:
+            return
+        route = self.route()
+        DB_STATEMENTS.labels(route).inc(len(self.durations))
+        histogram = DB_STATEMENT_SECONDS.labels(route)
+        for duration in self.durations:
+            histogram.observe(duration)
+
+
+# A mutable scope per request: threadpool and run_sync calls copy the
+# context, but still record into the same object
+_statement_scope: ContextVar[Optional[StatementScope]] = ContextVar("statement_scope", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["statement_started_at"].pop()
+    scope = _statement_scope.get()
+    if scope is not None:
+        scope.durations.append(time.perf_counter() - started)
+    else:
+        DB_STATEMENTS.labels("other").inc()
+        DB_STATEMENT_SECONDS.labels("other").observe(time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _abandon_statement(context):
+    # A failed execute never reaches after_cursor_execute
+    if context.connection is not None:
+        started = context.connection.info.get("statement_started_at")
+        if started:
+            started.pop()
+
+
+class _TaskRun:
+    __slots__ = ("rows", "failed")
+
+    def __init__(self):
+        self.rows = 0
+        self.failed = False
+
+
+@contextmanager
+def track_task(name: str):
+    """
+    Time a background task run and count its SQL statements.
+
+    Yields an object whose ``rows`` the task sets to the number of rows it
+    processed, and whose ``failed`` it sets if it handles its own errors.
+    """
+    run = _TaskRun()
+    scope = StatementScope(label=f"task:{name}")
+    token = _statement_scope.set(scope)
+    start = time.perf_counter()
+    try:
+        yield run
+    except Exception:
+        run.failed = True
+        raise
+    finally:
+        if run.failed:
+            TASK_FAILURES.labels(name).inc()
+        TASK_SECONDS.labels(name).observe(time.perf_counter() - start)
+        TASK_ROWS.labels(name).inc(run.rows)
+        _statement_scope.reset(token)
+        scope.flush()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and SQL statements per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        statements = StatementScope(http_scope=scope)
+        token = _statement_scope.set(statements)
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            _statement_scope.reset(token)
+            HTTP_REQUEST_SECONDS.labels(method, statements.route(), str(status["code"])).observe(
+                time.perf_counter() - start
+            )
+            statements.flush()
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """
+    Drop the "livesum" gauge samples of a finished process (this one by
+    default), so they stop counting towards the aggregate.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def render_metrics() -> bytes:
+    """Metrics in the Prometheus text format, aggregated across processes in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,51 @@
+from typing import Annotated, Dict, Iterable, Optional
+from pydantic import BeforeValidator, PlainSerializer
+import math
+
+# WeedCoin amounts are stored and computed as integer micro-coins (1e-6 WC).
+# Integers add and compare exactly, where floats drift and Decimal is slow;
+# values only become floats at the API edge.
+MICROS_PER_COIN = 1_000_000
+
+
+def to_micros(coins: float) -> int:
+    """WeedCoins to micro-coins, rounded to the nearest micro-coin."""
+    return round(coins * MICROS_PER_COIN)
+
+
+def from_micros(micros: Optional[int]) -> Optional[float]:
+    """Micro-coins to WeedCoins for display; None passes through."""
+    return None if micros is None else micros / MICROS_PER_COIN
+
+
+def mul(micros: int, factor: float) -> int:
+    """An amount scaled by a share count or odds, rounded once to a micro-coin."""
+    return round(micros * factor)
+
+
+def div(micros: int, divisor: float) -> int:
+    """An amount divided by a share count, rounded once to a micro-coin."""
+    return round(micros / divisor)
+
+
+def coins(data: Dict, fields: Iterable[str]) -> Dict:
+    """Copy of ``data`` with the given micro-coin fields converted to WeedCoins."""
+    converted = dict(data)
+    for field in fields:
+        if field in converted:
+            converted[field] = from_micros(converted[field])
+    return converted
+
+
+def _parse_coins(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError("Expected a WeedCoin amount")
+    coins = float(value)
+    if not math.isfinite(coins):
+        raise ValueError("Expected a finite WeedCoin amount")
+    return to_micros(coins)
+
+
+# Pydantic field types: WeedCoins (float) on the wire, micro-coins (int) in Python
+MoneyIn = Annotated[int, BeforeValidator(_parse_coins)]
+MoneyOut = Annotated[int, PlainSerializer(from_micros, return_type=float)]
@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(timestamp: datetime, *keys) -> str:
+    """
+    Encode a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        keys: Tie-breaker values of that row (e.g. its id)
+
+    Returns:
+        Cursor string to hand back to the client
+    """
+    raw = json.dumps([timestamp.isoformat(), *keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Returns:
+        Tuple of (timestamp, *keys)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(values[0]), *values[1:])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, IndexError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
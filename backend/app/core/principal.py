@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event, inspect
+from app.core.config import settings
+from app.models.user import User
+import threading
+import time
+
+# User columns copied into a Principal; changing any of them evicts the cache entry
+PRINCIPAL_FIELDS = ("email", "username", "is_active", "is_admin")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Authenticated user identity, holding only what authorization needs.
+
+    Deliberately carries no balance: balance-sensitive paths load the
+    ``User`` row themselves so they always see fresh data.
+    """
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            is_admin=user.is_admin
+        )
+
+
+class PrincipalCache:
+    """
+    Bounded, short-TTL LRU cache of principals keyed by user id.
+
+    Entries are evicted in process when a user's authz fields change; other
+    workers pick the change up once their entry's TTL runs out.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_SIZE
+)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    # Balance updates on every trade must not evict the entry, only authz changes
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS):
+        principal_cache.invalidate(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,322 @@
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import route_template
+from app.core.redis import get_redis, get_async_redis
+from urllib.parse import parse_qsl
+import functools
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILES_KEY = "profiler:profiles"
+MAX_STACK_DEPTH = 128
+DETAIL_FIELDS = ("interval_ms", "call_tree", "sql", "dropped_statements")
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    # Enough of the path to tell app code from libraries
+    parts = path.replace(os.sep, "/").rsplit("/", 3)
+    return f"{code.co_name} ({'/'.join(parts[-3:])}:{code.co_firstlineno})"
+
+
+class Profile:
+    """
+    Stack samples and SQL statements of one request or task run.
+
+    Samples are taken from the thread that started the profile, and only
+    while the ``marker`` frame (the caller's own frame) is on its stack, so
+    concurrent requests on the same event loop are told apart. Work handed
+    to the threadpool is not sampled, but its SQL still shows in the timeline.
+    """
+
+    def __init__(self, label: str, marker):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.marker = marker
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.statements: List[Dict] = []
+        self.dropped_statements = 0
+        self.meta: Dict = {}
+
+    def sample(self, frame):
+        codes = []
+        while frame is not None and frame is not self.marker:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if frame is None:
+            # The marker is not on the stack: another request is running
+            return
+        self.samples += 1
+        self.stacks[tuple(reversed(codes[-MAX_STACK_DEPTH:]))] += 1
+
+    def add_statement(self, statement: str, started: float, duration: float):
+        if len(self.statements) >= settings.PROFILER_MAX_STATEMENTS:
+            self.dropped_statements += 1
+            return
+        self.statements.append({
+            "offset_ms": round((started - self.start) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            "statement": statement
+        })
+
+    def call_tree(self) -> Dict:
+        root = {"frame": self.label, "samples": self.samples, "children": {}}
+        for stack, count in self.stacks.items():
+            node = root
+            for code in stack:
+                node = node["children"].setdefault(code, {"frame": _frame_label(code), "samples": 0, "children": {}})
+                node["samples"] += count
+        return _sorted_tree(root)
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "statements": len(self.statements) + self.dropped_statements,
+            **self.meta
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.summary(),
+            "interval_ms": settings.PROFILER_INTERVAL_MS,
+            "call_tree": self.call_tree(),
+            "sql": self.statements,
+            "dropped_statements": self.dropped_statements
+        }
+
+
+def _sorted_tree(node: Dict) -> Dict:
+    children = sorted(node["children"].values(), key=lambda child: child["samples"], reverse=True)
+    return {**node, "children": [_sorted_tree(child) for child in children]}
+
+
+class Profiler:
+    """
+    Sampling profiler for individual requests and task runs.
+
+    A background thread runs only while a profile is active and samples the
+    stacks of the profiled threads every ``interval`` seconds. Finished
+    profiles go to a ring of the last ``ring_size`` in this process, and are
+    published to a Redis list of the same size so that any API worker can
+    serve profiles taken by other workers and by Celery.
+    """
+
+    def __init__(self, interval: float, ring_size: int):
+        self.interval = interval
+        self.ring_size = ring_size
+        self._active: List[Profile] = []
+        self._ring: deque = deque(maxlen=ring_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, label: str, marker) -> Profile:
+        profile = Profile(label, marker)
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def finish(self, profile: Profile):
+        """Stop sampling ``profile`` and keep it in this process's ring."""
+        profile.duration_ms = round((time.perf_counter() - profile.start) * 1000, 3)
+        # Kept profiles must not hold on to the request's frames
+        profile.marker = None
+        with self._lock:
+            self._active.remove(profile)
+            self._ring.append(profile)
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in active:
+                profile.sample(frames.get(profile.thread_id))
+            time.sleep(self.interval)
+
+    def publish(self, profile: Profile):
+        try:
+            pipe = get_redis().pipeline()
+            pipe.lpush(PROFILES_KEY, json.dumps(profile.to_dict()))
+            pipe.ltrim(PROFILES_KEY, 0, self.ring_size - 1)
+            pipe.execute()
+        except Exception:
+            logger.warning("Could not publish profile %s", profile.id, exc_info=True)
+
+    async def publish_async(self, profile: Profile):
+        try:
+            pipe = get_async_redis().pipeline()
+            pipe.lpush(PROFILES_KEY, json.dumps(profile.to_dict()))
+            pipe.ltrim(PROFILES_KEY, 0, self.ring_size - 1)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Could not publish profile %s", profile.id, exc_info=True)
+
+    def _shared(self) -> List[Dict]:
+        try:
+            return [json.loads(raw) for raw in get_redis().lrange(PROFILES_KEY, 0, -1)]
+        except Exception:
+            logger.warning("Could not read shared profiles", exc_info=True)
+            return []
+
+    def profiles(self) -> List[Dict]:
+        """Summaries of the shared profiles and any of this process's not among them, newest first."""
+        shared = [
+            {key: value for key, value in profile.items() if key not in DETAIL_FIELDS}
+            for profile in self._shared()
+        ]
+        seen = {profile["id"] for profile in shared}
+        with self._lock:
+            # Includes profiles whose publish failed, or that have left the shared list
+            local = [profile.summary() for profile in reversed(self._ring) if profile.id not in seen]
+        return sorted(local + shared, key=lambda profile: profile["started_at"], reverse=True)
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        with self._lock:
+            for profile in self._ring:
+                if profile.id == profile_id:
+                    return profile.to_dict()
+        for profile in self._shared():
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+
+# Global profiler instance
+profiler = Profiler(
+    interval=settings.PROFILER_INTERVAL_MS / 1000,
+    ring_size=settings.PROFILER_RING_SIZE
+)
+
+# The profile of the current request or task run; threadpool and run_sync
+# calls copy the context, so their SQL is recorded into it as well
+_active_profile: ContextVar[Optional[Profile]] = ContextVar("active_profile", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_profiled_statement(conn, cursor, statement, parameters, context, executemany):
+    if _active_profile.get() is not None:
+        conn.info.setdefault("profile_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_profiled_statement(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is not None:
+        started = conn.info["profile_started_at"].pop()
+        profile.add_statement(statement, started, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _abandon_profiled_statement(context):
+    # A failed execute never reaches after_cursor_execute
+    if context.connection is not None and _active_profile.get() is not None:
+        started = context.connection.info.get("profile_started_at")
+        if started:
+            started.pop()
+
+
+def _profile_requested(scope) -> bool:
+    if not settings.PROFILER_TOKEN:
+        return False
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"x-profile-token":
+            token = value
+            break
+    if token is None:
+        for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+            if name == "profile_token":
+                token = value.encode()
+                break
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    return token is not None and hmac.compare_digest(token, settings.PROFILER_TOKEN.encode())
+
+
+def profiled(func):
+    """
+    Task decorator profiling a random PROFILER_TASK_SAMPLE_RATE share of
+    runs. Goes under ``@celery_app.task``, so the task keeps its name.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if random.random() >= settings.PROFILER_TASK_SAMPLE_RATE:
+            return func(*args, **kwargs)
+
+        profile = profiler.start(f"task:{func.__name__}", sys._getframe())
+        token = _active_profile.set(profile)
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            profile.meta["failed"] = True
+            raise
+        finally:
+            _active_profile.reset(token)
+            profiler.finish(profile)
+            profiler.publish(profile)
+
+    return wrapper
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling requests that carry the PROFILER_TOKEN in an
+    ``X-Profile-Token`` header or ``profile_token`` query parameter, and a
+    random PROFILER_SAMPLE_RATE share of the rest. Profiled responses carry
+    an ``X-Profile-Id`` header naming the stored profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (
+            _profile_requested(scope) or random.random() < settings.PROFILER_SAMPLE_RATE
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start(f"{scope['method']} {scope['path']}", sys._getframe())
+        profile.meta.update(method=scope["method"], path=scope["path"], status=500)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.meta["status"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _active_profile.reset(token)
+            profile.meta["route"] = route_template(scope)
+            profiler.finish(profile)
+            await profiler.publish_async(profile)
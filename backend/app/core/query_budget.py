@@ -0,0 +1,201 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import route_template
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Expanded IN lists have one placeholder per value, e.g. IN (%(id_1_1)s, %(id_1_2)s)
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|%\(\w+\)s)*\)", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in QUERY_BUDGET_MODE "raise" by the statement that breaks a budget."""
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` with its literals and IN lists collapsed, so that statements differing only by parameters match."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _IN_LIST.sub("IN (...)", shape)
+
+
+class QueryTracker:
+    """
+    SQL statements run on behalf of one request or task run.
+
+    It is over budget after more than ``budget`` statements, and flags an
+    N+1 pattern when one statement shape runs ``repeat_threshold`` times.
+    """
+
+    def __init__(
+        self,
+        label: Optional[str] = None,
+        http_scope: Optional[dict] = None,
+        budget: Optional[int] = None,
+        repeat_threshold: Optional[int] = None,
+        raise_on_violation: bool = False
+    ):
+        self.label = label
+        self.http_scope = http_scope
+        self.budget = budget if budget is not None else settings.QUERY_BUDGET_DEFAULT
+        self.repeat_threshold = repeat_threshold if repeat_threshold is not None else settings.QUERY_REPEAT_THRESHOLD
+        self.raise_on_violation = raise_on_violation
+        self.count = 0
+        self.shapes: Counter = Counter()
+        self._raised = False
+
+    def route(self) -> str:
+        if self.label is not None:
+            return self.label
+        return route_template(self.http_scope)
+
+    def expect(self, items: int, statements_per_item: int = 1):
+        """
+        Declare a loop over ``items`` units of work that runs
+        ``statements_per_item`` statements each, such as one transaction
+        per settled bet, so it counts against neither limit.
+        """
+        self.budget += items * statements_per_item
+        self.repeat_threshold = max(self.repeat_threshold, items * statements_per_item + 1)
+
+    def record(self, statement: str):
+        self.count += 1
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.raise_on_violation and not self._raised and (
+            self.count > self.budget or self.shapes[shape] >= self.repeat_threshold
+        ):
+            # Once only, so the rollback and cleanup that follow still run
+            self._raised = True
+            raise QueryBudgetExceeded(self.report())
+
+    def repeated(self) -> Dict[str, int]:
+        """Statement shapes run at least ``repeat_threshold`` times, with their counts."""
+        return {shape: count for shape, count in self.shapes.items() if count >= self.repeat_threshold}
+
+    def violations(self) -> List[str]:
+        problems = []
+        if self.count > self.budget:
+            problems.append(f"{self.count} SQL statements, budget is {self.budget}")
+        for shape, count in self.repeated().items():
+            problems.append(f"possible N+1, {count}x: {shape}")
+        return problems
+
+    def report(self) -> str:
+        return f"{self.route()}: " + "; ".join(self.violations() or [f"{self.count} SQL statements"])
+
+
+# A mutable tracker per request: threadpool and run_sync calls copy the
+# context, but still record into the same object
+_query_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    tracker = _query_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+
+
+def _log_violations(tracker: QueryTracker):
+    if tracker.violations():
+        logger.warning("Query budget exceeded by %s", tracker.report())
+
+
+def query_budget(max_queries: int, repeat_threshold: Optional[int] = None):
+    """
+    Route dependency declaring the most SQL statements one request to the
+    route may run, in place of QUERY_BUDGET_DEFAULT.
+    """
+    async def dependency():
+        tracker = _query_tracker.get()
+        if tracker is not None:
+            tracker.budget = max_queries
+            if repeat_threshold is not None:
+                tracker.repeat_threshold = repeat_threshold
+
+    return dependency
+
+
+@contextmanager
+def track_queries(label: str, budget: Optional[int] = None):
+    """
+    Count the SQL statements of a background task run against ``budget``.
+
+    Yields the tracker, so the task can ``expect`` its per-item statements.
+    """
+    tracker = QueryTracker(
+        label=f"task:{label}", budget=budget, raise_on_violation=settings.QUERY_BUDGET_MODE == "raise"
+    )
+    if settings.QUERY_BUDGET_MODE == "off":
+        yield tracker
+        return
+
+    token = _query_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _query_tracker.reset(token)
+        _log_violations(tracker)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, repeat_threshold: Optional[int] = None):
+    """
+    Test helper failing when the block runs more than ``max_queries`` SQL
+    statements, or repeats one statement shape ``repeat_threshold`` times.
+
+    It counts statements from every thread, so requests made through a
+    TestClient are included::
+
+        with assert_max_queries(3):
+            client.get("/api/v1/trading/strains?limit=100")
+    """
+    tracker = QueryTracker(label="assert_max_queries", budget=max_queries, repeat_threshold=repeat_threshold)
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        tracker.record(statement)
+
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        yield tracker
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+
+    if tracker.violations():
+        raise AssertionError(tracker.report())
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware counting the SQL statements of each request against its
+    route's budget, and logging (or in "raise" mode failing) requests that
+    exceed it or repeat a statement shape.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or settings.QUERY_BUDGET_MODE == "off":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = QueryTracker(http_scope=scope, raise_on_violation=settings.QUERY_BUDGET_MODE == "raise")
+        token = _query_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _query_tracker.reset(token)
+            _log_violations(tracker)
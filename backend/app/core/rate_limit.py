@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from app.core.config import settings
+from app.core.principal import Principal
+from app.core.redis import get_redis
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Requests refused per scope, since process start
+rate_limit_stats: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+# Token bucket in Redis: refills at ARGV[1] tokens/s up to ARGV[2], takes ARGV[3].
+# Returns {allowed, seconds until enough tokens}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+class InMemoryRateLimiter:
+    """Token buckets held in process; each worker enforces its own budget."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take ``cost`` tokens from a bucket.
+
+        Returns:
+            (allowed, seconds until the request would be allowed)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [burst, now]
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, 0.0
+
+            bucket[0] = tokens
+            return False, (cost - tokens) / rate
+
+
+class RedisRateLimiter:
+    """Token buckets in Redis, shared by every worker."""
+
+    def __init__(self, fallback: InMemoryRateLimiter):
+        self.fallback = fallback
+        self._script = None
+
+    def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> Tuple[bool, float]:
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, wait = self._script(keys=[f"ratelimit:{key}"], args=[rate, burst, cost])
+            return bool(allowed), float(wait)
+        except Exception:
+            # Keep limiting per worker while Redis is unreachable
+            logger.warning("Redis rate limiter unavailable, using in-process buckets", exc_info=True)
+            return self.fallback.acquire(key, rate, burst, cost)
+
+
+def _build_limiter():
+    memory = InMemoryRateLimiter()
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(fallback=memory)
+    return memory
+
+
+limiter = _build_limiter()
+
+
+def rate_limit(scope: str, get_principal: Callable[..., Principal]):
+    """
+    Build a dependency enforcing per-IP and per-user token buckets for ``scope``,
+    for the user resolved by the ``get_principal`` dependency.
+
+    The IP budget is ``RATE_LIMIT_IP_MULTIPLIER`` times the user budget, as
+    several users may share an address. The client address is the one
+    uvicorn reports, which is the proxy's unless uvicorn trusts its
+    forwarded headers (``--forwarded-allow-ips``).
+    """
+    rate, burst = settings.RATE_LIMITS[scope]
+    ip_rate = rate * settings.RATE_LIMIT_IP_MULTIPLIER
+    ip_burst = burst * settings.RATE_LIMIT_IP_MULTIPLIER
+
+    def dependency(request: Request, current_user: Principal = Depends(get_principal)):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        client_ip = request.client.host if request.client else "unknown"
+        # IP first: a refused request then never spends the user's own budget
+        checks = (
+            (f"{scope}:ip:{client_ip}", ip_rate, ip_burst),
+            (f"{scope}:user:{current_user.id}", rate, burst),
+        )
+        for key, key_rate, key_burst in checks:
+            allowed, wait = limiter.acquire(key, key_rate, key_burst)
+            if not allowed:
+                with _stats_lock:
+                    rate_limit_stats[scope] = rate_limit_stats.get(scope, 0) + 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Rate limit exceeded",
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+
+    return dependency
@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import redis
+    import redis.asyncio
+
+# redis-py is imported on first use so importing the app stays cheap
+_client = None
+_async_client = None
+
+
+def get_redis() -> "redis.Redis":
+    """Get the shared Redis client, creating its connection pool on first use."""
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def get_async_redis() -> "redis.asyncio.Redis":
+    """Get the shared asyncio Redis client for use on the event loop."""
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio
+        _async_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+    return _async_client
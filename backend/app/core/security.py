@@ -1,24 +1,100 @@
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from .config import settings
+from collections import OrderedDict
+import asyncio
+import threading
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose are imported on first use: most requests only hit the
+# token cache, and neither is needed to start serving
+_pwd_context = None
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_slots: Optional[asyncio.Semaphore] = None
+
+# Bounded LRU of verified token payloads, so repeat requests skip signature checks
+_token_cache: "OrderedDict[str, dict]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when every password hashing slot is taken."""
+
+
+def get_pwd_context():
+    """Get the password hashing context, creating it on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        # Hashes made with a different work factor are flagged as outdated and
+        # transparently re-hashed on the next successful login
+        _pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+            bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+            bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS
+        )
+    return _pwd_context
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a replacement hash if the stored one is outdated."""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing process pool."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the hashing process pool, returning a replacement hash if outdated."""
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
+async def _run_in_hash_pool(fn, *args):
+    # bcrypt is CPU bound for ~250 ms; running it in a bounded process pool
+    # keeps it off the event loop and the request threadpool. Calls beyond
+    # PASSWORD_HASH_MAX_PENDING are refused immediately rather than queued.
+    global _hash_pool, _hash_slots
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+    if _hash_slots.locked():
+        raise PasswordHashingBusy()
+
+    async with _hash_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_pool, fn, *args)
+
+
+def shutdown_password_hashing():
+    """Stop the hashing process pool."""
+    global _hash_pool, _hash_slots
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+        _hash_slots = None
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
+    from jose import jwt
+    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -31,9 +107,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token, reusing earlier decodes of the same token."""
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                _token_cache.move_to_end(token)
+                return payload
+            del _token_cache[token]
+    
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    if isinstance(payload.get("exp"), (int, float)):
+        with _token_cache_lock:
+            _token_cache[token] = payload
+            while len(_token_cache) > settings.TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    
+    return payload
@@ -6,4 +6,5 @@ from app.models.strain import Strain, PriceHistory, MarketEvent
 from app.models.portfolio import Portfolio
 from app.models.trade import Trade, TradeOrder
 from app.models.bet import FuturesBet, HeadToHeadBet, PropBet
-from app.models.gamification import Achievement, UserAchievement, Leaderboard
+from app.models.gamification import Achievement, UserAchievement, AchievementProgress, Leaderboard
+from app.models.ledger import LedgerEntry
@@ -0,0 +1,122 @@
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from typing import Dict
+import threading
+import time
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and how long callers waited for them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkout_wait_avg_ms": round(self.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_seconds_max * 1000, 3),
+                "checkout_wait_histogram": {
+                    **{f"le_{bound}": count for bound, count in zip(CHECKOUT_WAIT_BUCKETS, self.wait_buckets)},
+                    "le_inf": self.wait_buckets[-1]
+                }
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times how long each checkout waits for a connection.
+
+    Use ``instrumented_pool_class`` to bind a metrics sink; binding it on
+    the class keeps it across ``engine.dispose()``, which re-creates the pool.
+    """
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics, base: type = QueuePool):
+    """
+    An ``InstrumentedQueuePool`` subclass that records into ``metrics``;
+    ``base`` is the QueuePool variant to instrument, e.g. AsyncAdaptedQueuePool.
+    """
+    name = "Instrumented" + base.__name__
+    return type(name, (InstrumentedQueuePool, base), {"metrics": metrics})
+
+
+def instrument_pool(engine, metrics: PoolMetrics):
+    """Attach pool event hooks recording connects and invalidations to ``metrics``."""
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+
+def pool_status(engine, metrics: PoolMetrics) -> Dict:
+    """Current pool occupancy plus accumulated checkout metrics."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(0, pool.overflow())
+        })
+    status.update(metrics.snapshot())
+    return status
@@ -0,0 +1,129 @@
+from typing import Dict, Optional
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.core.security import decode_access_token
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STICKY_KEY = "rw:sticky:{user_id}"
+
+# Seconds the replica is behind; 0 while it has replayed everything it received,
+# so an idle primary does not read as lag
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def request_user_id(request) -> Optional[int]:
+    """User id from a request's bearer token, or None for anonymous/invalid tokens."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    payload = decode_access_token(token)
+    if not payload or payload.get("sub") is None:
+        return None
+    return int(payload["sub"])
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read may be served by the replica.
+
+    Reads go to the primary while the measured replica lag is above
+    REPLICA_MAX_LAG_SECONDS (measured at most every REPLICA_LAG_CHECK_SECONDS),
+    and for READ_YOUR_WRITES_SECONDS after the caller traded (see
+    ``mark_write_async``) so they always see their own trades.
+    """
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float, sticky_seconds: int):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.sticky_seconds = sticky_seconds
+        self.lag_seconds: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self.reads = {"replica": 0, "primary_lagging": 0, "primary_sticky": 0}
+
+    async def mark_write_async(self, user_id: int):
+        """Pin ``user_id``'s reads to the primary for the read-your-writes window."""
+        if not settings.DATABASE_REPLICA_URL:
+            return
+        try:
+            await get_async_redis().setex(STICKY_KEY.format(user_id=user_id), self.sticky_seconds, 1)
+        except Exception:
+            # The user's next reads may then hit a replica that has not seen
+            # this write yet; only a failed lookup falls back to the primary
+            logger.warning("Could not mark user %s as read-your-writes sticky", user_id, exc_info=True)
+
+    async def is_sticky_async(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        try:
+            return bool(await get_async_redis().exists(STICKY_KEY.format(user_id=user_id)))
+        except Exception:
+            logger.warning("Read-your-writes lookup failed, reading from primary", exc_info=True)
+            return True
+
+    def _lag_check_due(self) -> bool:
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval_seconds:
+                return False
+            # Claim the check so concurrent requests keep using the last value
+            self._checked_at = time.monotonic()
+            return True
+
+    def _record_lag(self, lag: Optional[float]):
+        # None means the replica could not be reached
+        self.lag_seconds = lag
+        if lag is None or lag > self.max_lag_seconds:
+            logger.warning("Replica lag %s exceeds %ss, reading from primary", lag, self.max_lag_seconds)
+
+    async def refresh_lag_async(self, engine):
+        if engine.dialect.name != "postgresql":
+            self._record_lag(0.0)
+            return
+        try:
+            async with engine.connect() as connection:
+                self._record_lag(float((await connection.execute(REPLICA_LAG_SQL)).scalar()))
+        except Exception:
+            logger.warning("Replica lag check failed", exc_info=True)
+            self._record_lag(None)
+
+    def _choose(self, sticky: bool) -> bool:
+        if sticky:
+            self.reads["primary_sticky"] += 1
+            return False
+        if self.lag_seconds is None or self.lag_seconds > self.max_lag_seconds:
+            self.reads["primary_lagging"] += 1
+            return False
+        self.reads["replica"] += 1
+        return True
+
+    async def use_replica_async(self, engine, request) -> bool:
+        """Whether this request's read should go to the async replica ``engine``."""
+        if self._lag_check_due():
+            await self.refresh_lag_async(engine)
+        return self._choose(await self.is_sticky_async(request_user_id(request)))
+
+    def stats(self) -> Dict:
+        return {
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "reads": dict(self.reads)
+        }
+
+
+# Global replica router instance
+replica_router = ReplicaRouter(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_LAG_CHECK_SECONDS,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS
+)
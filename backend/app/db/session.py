@@ -1,14 +1,143 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.db.pool import PoolMetrics, instrumented_pool_class, instrument_pool
+from app.db.replica import replica_router
+from typing import Tuple
 
-engine = create_engine(settings.DATABASE_URL)
+
+def pool_limits(asyncio_engine: bool) -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) of the sync or asyncio engine.
+    
+    DB_POOL_SIZE and DB_MAX_OVERFLOW are the worker's total, split between
+    the two engines by DB_ASYNC_POOL_SHARE; each engine keeps at least one
+    pooled connection.
+    """
+    limits = []
+    for total, minimum in ((settings.DB_POOL_SIZE, 1), (settings.DB_MAX_OVERFLOW, 0)):
+        async_part = max(minimum, round(total * settings.DB_ASYNC_POOL_SHARE))
+        limits.append(async_part if asyncio_engine else max(minimum, total - async_part))
+    return limits[0], limits[1]
+
+
+def _engine_options(database_url: str, metrics: PoolMetrics) -> dict:
+    """create_engine keyword arguments for the configured pool mode."""
+    if database_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    
+    pool_size, max_overflow = pool_limits(asyncio_engine=False)
+    options = {
+        "poolclass": instrumented_pool_class(metrics),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    
+    # PgBouncer in transaction mode rejects unknown startup parameters, so the
+    # timeout is applied per transaction instead (see _apply_statement_timeout)
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_POOL_MODE != "transaction":
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    
+    return options
+
+
+def _async_database_url(database_url: str) -> str:
+    """Swap a sync driver in a database URL for its asyncio counterpart."""
+    scheme, rest = database_url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}.get(dialect)
+    return f"{dialect}+{driver}://{rest}" if driver else database_url
+
+
+def _async_engine_options(database_url: str, metrics: PoolMetrics) -> dict:
+    """create_async_engine keyword arguments for the configured pool mode."""
+    if database_url.startswith("sqlite"):
+        return {}
+    
+    pool_size, max_overflow = pool_limits(asyncio_engine=True)
+    options = {
+        "poolclass": instrumented_pool_class(metrics, AsyncAdaptedQueuePool),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    
+    if settings.DB_POOL_MODE == "transaction":
+        # PgBouncer transaction pooling cannot keep named prepared statements
+        options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    
+    return options
+
+
+def _apply_statement_timeout(engine):
+    """Issue SET LOCAL statement_timeout at the start of every transaction."""
+    @event.listens_for(engine, "begin")
+    def set_local_statement_timeout(conn):
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+        finally:
+            cursor.close()
+
+
+def _create_engine(database_url: str, metrics: PoolMetrics):
+    engine = create_engine(database_url, **_engine_options(database_url, metrics))
+    instrument_pool(engine, metrics)
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_POOL_MODE == "transaction":
+        _apply_statement_timeout(engine)
+    return engine
+
+
+def _create_async_engine(database_url: str, metrics: PoolMetrics):
+    engine = create_async_engine(_async_database_url(database_url), **_async_engine_options(database_url, metrics))
+    instrument_pool(engine.sync_engine, metrics)
+    if settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_POOL_MODE == "transaction":
+        _apply_statement_timeout(engine.sync_engine)
+    return engine
+
+
+pool_metrics = PoolMetrics()
+
+engine = _create_engine(settings.DATABASE_URL, pool_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_pool_metrics = PoolMetrics()
+async_engine = _create_async_engine(settings.DATABASE_URL, async_pool_metrics)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replica; without one, read-only endpoints use the primary.
+# Only the asyncio read endpoints use it, so it has no sync engine.
+async_replica_pool_metrics = PoolMetrics()
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+
+if settings.DATABASE_REPLICA_URL:
+    async_replica_engine = _create_async_engine(settings.DATABASE_REPLICA_URL, async_replica_pool_metrics)
+    AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """
+    Python-side default for keyset-paginated timestamps. SQLite's
+    CURRENT_TIMESTAMP has whole seconds, which a cursor cannot tell apart.
+    """
+    return datetime.now(timezone.utc)
+
+
 def get_db():
     """Dependency for getting database session."""
     db = SessionLocal()
@@ -16,3 +145,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency for getting an asyncio database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def async_read_session_factory(request: Request):
+    """Asyncio session factory for a read-only request: the replica's when it is fresh enough."""
+    if async_replica_engine is not None and await replica_router.use_replica_async(async_replica_engine, request):
+        return AsyncReplicaSessionLocal
+    return AsyncSessionLocal
+
+
+async def get_async_read_db(request: Request):
+    """Dependency for a read-only asyncio session, on the replica when it is fresh enough."""
+    session_factory = await async_read_session_factory(request)
+    async with session_factory() as db:
+        yield db
@@ -1,12 +1,16 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 from app.core.config import settings
+from app.core.security import shutdown_password_hashing
+from app.core.admission import AdmissionMiddleware
+from app.core.metrics import MetricsMiddleware, WEBSOCKET_MESSAGES, mark_process_dead, render_metrics
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.profiler import ProfilerMiddleware
 from app.api.v1.api import api_router
 from app.websocket.manager import manager
-from app.db.session import engine, Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.db.session import engine, async_engine
+from app.services import achievement_engine  # noqa: F401  (registers event subscribers)
 
 app = FastAPI(
     title="The Strain Exchange API",
@@ -14,6 +18,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Shed low-priority API requests under overload (added first so CORS wraps its 503s)
+app.add_middleware(AdmissionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,10 +30,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count SQL statements per request against its route's query budget
+app.add_middleware(QueryBudgetMiddleware)
+
+# Sample the call stacks and SQL of requests asking for a profile
+app.add_middleware(ProfilerMiddleware)
+
+# Outermost, so latency and status include shed and CORS responses
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+def bootstrap_schema():
+    """Create missing tables when DB_BOOTSTRAP_SCHEMA is set; otherwise the schema comes from Alembic."""
+    if settings.DB_BOOTSTRAP_SCHEMA:
+        from app.db.base import Base
+        Base.metadata.create_all(bind=engine)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background worker pools, close pooled async connections and retire this worker's live metrics."""
+    shutdown_password_hashing()
+    await async_engine.dispose()
+    mark_process_dead()
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -43,6 +75,12 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics (aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
@@ -51,6 +89,7 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Keep connection alive and listen for messages
             data = await websocket.receive_text()
+            WEBSOCKET_MESSAGES.labels("received").inc()
             # Echo back for now (can be extended for client commands)
             await manager.send_personal_message({"message": "Connected"}, websocket)
     except WebSocketDisconnect:
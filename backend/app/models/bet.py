@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, DateTime, Boolean, Text, Enum, Index, text
 from sqlalchemy.sql import func
 import enum
-from app.db.session import Base
+from app.db.session import Base, utcnow
 
 
 class BetType(str, enum.Enum):
@@ -16,25 +16,37 @@ class BetOutcome(str, enum.Enum):
     LOST = "lost"
 
 
+# Partial index condition for settlement sweeps and odds pools, which only read open bets
+OPEN_BETS_ONLY = {"postgresql_where": text("settled = false"), "sqlite_where": text("settled = 0")}
+
+
 class FuturesBet(Base):
     __tablename__ = "futures_bets"
+    __table_args__ = (
+        Index("ix_futures_bets_user_id_created_at", "user_id", "created_at"),
+        Index("ix_futures_bets_open_expires_at", "expires_at", **OPEN_BETS_ONLY),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     bet_type = Column(Enum(BetType), nullable=False)
     target_strain_id = Column(Integer, ForeignKey("strains.id"), nullable=False, index=True)
     prediction = Column(Text, nullable=False)
-    stake = Column(Float, nullable=False)
+    stake = Column(BigInteger, nullable=False)  # micro-coins
     odds = Column(Float, nullable=False)
-    potential_payout = Column(Float, nullable=False)
+    potential_payout = Column(BigInteger, nullable=False)  # micro-coins
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     settled = Column(Boolean, default=False, nullable=False)
     outcome = Column(Enum(BetOutcome), default=BetOutcome.PENDING, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
 
 
 class HeadToHeadBet(Base):
     __tablename__ = "head_to_head_bets"
+    __table_args__ = (
+        Index("ix_head_to_head_bets_user_id_created_at", "user_id", "created_at"),
+        Index("ix_head_to_head_bets_open_expires_at", "expires_at", **OPEN_BETS_ONLY),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -42,26 +54,38 @@ class HeadToHeadBet(Base):
     strain_b_id = Column(Integer, ForeignKey("strains.id"), nullable=False)
     metric = Column(String(50), nullable=False)
     prediction = Column(String(50), nullable=False)
-    stake = Column(Float, nullable=False)
+    stake = Column(BigInteger, nullable=False)  # micro-coins
     odds = Column(Float, nullable=False)
-    potential_payout = Column(Float, nullable=False)
+    potential_payout = Column(BigInteger, nullable=False)  # micro-coins
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     settled = Column(Boolean, default=False, nullable=False)
     outcome = Column(Enum(BetOutcome), default=BetOutcome.PENDING, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
 
 
 class PropBet(Base):
     __tablename__ = "prop_bets"
+    __table_args__ = (
+        Index("ix_prop_bets_user_id_created_at", "user_id", "created_at"),
+        Index("ix_prop_bets_open_expires_at", "expires_at", **OPEN_BETS_ONLY),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     bet_description = Column(Text, nullable=False)
     bet_type = Column(String(50), nullable=False)
-    stake = Column(Float, nullable=False)
+    stake = Column(BigInteger, nullable=False)  # micro-coins
     odds = Column(Float, nullable=False)
-    potential_payout = Column(Float, nullable=False)
+    potential_payout = Column(BigInteger, nullable=False)  # micro-coins
     expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     settled = Column(Boolean, default=False, nullable=False)
     outcome = Column(Enum(BetOutcome), default=BetOutcome.PENDING, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+
+
+# Bet kind as used in API responses and settlement -> model
+BET_MODELS = {
+    "futures": FuturesBet,
+    "head_to_head": HeadToHeadBet,
+    "prop": PropBet
+}
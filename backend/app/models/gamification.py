@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -25,8 +25,29 @@ class UserAchievement(Base):
     unlocked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+class AchievementProgress(Base):
+    """Per-user counters that achievement criteria are evaluated against."""
+    __tablename__ = "achievement_progress"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    trades_count = Column(Integer, default=0, nullable=False)
+    profit_streak = Column(Integer, default=0, nullable=False)
+    best_profit_streak = Column(Integer, default=0, nullable=False)
+    futures_wins = Column(Integer, default=0, nullable=False)
+    best_won_odds = Column(Float, default=0.0, nullable=False)
+    peak_balance = Column(Float, default=0.0, nullable=False)
+    max_trade_value = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 class Leaderboard(Base):
     __tablename__ = "leaderboards"
+    # One index per ranking, each carrying user_id so the join key comes from the index
+    __table_args__ = (
+        Index("ix_leaderboards_period_weekly_profit", "period", "weekly_profit", postgresql_include=["user_id"]),
+        Index("ix_leaderboards_period_all_time_profit", "period", "all_time_profit", postgresql_include=["user_id"]),
+        Index("ix_leaderboards_period_prediction_accuracy", "period", "prediction_accuracy", postgresql_include=["user_id"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -34,6 +55,6 @@ class Leaderboard(Base):
     all_time_profit = Column(Float, default=0.0, nullable=False)
     prediction_accuracy = Column(Float, default=0.0, nullable=False)
     rank = Column(Integer, nullable=True)
-    period = Column(String(20), nullable=False, index=True)
+    period = Column(String(20), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
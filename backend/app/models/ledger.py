@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class LedgerEntry(Base):
+    """
+    One WeedCoin movement. Rows are only ever inserted.
+
+    A user's balance is ``users.weedcoins_balance`` (the compacted snapshot)
+    plus every entry after ``users.ledger_through_id``.
+    """
+    __tablename__ = "weedcoin_ledger"
+    __table_args__ = (Index("ix_weedcoin_ledger_user_id_id", "user_id", "id"),)
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount = Column(BigInteger, nullable=False)  # micro-coins; positive credits, negative debits
+    reason = Column(String(30), nullable=False)
+    reference = Column(String(64), nullable=True)  # e.g. "trade:42", "futures:7"
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
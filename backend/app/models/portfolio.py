@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, Float, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -11,7 +11,7 @@ class Portfolio(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     strain_id = Column(Integer, ForeignKey("strains.id"), nullable=False, index=True)
     shares_owned = Column(Float, nullable=False, default=0.0)
-    avg_buy_price = Column(Float, nullable=False)
-    total_invested = Column(Float, nullable=False, default=0.0)
+    avg_buy_price = Column(BigInteger, nullable=False)  # micro-coins
+    total_invested = Column(BigInteger, nullable=False, default=0)  # micro-coins
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
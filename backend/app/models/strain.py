@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -9,8 +9,8 @@ class Strain(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), unique=True, index=True, nullable=False)
     slug = Column(String(255), unique=True, index=True, nullable=False)
-    current_price = Column(Float, nullable=False)
-    base_price = Column(Float, nullable=False)
+    current_price = Column(BigInteger, nullable=False)  # micro-coins
+    base_price = Column(BigInteger, nullable=False)  # micro-coins
     popularity_score = Column(Float, default=0.0, nullable=False)
     volatility_score = Column(Float, default=0.0, nullable=False)
     favorite_count = Column(Integer, default=0, nullable=False)
@@ -21,10 +21,13 @@ class Strain(Base):
 
 class PriceHistory(Base):
     __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_strain_id_timestamp", "strain_id", "timestamp", postgresql_include=["price"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    strain_id = Column(Integer, ForeignKey("strains.id"), nullable=False, index=True)
-    price = Column(Float, nullable=False)
+    strain_id = Column(Integer, ForeignKey("strains.id"), nullable=False)
+    price = Column(BigInteger, nullable=False)  # micro-coins
     volume = Column(Integer, default=0, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.sql import func
 import enum
-from app.db.session import Base
+from app.db.session import Base, utcnow
 
 
 class TradeType(str, enum.Enum):
@@ -23,15 +23,16 @@ class OrderStatus(str, enum.Enum):
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (Index("ix_trades_user_id_timestamp_id", "user_id", "timestamp", "id"),)
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     strain_id = Column(Integer, ForeignKey("strains.id"), nullable=False, index=True)
     type = Column(Enum(TradeType), nullable=False)
     shares = Column(Float, nullable=False)
-    price = Column(Float, nullable=False)
-    total_cost = Column(Float, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    price = Column(BigInteger, nullable=False)  # micro-coins
+    total_cost = Column(BigInteger, nullable=False)  # micro-coins
+    timestamp = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False, index=True)
 
 
 class TradeOrder(Base):
@@ -43,7 +44,7 @@ class TradeOrder(Base):
     order_type = Column(Enum(OrderType), nullable=False)
     trade_type = Column(Enum(TradeType), nullable=False)
     shares = Column(Float, nullable=False)
-    target_price = Column(Float, nullable=True)
+    target_price = Column(BigInteger, nullable=True)  # micro-coins
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     executed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -10,7 +10,10 @@ class User(Base):
     email = Column(String(320), unique=True, index=True, nullable=False)
     username = Column(String(50), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
-    weedcoins_balance = Column(Float, default=10000.0, nullable=False)
+    # Balance as of the last ledger compaction; see app.services.ledger for the live balance
+    weedcoins_balance = Column(BigInteger, default=0, nullable=False)
+    ledger_through_id = Column(BigInteger, default=0, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    is_admin = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
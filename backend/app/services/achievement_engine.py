@@ -0,0 +1,226 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app.core import events
+from app.core.money import from_micros
+from app.models.gamification import Achievement, UserAchievement, AchievementProgress
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+# Achievement criteria type -> progress counter it is measured against.
+# Every counter only ever grows, so an achievement is earned exactly when
+# an update moves its counter from below the threshold to at or above it.
+# "hold_days" and "parlay_wins" have no event source yet and are not awarded.
+CRITERIA_PROGRESS = {
+    "trades_count": "trades_count",
+    "consecutive_wins": "best_profit_streak",
+    "futures_wins": "futures_wins",
+    "high_odds_win": "best_won_odds",
+    "balance": "peak_balance",
+    "trade_value": "max_trade_value"
+}
+
+PROGRESS_DEFAULTS = {
+    "trades_count": 0,
+    "profit_streak": 0,
+    "best_profit_streak": 0,
+    "futures_wins": 0,
+    "best_won_odds": 0.0,
+    "peak_balance": 0.0,
+    "max_trade_value": 0.0
+}
+
+# INSERT ... ON CONFLICT DO NOTHING of the databases that have it; others fall back to catching IntegrityError
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+DEFINITIONS_TTL_SECONDS = 300
+
+
+class AchievementEvaluator:
+    """
+    Applies trade and settlement events to a user's progress counters.
+
+    Works on any object exposing the progress attributes (an
+    ``AchievementProgress`` row, or a plain object in benchmarks) and does
+    constant work per event regardless of the user's history.
+    """
+
+    def __init__(self, achievements: Iterable[Tuple[int, str, float]]):
+        """
+        Args:
+            achievements: (achievement_id, criteria_type, criteria_value) tuples
+        """
+        self.thresholds: Dict[str, List[Tuple[float, int]]] = {}
+        for achievement_id, criteria_type, criteria_value in achievements:
+            progress_field = CRITERIA_PROGRESS.get(criteria_type)
+            if progress_field is not None:
+                self.thresholds.setdefault(progress_field, []).append((criteria_value, achievement_id))
+
+    def apply_trade(
+        self,
+        progress,
+        trade_value: float,
+        realized_profit: Optional[float] = None,
+        balance: Optional[float] = None
+    ) -> List[int]:
+        """
+        Record an executed trade.
+
+        Args:
+            progress: The user's progress counters
+            trade_value: Total value of the trade
+            realized_profit: Profit of a sell against the average buy price, None for buys
+            balance: WeedCoin balance after the trade
+
+        Returns:
+            IDs of achievements unlocked by this trade
+        """
+        unlocked = []
+        self._advance(progress, "trades_count", progress.trades_count + 1, unlocked)
+        self._advance(progress, "max_trade_value", trade_value, unlocked)
+
+        if realized_profit is not None:
+            progress.profit_streak = progress.profit_streak + 1 if realized_profit > 0 else 0
+            self._advance(progress, "best_profit_streak", progress.profit_streak, unlocked)
+
+        if balance is not None:
+            self._advance(progress, "peak_balance", balance, unlocked)
+
+        return unlocked
+
+    def apply_settlement(
+        self,
+        progress,
+        kind: str,
+        won: bool,
+        odds: float,
+        balance: Optional[float] = None
+    ) -> List[int]:
+        """
+        Record a settled bet.
+
+        Returns:
+            IDs of achievements unlocked by this settlement
+        """
+        unlocked = []
+        if won:
+            if kind == "futures":
+                self._advance(progress, "futures_wins", progress.futures_wins + 1, unlocked)
+            self._advance(progress, "best_won_odds", odds, unlocked)
+
+        if balance is not None:
+            self._advance(progress, "peak_balance", balance, unlocked)
+
+        return unlocked
+
+    def _advance(self, progress, field: str, value, unlocked: List[int]):
+        previous = getattr(progress, field)
+        if value <= previous:
+            return
+
+        setattr(progress, field, value)
+        for threshold, achievement_id in self.thresholds.get(field, ()):
+            if previous < threshold <= value:
+                unlocked.append(achievement_id)
+
+
+_evaluator: Optional[AchievementEvaluator] = None
+_evaluator_loaded_at = 0.0
+_evaluator_lock = threading.Lock()
+
+
+def get_evaluator(db: Session) -> AchievementEvaluator:
+    """Get the evaluator for the current achievement definitions (cached per process)."""
+    global _evaluator, _evaluator_loaded_at
+    if _evaluator is None or time.monotonic() - _evaluator_loaded_at > DEFINITIONS_TTL_SECONDS:
+        with _evaluator_lock:
+            definitions = db.query(Achievement.id, Achievement.criteria_type, Achievement.criteria_value).all()
+            _evaluator = AchievementEvaluator(definitions)
+            _evaluator_loaded_at = time.monotonic()
+    return _evaluator
+
+
+class AchievementEngine:
+    """Awards achievements from trade and settlement events."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def on_trade_executed(self, payload: Dict) -> List[int]:
+        """Update progress for an executed trade and award any achievements it unlocks."""
+        progress = self._get_progress(payload["user_id"])
+        # Payload amounts are micro-coins; criteria are set in WeedCoins
+        unlocked = get_evaluator(self.db).apply_trade(
+            progress,
+            trade_value=from_micros(payload["trade_value"]),
+            realized_profit=from_micros(payload.get("realized_profit")),
+            balance=from_micros(payload.get("balance"))
+        )
+        return self._award(payload["user_id"], unlocked)
+
+    def on_bet_settled(self, payload: Dict) -> List[int]:
+        """Update progress for a settled bet and award any achievements it unlocks."""
+        progress = self._get_progress(payload["user_id"])
+        unlocked = get_evaluator(self.db).apply_settlement(
+            progress,
+            kind=payload["kind"],
+            won=payload["won"],
+            odds=payload["odds"],
+            balance=from_micros(payload.get("balance"))
+        )
+        return self._award(payload["user_id"], unlocked)
+
+    def _get_progress(self, user_id: int) -> AchievementProgress:
+        # Row lock serializes concurrent events for the same user
+        locked = self.db.query(AchievementProgress).filter(
+            AchievementProgress.user_id == user_id
+        ).with_for_update().populate_existing()
+
+        progress = locked.first()
+        if progress is None:
+            # A missing row cannot be locked, so two first events could both
+            # add one; create it race-free, then lock whichever insert won
+            dialect_insert = DIALECT_INSERTS.get(self.db.get_bind().dialect.name)
+            if dialect_insert is not None:
+                self.db.execute(
+                    dialect_insert(AchievementProgress).values(user_id=user_id, **PROGRESS_DEFAULTS)
+                    .on_conflict_do_nothing(index_elements=[AchievementProgress.user_id])
+                )
+            else:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(insert(AchievementProgress).values(user_id=user_id, **PROGRESS_DEFAULTS))
+                except IntegrityError:
+                    # Created by a concurrent event
+                    pass
+            progress = locked.one()
+
+        return progress
+
+    def _award(self, user_id: int, achievement_ids: List[int]) -> List[int]:
+        awarded = []
+        for achievement_id in achievement_ids:
+            try:
+                with self.db.begin_nested():
+                    self.db.add(UserAchievement(user_id=user_id, achievement_id=achievement_id))
+                awarded.append(achievement_id)
+            except IntegrityError:
+                # Already unlocked
+                pass
+
+        self.db.commit()
+        return awarded
+
+
+def handle_trade_executed(db: Session, payload: Dict):
+    AchievementEngine(db).on_trade_executed(payload)
+
+
+def handle_bet_settled(db: Session, payload: Dict):
+    AchievementEngine(db).on_bet_settled(payload)
+
+
+events.subscribe(events.TRADE_EXECUTED, handle_trade_executed)
+events.subscribe(events.BET_SETTLED, handle_bet_settled)
@@ -1,8 +1,40 @@
 from sqlalchemy.orm import Session
-from app.models.user import User
-from app.models.bet import FuturesBet, HeadToHeadBet, PropBet, BetType, BetOutcome
-from typing import Dict
+from sqlalchemy import select, update, union_all, literal, null, cast, tuple_, desc, Integer, String, Text
+from app.models.bet import FuturesBet, HeadToHeadBet, PropBet, BetType, BetOutcome, BET_MODELS
+from app.core import events
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.odds_engine import odds_engine, futures_market, head_to_head_market, prop_market, market_for_bet
+from app.services.settlement_scheduler import settlement_scheduler
+from app.services.exposure_tracker import exposure_tracker
+from app.services.ledger import Ledger
+from app.core import money
+from typing import Dict, Optional
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Type-specific columns of the unified bet timeline, NULL where a bet kind lacks them
+HISTORY_DETAIL_COLUMNS = {
+    "bet_type": String,
+    "target_strain_id": Integer,
+    "strain_a_id": Integer,
+    "strain_b_id": Integer,
+    "metric": String,
+    "prediction": Text,
+    "bet_description": Text
+}
+
+HISTORY_FIELDS = {
+    "futures": ("bet_type", "target_strain_id", "prediction"),
+    "head_to_head": ("strain_a_id", "strain_b_id", "metric", "prediction"),
+    "prop": ("bet_description", "bet_type")
+}
+
+HISTORY_COMMON_FIELDS = (
+    "stake", "odds", "potential_payout", "expires_at", "settled", "outcome", "created_at"
+)
 
 
 class BettingEngine:
@@ -10,6 +42,7 @@ class BettingEngine:
     
     def __init__(self, db: Session):
         self.db = db
+        self.ledger = Ledger(db)
     
     def place_futures_bet(
         self,
@@ -17,40 +50,53 @@ class BettingEngine:
         bet_type: BetType,
         target_strain_id: int,
         prediction: str,
-        stake: float,
-        odds: float,
-        expires_at: datetime
+        stake: int,
+        expires_at: datetime,
+        min_odds: Optional[float] = None
     ) -> Dict:
-        """Place a futures bet."""
+        """Place a futures bet at the current server-side odds."""
         if stake <= 0:
             raise ValueError("Stake must be greater than 0")
         
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        # Fail fast before touching the odds pool; the debit re-checks under lock
+        balance = self.ledger.balance(user_id)
+        if balance is None:
             raise ValueError("User not found")
         
-        if user.weedcoins_balance < stake:
+        if balance < stake:
             raise ValueError("Insufficient WeedCoins balance")
         
-        # Deduct stake
-        user.weedcoins_balance -= stake
-        
-        # Calculate potential payout
-        potential_payout = stake * odds
-        
-        # Create bet
-        bet = FuturesBet(
-            user_id=user_id,
-            bet_type=bet_type,
-            target_strain_id=target_strain_id,
-            prediction=prediction,
-            stake=stake,
-            odds=odds,
-            potential_payout=potential_payout,
-            expires_at=expires_at
-        )
-        self.db.add(bet)
-        self.db.commit()
+        # Lock odds and add the stake to the market pool
+        market, outcome = futures_market(bet_type, target_strain_id, prediction)
+        odds = odds_engine.lock_odds(self.db, market, outcome, stake, min_odds)
+        
+        try:
+            # Calculate potential payout
+            potential_payout = money.mul(stake, odds)
+            
+            # Create bet
+            bet = FuturesBet(
+                user_id=user_id,
+                bet_type=bet_type,
+                target_strain_id=target_strain_id,
+                prediction=prediction,
+                stake=stake,
+                odds=odds,
+                potential_payout=potential_payout,
+                expires_at=expires_at
+            )
+            self.db.add(bet)
+            self.db.flush()
+            
+            # Deduct stake
+            new_balance = self.ledger.debit(user_id, stake, "bet_stake", f"futures:{bet.id}")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            odds_engine.release(market, outcome, stake)
+            raise
+        
+        self._on_bet_placed("futures", bet)
         
         return {
             "bet_id": bet.id,
@@ -58,7 +104,7 @@ class BettingEngine:
             "stake": stake,
             "odds": odds,
             "potential_payout": potential_payout,
-            "new_balance": user.weedcoins_balance
+            "new_balance": new_balance
         }
     
     def place_head_to_head_bet(
@@ -68,41 +114,54 @@ class BettingEngine:
         strain_b_id: int,
         metric: str,
         prediction: str,
-        stake: float,
-        odds: float,
-        expires_at: datetime
+        stake: int,
+        expires_at: datetime,
+        min_odds: Optional[float] = None
     ) -> Dict:
-        """Place a head-to-head bet."""
+        """Place a head-to-head bet at the current server-side odds."""
         if stake <= 0:
             raise ValueError("Stake must be greater than 0")
         
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        # Fail fast before touching the odds pool; the debit re-checks under lock
+        balance = self.ledger.balance(user_id)
+        if balance is None:
             raise ValueError("User not found")
         
-        if user.weedcoins_balance < stake:
+        if balance < stake:
             raise ValueError("Insufficient WeedCoins balance")
         
-        # Deduct stake
-        user.weedcoins_balance -= stake
-        
-        # Calculate potential payout
-        potential_payout = stake * odds
-        
-        # Create bet
-        bet = HeadToHeadBet(
-            user_id=user_id,
-            strain_a_id=strain_a_id,
-            strain_b_id=strain_b_id,
-            metric=metric,
-            prediction=prediction,
-            stake=stake,
-            odds=odds,
-            potential_payout=potential_payout,
-            expires_at=expires_at
-        )
-        self.db.add(bet)
-        self.db.commit()
+        # Lock odds and add the stake to the market pool
+        market, outcome = head_to_head_market(strain_a_id, strain_b_id, metric, prediction)
+        odds = odds_engine.lock_odds(self.db, market, outcome, stake, min_odds)
+        
+        try:
+            # Calculate potential payout
+            potential_payout = money.mul(stake, odds)
+            
+            # Create bet
+            bet = HeadToHeadBet(
+                user_id=user_id,
+                strain_a_id=strain_a_id,
+                strain_b_id=strain_b_id,
+                metric=metric,
+                prediction=prediction,
+                stake=stake,
+                odds=odds,
+                potential_payout=potential_payout,
+                expires_at=expires_at
+            )
+            self.db.add(bet)
+            self.db.flush()
+            
+            # Deduct stake
+            new_balance = self.ledger.debit(user_id, stake, "bet_stake", f"head_to_head:{bet.id}")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            odds_engine.release(market, outcome, stake)
+            raise
+        
+        self._on_bet_placed("head_to_head", bet)
         
         return {
             "bet_id": bet.id,
@@ -110,7 +169,7 @@ class BettingEngine:
             "stake": stake,
             "odds": odds,
             "potential_payout": potential_payout,
-            "new_balance": user.weedcoins_balance
+            "new_balance": new_balance
         }
     
     def place_prop_bet(
@@ -118,39 +177,52 @@ class BettingEngine:
         user_id: int,
         bet_description: str,
         bet_type: str,
-        stake: float,
-        odds: float,
-        expires_at: datetime
+        stake: int,
+        expires_at: datetime,
+        min_odds: Optional[float] = None
     ) -> Dict:
-        """Place a proposition bet."""
+        """Place a proposition bet at the current server-side odds."""
         if stake <= 0:
             raise ValueError("Stake must be greater than 0")
         
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        # Fail fast before touching the odds pool; the debit re-checks under lock
+        balance = self.ledger.balance(user_id)
+        if balance is None:
             raise ValueError("User not found")
         
-        if user.weedcoins_balance < stake:
+        if balance < stake:
             raise ValueError("Insufficient WeedCoins balance")
         
-        # Deduct stake
-        user.weedcoins_balance -= stake
-        
-        # Calculate potential payout
-        potential_payout = stake * odds
-        
-        # Create bet
-        bet = PropBet(
-            user_id=user_id,
-            bet_description=bet_description,
-            bet_type=bet_type,
-            stake=stake,
-            odds=odds,
-            potential_payout=potential_payout,
-            expires_at=expires_at
-        )
-        self.db.add(bet)
-        self.db.commit()
+        # Lock odds and add the stake to the market pool
+        market, outcome = prop_market(bet_type, bet_description)
+        odds = odds_engine.lock_odds(self.db, market, outcome, stake, min_odds)
+        
+        try:
+            # Calculate potential payout
+            potential_payout = money.mul(stake, odds)
+            
+            # Create bet
+            bet = PropBet(
+                user_id=user_id,
+                bet_description=bet_description,
+                bet_type=bet_type,
+                stake=stake,
+                odds=odds,
+                potential_payout=potential_payout,
+                expires_at=expires_at
+            )
+            self.db.add(bet)
+            self.db.flush()
+            
+            # Deduct stake
+            new_balance = self.ledger.debit(user_id, stake, "bet_stake", f"prop:{bet.id}")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            odds_engine.release(market, outcome, stake)
+            raise
+        
+        self._on_bet_placed("prop", bet)
         
         return {
             "bet_id": bet.id,
@@ -158,41 +230,164 @@ class BettingEngine:
             "stake": stake,
             "odds": odds,
             "potential_payout": potential_payout,
-            "new_balance": user.weedcoins_balance
+            "new_balance": new_balance
         }
     
     def settle_bet(self, bet_id: int, bet_type: str, won: bool) -> Dict:
         """Settle a bet and distribute winnings if applicable."""
-        bet_model = {
-            "futures": FuturesBet,
-            "head_to_head": HeadToHeadBet,
-            "prop": PropBet
-        }.get(bet_type)
+        bet_model = BET_MODELS.get(bet_type)
         
         if not bet_model:
             raise ValueError("Invalid bet type")
         
-        bet = self.db.query(bet_model).filter(bet_model.id == bet_id).first()
+        # Claim the bet and mark it settled in one statement, so when the
+        # sweep and settle_due_bets_task race for it only one of them pays out
+        bet = self.db.scalars(
+            update(bet_model).where(
+                bet_model.id == bet_id, bet_model.settled == False
+            ).values(
+                settled=True, outcome=BetOutcome.WON if won else BetOutcome.LOST
+            ).returning(bet_model),
+            execution_options={"populate_existing": True}
+        ).first()
         if not bet:
-            raise ValueError("Bet not found")
-        
-        if bet.settled:
+            self.db.rollback()
+            if self.db.get(bet_model, bet_id) is None:
+                raise ValueError("Bet not found")
             raise ValueError("Bet already settled")
         
-        # Mark as settled
-        bet.settled = True
-        bet.outcome = BetOutcome.WON if won else BetOutcome.LOST
-        
         # If won, add payout to user balance
+        new_balance = None
         if won:
-            user = self.db.query(User).filter(User.id == bet.user_id).first()
-            if user:
-                user.weedcoins_balance += bet.potential_payout
+            new_balance = self.ledger.credit(bet.user_id, bet.potential_payout, "bet_payout", f"{bet_type}:{bet_id}")
         
         self.db.commit()
         
-        return {
+        # The market no longer carries this stake, nor the house its payout
+        odds_engine.release(*market_for_bet(bet_type, bet), bet.stake)
+        try:
+            exposure_tracker.release_bet(bet_type, bet)
+        except Exception:
+            logger.exception("Could not release exposure for %s bet %s", bet_type, bet_id)
+        
+        result = {
             "bet_id": bet_id,
             "outcome": "won" if won else "lost",
             "payout": bet.potential_payout if won else 0
         }
+        
+        events.publish(events.BET_SETTLED, self.db, {
+            "user_id": bet.user_id,
+            "bet_id": bet_id,
+            "kind": bet_type,
+            "won": won,
+            "odds": bet.odds,
+            "payout": result["payout"],
+            "balance": new_balance
+        })
+        
+        return result
+    
+    def _on_bet_placed(self, kind: str, bet):
+        """Queue a committed bet for settlement and add it to house exposure."""
+        try:
+            settlement_scheduler.schedule(kind, bet.id, bet.expires_at)
+        except Exception:
+            # The fallback sweep in settle_expired_bets_task still picks it up
+            logger.exception("Could not schedule settlement for %s bet %s", kind, bet.id)
+        
+        try:
+            exposure_tracker.record_bet(kind, bet)
+        except Exception:
+            logger.exception("Could not record exposure for %s bet %s", kind, bet.id)
+    
+    def get_bet_history(self, user_id: int, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Get a user's bets across all bet types, newest first.
+        
+        Pages are keyed on (created_at, kind, id) rather than an offset, so each
+        branch of the UNION ALL is a bounded range scan on its
+        (user_id, created_at) index no matter how deep the page is.
+        
+        Args:
+            user_id: User ID
+            limit: Maximum number of bets to return
+            cursor: ``next_cursor`` from the previous page, if any
+        
+        Returns:
+            Dict with the bets on this page and the cursor for the next one
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None and (len(position) != 3 or position[1] not in BET_MODELS):
+            raise ValueError("Invalid cursor")
+        
+        branches = [
+            self._bet_history_branch(model, kind, user_id, position, limit + 1)
+            for kind, model in BET_MODELS.items()
+        ]
+        timeline = union_all(*branches).subquery()
+        rows = self.db.execute(
+            select(timeline).order_by(
+                desc(timeline.c.created_at), desc(timeline.c.kind), desc(timeline.c.id)
+            ).limit(limit + 1)
+        ).mappings().all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        bets = []
+        for row in rows:
+            bet = {"id": row["id"], "kind": row["kind"]}
+            for field in HISTORY_FIELDS[row["kind"]] + HISTORY_COMMON_FIELDS:
+                bet[field] = row[field]
+            if row["kind"] == "futures":
+                # The Enum column stores member names, which the cast to String passes through
+                bet["bet_type"] = BetType[bet["bet_type"]].value
+            bets.append(bet)
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(last["created_at"], last["kind"], last["id"])
+        
+        return {"bets": bets, "next_cursor": next_cursor}
+    
+    def _bet_history_branch(self, model, kind: str, user_id: int, position, limit: int):
+        """Build one bet table's slice of the unified timeline, already keyset-limited."""
+        detail_columns = []
+        for name, column_type in HISTORY_DETAIL_COLUMNS.items():
+            column = getattr(model, name, None)
+            if column is None:
+                detail_columns.append(cast(null(), column_type).label(name))
+            else:
+                detail_columns.append(cast(column, column_type).label(name))
+        
+        query = select(
+            literal(kind, String).label("kind"),
+            model.id.label("id"),
+            *detail_columns,
+            model.stake,
+            model.odds,
+            model.potential_payout,
+            model.expires_at,
+            model.settled,
+            model.outcome,
+            model.created_at
+        ).where(model.user_id == user_id)
+        
+        if position is not None:
+            created_at, cursor_kind, cursor_id = position
+            # kind is constant within a branch, so the (created_at, kind, id)
+            # row comparison collapses to a predicate on this table's own columns
+            if kind < cursor_kind:
+                query = query.where(model.created_at <= created_at)
+            elif kind == cursor_kind:
+                query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, cursor_id))
+            else:
+                query = query.where(model.created_at < created_at)
+        
+        branch = query.order_by(desc(model.created_at), desc(model.id)).limit(limit).subquery()
+        return select(branch)
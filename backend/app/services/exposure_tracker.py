@@ -0,0 +1,145 @@
+from sqlalchemy.orm import Session
+from app.core.redis import get_redis
+from app.models.bet import BET_MODELS
+from app.core.money import from_micros
+from typing import Dict, List
+from datetime import datetime, timezone
+
+EXPOSURE_BY_STRAIN_KEY = "exposure:by_strain"
+EXPOSURE_BY_BET_TYPE_KEY = "exposure:by_bet_type"
+EXPOSURE_BY_EXPIRY_KEY = "exposure:by_expiry"
+EXPOSURE_TOTALS_KEY = "exposure:totals"
+
+EXPOSURE_KEYS = (
+    EXPOSURE_BY_STRAIN_KEY,
+    EXPOSURE_BY_BET_TYPE_KEY,
+    EXPOSURE_BY_EXPIRY_KEY,
+    EXPOSURE_TOTALS_KEY
+)
+
+# HINCRBY KEYS[1] ARGV[1] ARGV[2], dropping the field once it is back to 0
+HINCRBY_DROP_ZERO_SCRIPT = """
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if value == 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+
+def _strain_ids(kind: str, bet) -> List[int]:
+    # A head-to-head bet is exposed to a move in either strain
+    if kind == "futures":
+        return [bet.target_strain_id]
+    if kind == "head_to_head":
+        return [bet.strain_a_id, bet.strain_b_id]
+    return []
+
+
+def _expiry_bucket(expires_at: datetime) -> str:
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.astimezone(timezone.utc)
+    return expires_at.strftime("%Y-%m-%d")
+
+
+class ExposureTracker:
+    """
+    Running totals of what the house owes on unsettled bets.
+
+    Potential payouts are kept in Redis hashes per strain, per bet type and
+    per expiry day, adjusted when a bet is placed or settled, so reading
+    the current exposure never touches the bet tables. Amounts are integer
+    micro-coins, so HINCRBY keeps them exact however many bets come and go.
+    Strain and expiry day fields are removed once nothing is owed on them,
+    so the hashes do not grow with every day that has passed.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+        self._hincrby_drop_zero = None
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    def record_bet(self, kind: str, bet):
+        """Add a newly placed bet's potential payout."""
+        self._apply(kind, bet, 1)
+
+    def release_bet(self, kind: str, bet):
+        """Remove a settled bet's potential payout."""
+        self._apply(kind, bet, -1)
+
+    def snapshot(self) -> Dict:
+        """Current house exposure broken down by strain, bet type and expiry day."""
+        pipe = self.redis.pipeline(transaction=False)
+        for key in EXPOSURE_KEYS:
+            pipe.hgetall(key)
+        by_strain, by_bet_type, by_expiry, totals = [
+            {field.decode(): int(value) for field, value in result.items()}
+            for result in pipe.execute()
+        ]
+
+        return {
+            "total_liability": from_micros(totals.get("liability", 0)),
+            "total_stakes": from_micros(totals.get("stakes", 0)),
+            "open_bets": totals.get("open_bets", 0),
+            "by_strain": {int(strain_id): from_micros(value) for strain_id, value in by_strain.items()},
+            "by_bet_type": {kind: from_micros(value) for kind, value in by_bet_type.items()},
+            "by_expiry": {day: from_micros(value) for day, value in sorted(by_expiry.items())}
+        }
+
+    def rebuild(self, db: Session, chunk_size: int = 1000) -> int:
+        """
+        Recompute every aggregate from unsettled bets.
+
+        Meant for reconciliation after Redis data loss; bets placed while
+        this runs may be counted twice or not at all.
+
+        Returns:
+            Number of unsettled bets counted
+        """
+        aggregates = {key: {} for key in EXPOSURE_KEYS}
+        counted = 0
+
+        def add(key: str, field, amount: int):
+            aggregates[key][field] = aggregates[key].get(field, 0) + amount
+
+        for kind, model in BET_MODELS.items():
+            for bet in db.query(model).filter(model.settled == False).yield_per(chunk_size):
+                for strain_id in _strain_ids(kind, bet):
+                    add(EXPOSURE_BY_STRAIN_KEY, strain_id, bet.potential_payout)
+                add(EXPOSURE_BY_BET_TYPE_KEY, kind, bet.potential_payout)
+                add(EXPOSURE_BY_EXPIRY_KEY, _expiry_bucket(bet.expires_at), bet.potential_payout)
+                add(EXPOSURE_TOTALS_KEY, "liability", bet.potential_payout)
+                add(EXPOSURE_TOTALS_KEY, "stakes", bet.stake)
+                add(EXPOSURE_TOTALS_KEY, "open_bets", 1)
+                counted += 1
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(*EXPOSURE_KEYS)
+        for key, values in aggregates.items():
+            if values:
+                pipe.hset(key, mapping=values)
+        pipe.execute()
+
+        return counted
+
+    def _apply(self, kind: str, bet, sign: int):
+        payout = sign * bet.potential_payout
+        if self._hincrby_drop_zero is None:
+            self._hincrby_drop_zero = self.redis.register_script(HINCRBY_DROP_ZERO_SCRIPT)
+
+        pipe = self.redis.pipeline(transaction=True)
+        for strain_id in _strain_ids(kind, bet):
+            self._hincrby_drop_zero(keys=[EXPOSURE_BY_STRAIN_KEY], args=[strain_id, payout], client=pipe)
+        pipe.hincrby(EXPOSURE_BY_BET_TYPE_KEY, kind, payout)
+        self._hincrby_drop_zero(keys=[EXPOSURE_BY_EXPIRY_KEY], args=[_expiry_bucket(bet.expires_at), payout], client=pipe)
+        pipe.hincrby(EXPOSURE_TOTALS_KEY, "liability", payout)
+        pipe.hincrby(EXPOSURE_TOTALS_KEY, "stakes", sign * bet.stake)
+        pipe.hincrby(EXPOSURE_TOTALS_KEY, "open_bets", sign)
+        pipe.execute()
+
+
+# Global exposure tracker instance
+exposure_tracker = ExposureTracker()
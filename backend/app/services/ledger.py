@@ -0,0 +1,147 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, select, update, func, text, bindparam, and_, cast
+from app.models.user import User
+from app.models.ledger import LedgerEntry
+from typing import List, Optional
+
+# First key of the two-key advisory locks serializing each user's ledger writes
+LEDGER_LOCK_NAMESPACE = 1
+
+
+def _total(amount):
+    # PostgreSQL sums bigints as numeric; cast back so balances stay ints
+    return cast(func.coalesce(func.sum(amount), 0), BigInteger)
+
+
+class Ledger:
+    """
+    Append-only WeedCoin ledger, in integer micro-coins.
+
+    Balance changes insert a ledger entry instead of updating the user row,
+    so trades and bets no longer queue on ``users`` row locks. Writes for
+    one user are serialized by a transaction-scoped advisory lock, taken
+    before the entry's id is allocated: per user, ids are then committed in
+    order, which is what lets compaction fold everything up to an id.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lock(self, user_id: int):
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(
+                text("SELECT pg_advisory_xact_lock(:namespace, :user_id)"),
+                {"namespace": LEDGER_LOCK_NAMESPACE, "user_id": user_id}
+            )
+
+    def balance(self, user_id: int) -> Optional[int]:
+        """
+        Current balance: the compacted snapshot plus entries written since.
+
+        Returns:
+            The balance, or None if the user does not exist
+        """
+        # One statement, so the snapshot and pending sum come from the same MVCC snapshot
+        row = self.db.execute(
+            select(
+                User.weedcoins_balance + _total(LedgerEntry.amount)
+            ).select_from(User).outerjoin(
+                LedgerEntry,
+                and_(LedgerEntry.user_id == User.id, LedgerEntry.id > User.ledger_through_id)
+            ).where(
+                User.id == user_id
+            ).group_by(User.id, User.weedcoins_balance)
+        ).first()
+        return row[0] if row else None
+
+    def _append(self, user_id: int, amount: int, reason: str, reference: Optional[str]):
+        self.db.add(LedgerEntry(user_id=user_id, amount=amount, reason=reason, reference=reference))
+        # Later balance reads in this transaction must see the entry
+        self.db.flush()
+
+    def debit(self, user_id: int, amount: int, reason: str, reference: Optional[str] = None) -> int:
+        """
+        Take ``amount`` from a user's balance in the caller's transaction.
+
+        Returns:
+            New balance
+
+        Raises:
+            ValueError: If the user does not exist or the balance is too low
+        """
+        self._lock(user_id)
+        balance = self.balance(user_id)
+        if balance is None:
+            raise ValueError("User not found")
+        if balance < amount:
+            raise ValueError("Insufficient WeedCoins balance")
+
+        self._append(user_id, -amount, reason, reference)
+        return balance - amount
+
+    def credit(self, user_id: int, amount: int, reason: str, reference: Optional[str] = None) -> int:
+        """
+        Add ``amount`` to a user's balance in the caller's transaction.
+
+        Returns:
+            New balance
+        """
+        self._lock(user_id)
+        balance = self.balance(user_id)
+        if balance is None:
+            raise ValueError("User not found")
+
+        self._append(user_id, amount, reason, reference)
+        return balance + amount
+
+    def reconstruct(self, user_id: int) -> int:
+        """Balance recomputed from every ledger entry, ignoring the snapshot."""
+        return self.db.scalar(
+            select(_total(LedgerEntry.amount)).where(LedgerEntry.user_id == user_id)
+        )
+
+    def compact(self, batch_size: int = 500) -> int:
+        """
+        Fold pending entries into the snapshots of up to ``batch_size`` users
+        and commit.
+
+        Returns:
+            Number of users compacted
+        """
+        user_ids: List[int] = sorted(self.db.scalars(
+            select(LedgerEntry.user_id).join(
+                User, User.id == LedgerEntry.user_id
+            ).where(
+                LedgerEntry.id > User.ledger_through_id
+            ).group_by(LedgerEntry.user_id).limit(batch_size)
+        ))
+        if not user_ids:
+            return 0
+
+        # Sorted lock order, so concurrent compactions cannot deadlock
+        for user_id in user_ids:
+            self._lock(user_id)
+
+        pending = self.db.execute(
+            select(
+                User.id,
+                User.weedcoins_balance + _total(LedgerEntry.amount),
+                func.max(LedgerEntry.id)
+            ).join(
+                LedgerEntry,
+                and_(LedgerEntry.user_id == User.id, LedgerEntry.id > User.ledger_through_id)
+            ).where(
+                User.id.in_(user_ids)
+            ).group_by(User.id, User.weedcoins_balance)
+        ).all()
+
+        users = User.__table__
+        self.db.execute(
+            update(users).where(users.c.id == bindparam("b_id")).values(
+                weedcoins_balance=bindparam("b_balance"),
+                ledger_through_id=bindparam("b_through")
+            ),
+            [{"b_id": user_id, "b_balance": balance, "b_through": through} for user_id, balance, through in pending]
+        )
+        self.db.commit()
+        return len(pending)
@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.models.user import User
 from app.models.strain import Strain, PriceHistory
 from app.models.portfolio import Portfolio
 from app.models.trade import Trade, TradeType
+from app.core import events, money
+from app.services.ledger import Ledger
 from typing import Dict, Optional
 from datetime import datetime
 
@@ -13,6 +14,7 @@ class MarketEngine:
     
     def __init__(self, db: Session):
         self.db = db
+        self.ledger = Ledger(db)
     
     def execute_market_buy(self, user_id: int, strain_id: int, shares: float) -> Dict:
         """
@@ -32,24 +34,12 @@ class MarketEngine:
         if shares <= 0:
             raise ValueError("Shares must be greater than 0")
         
-        # Get user and strain
-        user = self.db.query(User).filter(User.id == user_id).first()
         strain = self.db.query(Strain).filter(Strain.id == strain_id).first()
-        
-        if not user:
-            raise ValueError("User not found")
         if not strain:
             raise ValueError("Strain not found")
         
-        # Calculate total cost
-        total_cost = strain.current_price * shares
-        
-        # Check user balance
-        if user.weedcoins_balance < total_cost:
-            raise ValueError("Insufficient WeedCoins balance")
-        
-        # Deduct WeedCoins
-        user.weedcoins_balance -= total_cost
+        # Calculate total cost (prices and amounts are micro-coins)
+        total_cost = money.mul(strain.current_price, shares)
         
         # Update or create portfolio entry
         portfolio = self.db.query(Portfolio).filter(
@@ -62,7 +52,7 @@ class MarketEngine:
             total_shares = portfolio.shares_owned + shares
             total_invested = portfolio.total_invested + total_cost
             portfolio.shares_owned = total_shares
-            portfolio.avg_buy_price = total_invested / total_shares
+            portfolio.avg_buy_price = money.div(total_invested, total_shares)
             portfolio.total_invested = total_invested
         else:
             # Create new position
@@ -85,17 +75,37 @@ class MarketEngine:
             total_cost=total_cost
         )
         self.db.add(trade)
+        self.db.flush()
+        
+        # Deduct WeedCoins (checks the balance under the user's ledger lock)
+        try:
+            new_balance = self.ledger.debit(user_id, total_cost, "trade_buy", f"trade:{trade.id}")
+        except ValueError:
+            self.db.rollback()
+            raise
         
         self.db.commit()
         
-        return {
+        result = {
             "trade_id": trade.id,
             "type": "buy",
             "shares": shares,
             "price": strain.current_price,
             "total_cost": total_cost,
-            "new_balance": user.weedcoins_balance
+            "new_balance": new_balance
         }
+        
+        events.publish(events.TRADE_EXECUTED, self.db, {
+            "user_id": user_id,
+            "trade_id": result["trade_id"],
+            "strain_id": strain_id,
+            "type": "buy",
+            "trade_value": total_cost,
+            "realized_profit": None,
+            "balance": result["new_balance"]
+        })
+        
+        return result
     
     def execute_market_sell(self, user_id: int, strain_id: int, shares: float) -> Dict:
         """
@@ -115,30 +125,26 @@ class MarketEngine:
         if shares <= 0:
             raise ValueError("Shares must be greater than 0")
         
-        # Get user, strain, and portfolio
-        user = self.db.query(User).filter(User.id == user_id).first()
+        # Get strain and portfolio
         strain = self.db.query(Strain).filter(Strain.id == strain_id).first()
         portfolio = self.db.query(Portfolio).filter(
             Portfolio.user_id == user_id,
             Portfolio.strain_id == strain_id
         ).first()
         
-        if not user:
-            raise ValueError("User not found")
         if not strain:
             raise ValueError("Strain not found")
         if not portfolio or portfolio.shares_owned < shares:
             raise ValueError("Insufficient shares to sell")
         
         # Calculate proceeds
-        proceeds = strain.current_price * shares
-        
-        # Add WeedCoins
-        user.weedcoins_balance += proceeds
+        proceeds = money.mul(strain.current_price, shares)
+        cost_basis = money.mul(portfolio.avg_buy_price, shares)
+        realized_profit = proceeds - cost_basis
         
         # Update portfolio
         portfolio.shares_owned -= shares
-        portfolio.total_invested -= (portfolio.avg_buy_price * shares)
+        portfolio.total_invested -= cost_basis
         
         # Delete portfolio entry if no shares left
         if portfolio.shares_owned <= 0:
@@ -154,17 +160,33 @@ class MarketEngine:
             total_cost=proceeds
         )
         self.db.add(trade)
+        self.db.flush()
+        
+        # Add WeedCoins
+        new_balance = self.ledger.credit(user_id, proceeds, "trade_sell", f"trade:{trade.id}")
         
         self.db.commit()
         
-        return {
+        result = {
             "trade_id": trade.id,
             "type": "sell",
             "shares": shares,
             "price": strain.current_price,
             "proceeds": proceeds,
-            "new_balance": user.weedcoins_balance
+            "new_balance": new_balance
         }
+        
+        events.publish(events.TRADE_EXECUTED, self.db, {
+            "user_id": user_id,
+            "trade_id": result["trade_id"],
+            "strain_id": strain_id,
+            "type": "sell",
+            "trade_value": proceeds,
+            "realized_profit": realized_profit,
+            "balance": result["new_balance"]
+        })
+        
+        return result
     
     def calculate_portfolio_value(self, user_id: int) -> Dict:
         """
@@ -176,39 +198,39 @@ class MarketEngine:
         Returns:
             Dict with portfolio value breakdown
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
+        balance = self.ledger.balance(user_id)
+        if balance is None:
             raise ValueError("User not found")
         
-        # Get all holdings
-        portfolios = self.db.query(Portfolio).filter(Portfolio.user_id == user_id).all()
+        # Get all holdings with their strains in one query
+        rows = self.db.query(Portfolio, Strain).join(
+            Strain, Strain.id == Portfolio.strain_id
+        ).filter(Portfolio.user_id == user_id).all()
         
-        holdings_value = 0.0
+        holdings_value = 0
         holdings = []
         
-        for portfolio in portfolios:
-            strain = self.db.query(Strain).filter(Strain.id == portfolio.strain_id).first()
-            if strain:
-                current_value = strain.current_price * portfolio.shares_owned
-                profit_loss = current_value - portfolio.total_invested
-                profit_loss_pct = (profit_loss / portfolio.total_invested * 100) if portfolio.total_invested > 0 else 0
-                
-                holdings_value += current_value
-                holdings.append({
-                    "strain_id": strain.id,
-                    "strain_name": strain.name,
-                    "shares": portfolio.shares_owned,
-                    "avg_buy_price": portfolio.avg_buy_price,
-                    "current_price": strain.current_price,
-                    "current_value": current_value,
-                    "profit_loss": profit_loss,
-                    "profit_loss_pct": round(profit_loss_pct, 2)
-                })
-        
-        total_value = user.weedcoins_balance + holdings_value
+        for portfolio, strain in rows:
+            current_value = money.mul(strain.current_price, portfolio.shares_owned)
+            profit_loss = current_value - portfolio.total_invested
+            profit_loss_pct = (profit_loss / portfolio.total_invested * 100) if portfolio.total_invested > 0 else 0
+            
+            holdings_value += current_value
+            holdings.append({
+                "strain_id": strain.id,
+                "strain_name": strain.name,
+                "shares": portfolio.shares_owned,
+                "avg_buy_price": portfolio.avg_buy_price,
+                "current_price": strain.current_price,
+                "current_value": current_value,
+                "profit_loss": profit_loss,
+                "profit_loss_pct": round(profit_loss_pct, 2)
+            })
+        
+        total_value = balance + holdings_value
         
         return {
-            "weedcoins_balance": user.weedcoins_balance,
+            "weedcoins_balance": balance,
             "holdings_value": holdings_value,
             "total_value": total_value,
             "holdings": holdings
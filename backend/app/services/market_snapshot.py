@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, and_
+from app.core.config import settings
+from app.core.money import from_micros
+from app.core.redis import get_redis, get_async_redis
+from app.models.strain import Strain, PriceHistory
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import gzip
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "market:snapshot:{generation}"
+
+
+def page_field(skip: int, limit: int, encoding: str = "identity") -> str:
+    return f"{skip}:{limit}:{encoding}"
+
+
+def reference_prices_query(strain_ids: Optional[Iterable[int]] = None):
+    """
+    (strain_id, price) of each strain's oldest price in the last 24 hours,
+    the reference for its 24h change, in one query for all strains.
+    """
+    yesterday = datetime.utcnow() - timedelta(hours=24)
+    first_price_at = select(
+        PriceHistory.strain_id, func.min(PriceHistory.timestamp).label("timestamp")
+    ).where(
+        PriceHistory.timestamp >= yesterday
+    )
+    if strain_ids is not None:
+        first_price_at = first_price_at.where(PriceHistory.strain_id.in_(list(strain_ids)))
+    first_price_at = first_price_at.group_by(PriceHistory.strain_id).subquery()
+
+    return select(PriceHistory.strain_id, PriceHistory.price).join(
+        first_price_at,
+        and_(
+            PriceHistory.strain_id == first_price_at.c.strain_id,
+            PriceHistory.timestamp == first_price_at.c.timestamp
+        )
+    )
+
+
+def strain_rows(db: Session) -> List[Dict]:
+    """Every strain as served by /strains (prices in WeedCoins), with its 24h change."""
+    reference_prices = dict(db.execute(reference_prices_query()).all())
+
+    rows = []
+    for strain in db.scalars(select(Strain).order_by(Strain.id)):
+        old_price = reference_prices.get(strain.id)
+        change_24h = None
+        if old_price:
+            change_24h = round((strain.current_price - old_price) / old_price * 100, 2)
+        rows.append({
+            "id": strain.id,
+            "name": strain.name,
+            "slug": strain.slug,
+            "current_price": from_micros(strain.current_price),
+            "favorite_count": strain.favorite_count,
+            "pharmacy_count": strain.pharmacy_count,
+            "change_24h": change_24h
+        })
+    return rows
+
+
+class MarketSnapshot:
+    """
+    Immutable, pre-encoded strain listings, published once per data sync.
+
+    The sync task renders every page of /strains for the configured page
+    sizes to JSON bytes (and their gzip encoding) and stores them in a Redis
+    hash per strain cache generation. Workers load a generation's hash once
+    and then answer those pages with the stored bytes as-is; other page
+    sizes fall back to the strain cache.
+    """
+
+    def __init__(self, page_limits: List[int], ttl_seconds: int):
+        self.page_limits = page_limits
+        self.ttl_seconds = ttl_seconds
+        self._generation: Optional[int] = None
+        self._pages: Dict[str, bytes] = {}
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    def publish(self, db: Session, generation: int) -> int:
+        """
+        Render and store the snapshot for ``generation``.
+
+        Returns:
+            Number of pages rendered
+        """
+        rows = strain_rows(db)
+        pages: Dict[str, bytes] = {}
+        for limit in self.page_limits:
+            # The first page is rendered even when there are no strains
+            for skip in range(0, max(len(rows), 1), limit):
+                body = json.dumps(rows[skip:skip + limit], separators=(",", ":")).encode()
+                pages[page_field(skip, limit)] = body
+                pages[page_field(skip, limit, "gzip")] = gzip.compress(body, compresslevel=6, mtime=0)
+
+        key = SNAPSHOT_KEY.format(generation=generation)
+        pipe = get_redis().pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=pages)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+        return len(pages) // 2
+
+    async def page(self, generation: int, skip: int, limit: int, accepts_gzip: bool) -> Optional[Tuple[bytes, str]]:
+        """
+        Stored body and content encoding of a page, or None if it was not pre-rendered.
+        """
+        if limit not in self.page_limits or skip % limit:
+            return None
+
+        if generation != self._generation:
+            await self._load(generation)
+            if generation != self._generation:
+                return None
+
+        encoding = "gzip" if accepts_gzip else "identity"
+        body = self._pages.get(page_field(skip, limit, encoding))
+        if body is None:
+            # Past the last strain: the listing is an empty page
+            return b"[]", "identity"
+        return body, encoding
+
+    async def _load(self, generation: int):
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if generation == self._generation:
+                return
+            try:
+                raw = await get_async_redis().hgetall(SNAPSHOT_KEY.format(generation=generation))
+            except Exception:
+                logger.warning("Could not load market snapshot %s", generation, exc_info=True)
+                return
+            if not raw:
+                # Not published yet for this generation; retried on the next request
+                return
+            self._pages = {field.decode(): body for field, body in raw.items()}
+            self._generation = generation
+
+
+# Global market snapshot instance
+market_snapshot = MarketSnapshot(
+    page_limits=settings.MARKET_SNAPSHOT_PAGE_LIMITS,
+    ttl_seconds=settings.STRAIN_CACHE_TTL_SECONDS * 2
+)
@@ -0,0 +1,264 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.money import to_micros
+from app.db.session import SessionLocal
+from app.models.bet import FuturesBet, HeadToHeadBet, PropBet, BetType
+from typing import Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MarketKey = Tuple
+
+# The outcomes each kind of market can be backed on; head-to-head bets back
+# one of their two strain ids
+FUTURES_OUTCOMES = ("up", "down")
+PROP_OUTCOMES = ("yes", "no")
+HEAD_TO_HEAD_METRICS = tuple(bet_type.value for bet_type in BetType)
+
+
+def futures_market(
+    bet_type: BetType, target_strain_id: int, prediction: str, strict: bool = True
+) -> Tuple[MarketKey, str]:
+    """
+    Market key and outcome for a futures bet.
+
+    Raises:
+        ValueError: If ``strict`` and the prediction is not one of FUTURES_OUTCOMES
+    """
+    outcome = _normalize(prediction)
+    if strict:
+        _check_choice("Prediction", outcome, FUTURES_OUTCOMES)
+    return ("futures", BetType(bet_type).value, target_strain_id), outcome
+
+
+def head_to_head_market(
+    strain_a_id: int, strain_b_id: int, metric: str, prediction: str, strict: bool = True
+) -> Tuple[MarketKey, str]:
+    """
+    Market key and outcome for a head-to-head bet.
+
+    Raises:
+        ValueError: If ``strict`` and the metric is unknown or the prediction
+            is not one of the two strain ids
+    """
+    metric, outcome = _normalize(metric), _normalize(prediction)
+    if strict:
+        if strain_a_id == strain_b_id:
+            raise ValueError("A head-to-head bet needs two different strains")
+        _check_choice("Metric", metric, HEAD_TO_HEAD_METRICS)
+        _check_choice("Prediction", outcome, (str(strain_a_id), str(strain_b_id)))
+    return ("head_to_head", strain_a_id, strain_b_id, metric), outcome
+
+
+def prop_market(bet_type: str, bet_description: str, strict: bool = True) -> Tuple[MarketKey, str]:
+    """
+    Market key and outcome for a proposition bet; ``bet_type`` is the side backed.
+
+    Raises:
+        ValueError: If ``strict`` and ``bet_type`` is not one of PROP_OUTCOMES
+    """
+    outcome = _normalize(bet_type)
+    if strict:
+        _check_choice("Prop bet type", outcome, PROP_OUTCOMES)
+    return ("prop", _normalize(bet_description)), outcome
+
+
+def market_for_bet(kind: str, bet) -> Tuple[MarketKey, str]:
+    """Market key and outcome of an existing bet row, which may predate the outcome checks."""
+    if kind == "futures":
+        return futures_market(bet.bet_type, bet.target_strain_id, bet.prediction, strict=False)
+    if kind == "head_to_head":
+        return head_to_head_market(bet.strain_a_id, bet.strain_b_id, bet.metric, bet.prediction, strict=False)
+    return prop_market(bet.bet_type, bet.bet_description, strict=False)
+
+
+def _normalize(value: str) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _check_choice(field: str, value: str, choices: Tuple[str, ...]):
+    if value not in choices:
+        raise ValueError(f"{field} must be one of: {', '.join(choices)}")
+
+
+class MarketPool:
+    """Running stake totals (micro-coins) for one betting market."""
+
+    __slots__ = ("stakes", "total", "quotes")
+
+    def __init__(self):
+        self.stakes: Dict[str, int] = {}
+        self.total = 0
+        self.quotes: Dict[str, float] = {}
+
+
+class OddsEngine:
+    """
+    Parimutuel odds maker with in-memory market pools.
+
+    An outcome's implied probability is its share of the money staked in
+    its market, smoothed by a virtual seed stake on each side so that an
+    empty market quotes even odds. Odds are that probability inverted and
+    reduced by the house margin. Placing a bet is an O(1) update of the
+    pool, and quotes are memoized until the next bet lands in that market.
+
+    Pools are per process and are rebuilt from unsettled bets on first use
+    and every ``ODDS_POOL_REFRESH_SECONDS``, which folds in bets taken by
+    other workers. Only the first load runs on a request; later ones run in
+    a background thread, one at a time.
+    """
+
+    def __init__(
+        self,
+        margin: float = settings.ODDS_HOUSE_MARGIN,
+        seed_stake: int = to_micros(settings.ODDS_SEED_STAKE),
+        min_odds: float = settings.ODDS_MIN,
+        max_odds: float = settings.ODDS_MAX,
+        refresh_seconds: int = settings.ODDS_POOL_REFRESH_SECONDS
+    ):
+        self.margin = margin
+        self.seed_stake = seed_stake
+        self.min_odds = min_odds
+        self.max_odds = max_odds
+        self.refresh_seconds = refresh_seconds
+        self._pools: Dict[MarketKey, MarketPool] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+
+    def quote(self, db: Session, market: MarketKey, outcome: str) -> float:
+        """Current odds for an outcome, served from the quote cache when possible."""
+        self._ensure_loaded(db)
+        pool = self._pools.get(market)
+        if pool is not None:
+            cached = pool.quotes.get(outcome)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            pool = self._pools.setdefault(market, MarketPool())
+            return self._quote_locked(pool, outcome)
+
+    def lock_odds(
+        self,
+        db: Session,
+        market: MarketKey,
+        outcome: str,
+        stake: int,
+        min_odds: Optional[float] = None
+    ) -> float:
+        """
+        Quote an outcome and add the stake to its pool in one atomic step.
+
+        Args:
+            db: Session used to load pools on first use
+            market: Market key
+            outcome: Outcome being backed
+            stake: Amount staked, in micro-coins
+            min_odds: Reject the bet if the quote has fallen below this
+
+        Returns:
+            The odds the bet is locked at
+
+        Raises:
+            ValueError: If the quote is below ``min_odds``
+        """
+        self._ensure_loaded(db)
+        with self._lock:
+            pool = self._pools.setdefault(market, MarketPool())
+            odds = self._quote_locked(pool, outcome)
+            if min_odds is not None and odds < min_odds:
+                raise ValueError(f"Odds moved to {odds}, below requested minimum {min_odds}")
+
+            pool.stakes[outcome] = pool.stakes.get(outcome, 0) + stake
+            pool.total += stake
+            pool.quotes.clear()
+            return odds
+
+    def release(self, market: MarketKey, outcome: str, stake: int):
+        """Take a stake back out of its pool (failed placement or settlement)."""
+        with self._lock:
+            pool = self._pools.get(market)
+            if pool is None:
+                return
+
+            pool.stakes[outcome] = max(0, pool.stakes.get(outcome, 0) - stake)
+            pool.total = max(0, pool.total - stake)
+            pool.quotes.clear()
+
+    def load(self, db: Session):
+        """Rebuild every pool from the stakes of unsettled bets."""
+        pools: Dict[MarketKey, MarketPool] = {}
+
+        def add(market: MarketKey, outcome: str, stake: int):
+            pool = pools.setdefault(market, MarketPool())
+            pool.stakes[outcome] = pool.stakes.get(outcome, 0) + stake
+            pool.total += stake
+
+        for row in db.query(
+            FuturesBet.bet_type, FuturesBet.target_strain_id, FuturesBet.prediction, func.sum(FuturesBet.stake)
+        ).filter(FuturesBet.settled == False).group_by(
+            FuturesBet.bet_type, FuturesBet.target_strain_id, FuturesBet.prediction
+        ):
+            add(*futures_market(row[0], row[1], row[2], strict=False), int(row[3]))
+
+        for row in db.query(
+            HeadToHeadBet.strain_a_id, HeadToHeadBet.strain_b_id, HeadToHeadBet.metric,
+            HeadToHeadBet.prediction, func.sum(HeadToHeadBet.stake)
+        ).filter(HeadToHeadBet.settled == False).group_by(
+            HeadToHeadBet.strain_a_id, HeadToHeadBet.strain_b_id, HeadToHeadBet.metric, HeadToHeadBet.prediction
+        ):
+            add(*head_to_head_market(row[0], row[1], row[2], row[3], strict=False), int(row[4]))
+
+        for row in db.query(
+            PropBet.bet_type, PropBet.bet_description, func.sum(PropBet.stake)
+        ).filter(PropBet.settled == False).group_by(PropBet.bet_type, PropBet.bet_description):
+            add(*prop_market(row[0], row[1], strict=False), int(row[2]))
+
+        with self._lock:
+            self._pools = pools
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self, db: Session):
+        if self._loaded_at is None:
+            # First use: nothing can be quoted yet, so one caller loads and the rest wait
+            with self._load_lock:
+                if self._loaded_at is None:
+                    self.load(db)
+        elif time.monotonic() - self._loaded_at > self.refresh_seconds and self._load_lock.acquire(blocking=False):
+            # Stale: one caller starts a reload in the background, and quotes
+            # keep coming from the current pools until it swaps them in
+            threading.Thread(target=self._reload, name="odds-pool-reload", daemon=True).start()
+
+    def _reload(self):
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception:
+            logger.warning("Could not reload odds pools", exc_info=True)
+            # Retried after another refresh interval, not by the next request
+            self._loaded_at = time.monotonic()
+        finally:
+            db.close()
+            self._load_lock.release()
+
+    def _quote_locked(self, pool: MarketPool, outcome: str) -> float:
+        cached = pool.quotes.get(outcome)
+        if cached is not None:
+            return cached
+
+        backed = pool.stakes.get(outcome, 0) + self.seed_stake
+        implied_probability = backed / (pool.total + 2 * self.seed_stake)
+        odds = (1 - self.margin) / implied_probability
+        odds = round(min(self.max_odds, max(self.min_odds, odds)), 2)
+
+        pool.quotes[outcome] = odds
+        return odds
+
+
+# Global odds engine instance
+odds_engine = OddsEngine()
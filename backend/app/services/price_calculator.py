@@ -1,11 +1,12 @@
 from typing import Dict
+from app.core.money import to_micros
 
 
 class PriceCalculator:
     """Calculate strain stock prices based on market data."""
     
     @staticmethod
-    def calculate_stock_price(strain_data: Dict) -> float:
+    def calculate_stock_price(strain_data: Dict) -> int:
         """
         Calculate stock price using the formula:
         Stock Price = (Base Price Component) + (Popularity Component) + (Volatility Component)
@@ -17,7 +18,7 @@ class PriceCalculator:
                 - volatility_spread: 30-day price range (max - min)
         
         Returns:
-            Calculated stock price
+            Calculated stock price, in micro-coins
         """
         # Base Price Component
         avg_price = strain_data.get("avg_price_per_gram", 10.0)
@@ -46,7 +47,7 @@ class PriceCalculator:
         
         # Final Price
         price = base + popularity_bonus + volatility_modifier
-        return round(price, 2)
+        return to_micros(round(price, 2))
     
     @staticmethod
     def calculate_price_change_percentage(old_price: float, new_price: float) -> float:
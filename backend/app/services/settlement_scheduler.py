@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+from app.core.redis import get_redis
+from app.models.bet import BET_MODELS
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+
+EXPIRY_QUEUE_KEY = "settlement:expiries"
+
+
+def _timestamp(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class SettlementScheduler:
+    """
+    Time-ordered queue of pending bet expiries.
+
+    Unsettled bets live in a Redis sorted set as ``<kind>:<bet_id>`` scored
+    by their expiry time, so finding what is due is a single range read
+    that touches nothing when the queue head is still in the future.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        return self._redis or get_redis()
+
+    def schedule(self, kind: str, bet_id: int, expires_at: datetime):
+        """Queue a bet for settlement at its expiry time."""
+        self.redis.zadd(EXPIRY_QUEUE_KEY, {f"{kind}:{bet_id}": _timestamp(expires_at)})
+
+    def unschedule(self, bets: List[Tuple[str, int]]):
+        """Drop bets settled by other means from the queue."""
+        if bets:
+            self.redis.zrem(EXPIRY_QUEUE_KEY, *(f"{kind}:{bet_id}" for kind, bet_id in bets))
+
+    def claim_due(self, batch_size: int, now: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """
+        Claim up to ``batch_size`` bets whose expiry has passed.
+
+        A bet is claimed by whichever caller removes it from the queue, so
+        concurrent workers never settle the same bet twice.
+
+        Returns:
+            List of (kind, bet_id) tuples
+        """
+        now_ts = _timestamp(now or datetime.now(timezone.utc))
+        members = self.redis.zrangebyscore(EXPIRY_QUEUE_KEY, "-inf", now_ts, start=0, num=batch_size)
+        if not members:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for member in members:
+            pipe.zrem(EXPIRY_QUEUE_KEY, member)
+        removed = pipe.execute()
+
+        claimed = []
+        for member, was_removed in zip(members, removed):
+            if was_removed:
+                kind, bet_id = member.decode().split(":")
+                claimed.append((kind, int(bet_id)))
+        return claimed
+
+    def rebuild(self, db: Session, chunk_size: int = 1000) -> int:
+        """
+        Re-queue every unsettled bet from the database.
+
+        Scheduling is idempotent, so this can run on every worker start to
+        recover bets placed while Redis was unavailable.
+
+        Returns:
+            Number of bets queued
+        """
+        queued = 0
+        for kind, model in BET_MODELS.items():
+            pending = {}
+            rows = db.query(model.id, model.expires_at).filter(
+                model.settled == False
+            ).yield_per(chunk_size)
+            for bet_id, expires_at in rows:
+                pending[f"{kind}:{bet_id}"] = _timestamp(expires_at)
+                if len(pending) >= chunk_size:
+                    self.redis.zadd(EXPIRY_QUEUE_KEY, pending)
+                    queued += len(pending)
+                    pending = {}
+            if pending:
+                self.redis.zadd(EXPIRY_QUEUE_KEY, pending)
+                queued += len(pending)
+        return queued
+
+
+# Global settlement scheduler instance
+settlement_scheduler = SettlementScheduler()
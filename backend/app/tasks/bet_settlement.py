@@ -1,64 +1,152 @@
+from celery.signals import worker_ready
 from app.core.celery_app import celery_app
+from app.core.profiler import profiled
+from app.core.metrics import track_task
+from app.core.query_budget import track_queries
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.bet import FuturesBet, HeadToHeadBet, PropBet, BetOutcome
 from app.services.betting_engine import BettingEngine
-from datetime import datetime
+from app.services.settlement_scheduler import settlement_scheduler
+from app.services import achievement_engine  # noqa: F401  (registers event subscribers)
+from sqlalchemy import select
+from datetime import datetime, timedelta
+import random
+
+# SQL statements of one settle_bet transaction: bet, ledger credit, update,
+# plus the achievement checks run by BET_SETTLED subscribers
+STATEMENTS_PER_SETTLEMENT = 10
 
 
 @celery_app.task
+@profiled
 def settle_expired_bets_task():
     """
     Settle expired bets.
-    This task runs every hour.
+    This task runs every hour as a fallback sweep.
+    
+    Bets are normally settled within seconds of expiry by
+    settle_due_bets_task; this catches any that never made it into the
+    expiry queue.
+    """
+    with track_task("settle_expired_bets") as run, track_queries("settle_expired_bets") as queries:
+        db = SessionLocal()
+        engine = BettingEngine(db)
     
+        try:
+            # Bets due within the last poll window are still settle_due_bets_task's
+            overdue_at = datetime.utcnow() - timedelta(seconds=settings.SETTLEMENT_POLL_SECONDS * 2)
+
+            # Only the ids: settle_bet loads each bet again in its own
+            # transaction, after the previous commit expired everything
+            expired = []
+            for kind, model in (("futures", FuturesBet), ("head_to_head", HeadToHeadBet), ("prop", PropBet)):
+                expired.extend((kind, bet_id) for bet_id in db.scalars(
+                    select(model.id).where(model.expires_at <= overdue_at, model.settled == False)
+                ))
+
+            # One transaction per bet is by design, not an N+1
+            queries.expect(len(expired), STATEMENTS_PER_SETTLEMENT)
+            settled = []
+            for kind, bet_id in expired:
+                try:
+                    engine.settle_bet(bet_id, kind, determine_outcome(kind, bet_id))
+                    settled.append((kind, bet_id))
+                except ValueError:
+                    # Settled by settle_due_bets_task since it was selected
+                    db.rollback()
+                except Exception as e:
+                    print(f"Error settling {kind} bet {bet_id}: {e}")
+                    run.failed = True
+                    db.rollback()
+
+            try:
+                settlement_scheduler.unschedule(settled)
+            except Exception as e:
+                # settle_due_bets_task skips them as already settled
+                print(f"Error unscheduling settled bets: {e}")
+
+            run.rows = len(settled)
+            print(f"Settled {run.rows} bets at {datetime.utcnow()}")
+        
+        except Exception as e:
+            print(f"Error settling bets: {e}")
+            run.failed = True
+            db.rollback()
+        finally:
+            db.close()
+
+
+def determine_outcome(kind: str, bet_id: int) -> bool:
+    """
+    Decide whether a bet won.
+
     In production, this would use actual market data to determine outcomes.
-    For now, it randomly settles bets.
+    For now, it randomly settles bets (50/50).
     """
+    return random.choice([True, False])
+
+
+@celery_app.task
+@profiled
+def settle_due_bets_task():
+    """
+    Settle bets whose expiry has just passed.
+    This task runs every few seconds.
+
+    Due bets are claimed from the settlement scheduler's expiry queue, so a
+    tick with nothing due costs one Redis read and never opens a database
+    session. A full batch re-queues the task to drain any backlog promptly.
+    """
+    with track_task("settle_due_bets") as run:
+        claimed = settlement_scheduler.claim_due(settings.SETTLEMENT_BATCH_SIZE)
+        if not claimed:
+            return 0
+
+        db = SessionLocal()
+        engine = BettingEngine(db)
+
+        with track_queries("settle_due_bets") as queries:
+            queries.expect(len(claimed), STATEMENTS_PER_SETTLEMENT)
+            try:
+                for kind, bet_id in claimed:
+                    try:
+                        engine.settle_bet(bet_id, kind, determine_outcome(kind, bet_id))
+                        run.rows += 1
+                    except ValueError:
+                        # Already settled by the sweep, or no longer exists
+                        db.rollback()
+                    except Exception as e:
+                        print(f"Error settling {kind} bet {bet_id}: {e}")
+                        run.failed = True
+                        db.rollback()
+                        retry_at = datetime.utcnow() + timedelta(seconds=settings.SETTLEMENT_RETRY_SECONDS)
+                        settlement_scheduler.schedule(kind, bet_id, retry_at)
+            finally:
+                db.close()
+
+        if len(claimed) == settings.SETTLEMENT_BATCH_SIZE:
+            settle_due_bets_task.delay()
+
+        return run.rows
+
+
+@celery_app.task
+@profiled
+def rebuild_settlement_schedule_task():
+    """Re-queue every unsettled bet in the settlement scheduler."""
     db = SessionLocal()
-    engine = BettingEngine(db)
-    
+
     try:
-        now = datetime.utcnow()
-        
-        # Settle expired futures bets
-        expired_futures = db.query(FuturesBet).filter(
-            FuturesBet.expires_at <= now,
-            FuturesBet.settled == False
-        ).all()
-        
-        for bet in expired_futures:
-            # In production, check actual outcome
-            # For now, randomly determine outcome (50/50)
-            import random
-            won = random.choice([True, False])
-            engine.settle_bet(bet.id, "futures", won)
-        
-        # Settle expired head-to-head bets
-        expired_h2h = db.query(HeadToHeadBet).filter(
-            HeadToHeadBet.expires_at <= now,
-            HeadToHeadBet.settled == False
-        ).all()
-        
-        for bet in expired_h2h:
-            import random
-            won = random.choice([True, False])
-            engine.settle_bet(bet.id, "head_to_head", won)
-        
-        # Settle expired prop bets
-        expired_prop = db.query(PropBet).filter(
-            PropBet.expires_at <= now,
-            PropBet.settled == False
-        ).all()
-        
-        for bet in expired_prop:
-            import random
-            won = random.choice([True, False])
-            engine.settle_bet(bet.id, "prop", won)
-        
-        print(f"Settled {len(expired_futures) + len(expired_h2h) + len(expired_prop)} bets at {datetime.utcnow()}")
-        
+        queued = settlement_scheduler.rebuild(db)
+        print(f"Queued {queued} unsettled bets for settlement at {datetime.utcnow()}")
     except Exception as e:
-        print(f"Error settling bets: {e}")
-        db.rollback()
+        print(f"Error rebuilding settlement schedule: {e}")
     finally:
         db.close()
+
+
+@worker_ready.connect
+def rebuild_settlement_schedule_on_startup(sender=None, **kwargs):
+    """Rebuild the expiry queue when a worker starts, in case Redis lost it."""
+    rebuild_settlement_schedule_task.delay()
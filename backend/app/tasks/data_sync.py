@@ -1,12 +1,18 @@
 from app.core.celery_app import celery_app
+from app.core.profiler import profiled
+from app.core.metrics import track_task
 from app.db.session import SessionLocal
 from app.models.strain import Strain, PriceHistory
 from app.services.price_calculator import PriceCalculator
+from app.core.money import from_micros
+from app.core.cache import strain_cache
+from app.services.market_snapshot import market_snapshot
 from datetime import datetime
 import random
 
 
 @celery_app.task
+@profiled
 def sync_strain_data_task():
     """
     Sync strain data and update prices.
@@ -15,42 +21,58 @@ def sync_strain_data_task():
     In production, this would fetch real data from Metabase.
     For now, it simulates price updates.
     """
-    db = SessionLocal()
+    with track_task("sync_strain_data") as run:
+        db = SessionLocal()
     
-    try:
-        strains = db.query(Strain).all()
-        calculator = PriceCalculator()
+        try:
+            strains = db.query(Strain).all()
+            calculator = PriceCalculator()
         
-        for strain in strains:
-            # Simulate small price fluctuations
-            # In production, fetch real data from Metabase
-            favorite_change = random.randint(-2, 5)
-            strain.favorite_count = max(0, strain.favorite_count + favorite_change)
+            for strain in strains:
+                # Simulate small price fluctuations
+                # In production, fetch real data from Metabase
+                favorite_change = random.randint(-2, 5)
+                strain.favorite_count = max(0, strain.favorite_count + favorite_change)
             
-            # Recalculate price
-            strain_data = {
-                "avg_price_per_gram": strain.base_price / 10,
-                "favorite_count": strain.favorite_count,
-                "volatility_spread": strain.volatility_score
-            }
+                # Recalculate price
+                strain_data = {
+                    "avg_price_per_gram": from_micros(strain.base_price) / 10,
+                    "favorite_count": strain.favorite_count,
+                    "volatility_spread": strain.volatility_score
+                }
             
-            new_price = calculator.calculate_stock_price(strain_data)
-            strain.current_price = new_price
-            strain.last_updated = datetime.utcnow()
+                new_price = calculator.calculate_stock_price(strain_data)
+                strain.current_price = new_price
+                strain.last_updated = datetime.utcnow()
             
-            # Record price history
-            price_record = PriceHistory(
-                strain_id=strain.id,
-                price=new_price,
-                volume=random.randint(0, 100)
-            )
-            db.add(price_record)
+                # Record price history
+                price_record = PriceHistory(
+                    strain_id=strain.id,
+                    price=new_price,
+                    volume=random.randint(0, 100)
+                )
+                db.add(price_record)
         
-        db.commit()
-        print(f"Synced {len(strains)} strains at {datetime.utcnow()}")
+            # Bump the strain cache generation here rather than in the commit
+            # hook, so the snapshot is only published under a generation this
+            # commit actually started (see app.core.cache)
+            db.info.get("bump_generations", set()).discard(strain_cache.generation)
+            db.commit()
+            try:
+                generation = strain_cache.generation.bump()
+            except Exception as e:
+                # Readers keep the old generation, and with it the old snapshot
+                print(f"Could not bump strain cache generation: {e}")
+                generation = None
         
-    except Exception as e:
-        print(f"Error syncing strain data: {e}")
-        db.rollback()
-    finally:
-        db.close()
+            # Render /strains once for the new generation instead of on every request
+            pages = market_snapshot.publish(db, generation) if generation is not None else 0
+            run.rows = len(strains)
+            print(f"Synced {len(strains)} strains ({pages} snapshot pages) at {datetime.utcnow()}")
+        
+        except Exception as e:
+            print(f"Error syncing strain data: {e}")
+            run.failed = True
+            db.rollback()
+        finally:
+            db.close()
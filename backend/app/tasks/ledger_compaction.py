@@ -0,0 +1,35 @@
+from app.core.celery_app import celery_app
+from app.core.profiler import profiled
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.ledger import Ledger
+from datetime import datetime
+
+
+@celery_app.task
+@profiled
+def compact_ledger_task():
+    """
+    Fold pending ledger entries into users' balance snapshots.
+    This task runs every minute.
+
+    Keeps balance reads to a short range scan of recent entries. A full
+    batch re-queues the task to drain any backlog promptly.
+    """
+    db = SessionLocal()
+
+    try:
+        compacted = Ledger(db).compact(settings.LEDGER_COMPACTION_BATCH_SIZE)
+    except Exception as e:
+        print(f"Error compacting ledger: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+    if compacted:
+        print(f"Compacted ledger balances of {compacted} users at {datetime.utcnow()}")
+    if compacted == settings.LEDGER_COMPACTION_BATCH_SIZE:
+        compact_ledger_task.delay()
+
+    return compacted
@@ -1,4 +1,5 @@
 from app.core.celery_app import celery_app
+from app.core.profiler import profiled
 from app.db.session import SessionLocal
 from app.models.strain import MarketEvent
 from app.websocket.manager import manager
@@ -6,6 +7,7 @@ import asyncio
 
 
 @celery_app.task
+@profiled
 def generate_market_event_task():
     """
     Generate market events based on strain data changes.
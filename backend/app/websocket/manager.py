@@ -1,5 +1,6 @@
 from typing import List, Dict
 from fastapi import WebSocket
+from app.core.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_MESSAGES
 import json
 
 
@@ -13,23 +14,29 @@ class ConnectionManager:
         """Accept and store a new WebSocket connection."""
         await websocket.accept()
         self.active_connections.append(websocket)
+        WEBSOCKET_CONNECTIONS.inc()
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            WEBSOCKET_CONNECTIONS.dec()
     
     async def send_personal_message(self, message: Dict, websocket: WebSocket):
         """Send a message to a specific client."""
         await websocket.send_text(json.dumps(message))
+        WEBSOCKET_MESSAGES.labels("sent").inc()
     
     async def broadcast(self, message: Dict):
         """Broadcast a message to all connected clients."""
         disconnected = []
+        payload = json.dumps(message)
         for connection in self.active_connections:
             try:
-                await connection.send_text(json.dumps(message))
+                await connection.send_text(payload)
+                WEBSOCKET_MESSAGES.labels("sent").inc()
             except Exception:
+                WEBSOCKET_MESSAGES.labels("send_failed").inc()
                 disconnected.append(connection)
         
         # Remove disconnected clients
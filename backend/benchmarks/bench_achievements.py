@@ -0,0 +1,96 @@
+"""
+Replay synthetic trade and settlement events through the achievement evaluator.
+
+Measures the per-event cost of incremental achievement evaluation using the
+achievement definitions from seed_data.py, with progress held in memory.
+
+Usage:
+    python benchmarks/bench_achievements.py --events 10000000 --users 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.achievement_engine import AchievementEvaluator, PROGRESS_DEFAULTS
+
+# (achievement_id, criteria_type, criteria_value), as created by seed_data.create_achievements
+SEED_ACHIEVEMENTS = [
+    (1, "trades_count", 1),
+    (2, "hold_days", 30),
+    (3, "consecutive_wins", 5),
+    (4, "futures_wins", 10),
+    (5, "parlay_wins", 1),
+    (6, "high_odds_win", 10),
+    (7, "balance", 10000),
+    (8, "trade_value", 5000),
+]
+
+
+class Progress:
+    """In-memory stand-in for an AchievementProgress row."""
+
+    __slots__ = tuple(PROGRESS_DEFAULTS)
+
+    def __init__(self):
+        for field, value in PROGRESS_DEFAULTS.items():
+            setattr(self, field, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    evaluator = AchievementEvaluator(SEED_ACHIEVEMENTS)
+    progress = [Progress() for _ in range(args.users)]
+    kinds = ("futures", "head_to_head", "prop")
+
+    # Pre-generate event parameters in blocks so the timed loop measures evaluation only
+    block = 100_000
+    awards = 0
+    elapsed = 0.0
+    remaining = args.events
+
+    while remaining > 0:
+        n = min(block, remaining)
+        batch = [
+            (
+                rng.randrange(args.users),
+                rng.random() < 0.7,
+                rng.uniform(10, 8000),
+                rng.uniform(-200, 200) if rng.random() < 0.5 else None,
+                rng.uniform(0, 20000),
+                kinds[rng.randrange(3)],
+                rng.random() < 0.5,
+                rng.uniform(1.01, 15.0),
+            )
+            for _ in range(n)
+        ]
+
+        start = time.perf_counter()
+        for user, is_trade, value, profit, balance, kind, won, odds in batch:
+            state = progress[user]
+            if is_trade:
+                awards += len(evaluator.apply_trade(state, value, profit, balance))
+            else:
+                awards += len(evaluator.apply_settlement(state, kind, won, odds, balance))
+        elapsed += time.perf_counter() - start
+        remaining -= n
+
+    print(f"events:          {args.events:,}")
+    print(f"users:           {args.users:,}")
+    print(f"achievements:    {awards:,} unlocked")
+    print(f"elapsed:         {elapsed:.2f}s")
+    print(f"throughput:      {args.events / elapsed:,.0f} events/s")
+    print(f"per event:       {elapsed / args.events * 1e9:,.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
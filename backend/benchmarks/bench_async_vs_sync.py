@@ -0,0 +1,140 @@
+"""
+Throughput and tail latency of the sync and async database paths.
+
+Starts a small API in a subprocess exposing the same strain listing twice,
+once as a sync ``def`` on ``get_db`` (run in Starlette's threadpool) and once
+as an ``async def`` on ``get_async_db``, then drives each with the same
+number of concurrent clients and reports requests/s and p50/p99 latency.
+
+Uses DATABASE_URL from the environment; seed it first so there is data:
+
+Usage:
+    python seed_data.py
+    python benchmarks/bench_async_vs_sync.py --concurrency 1000 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_auth_mix import percentile  # noqa: E402
+
+PATHS = ("/sync/strains", "/async/strains")
+
+
+def create_app():
+    from datetime import datetime, timedelta
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.db.session import get_async_db, get_db
+    from app.models.strain import PriceHistory, Strain
+
+    def strains_query(limit: int):
+        return select(Strain).order_by(Strain.id).limit(limit)
+
+    def first_price_query(strain_id: int):
+        yesterday = datetime.utcnow() - timedelta(hours=24)
+        return select(PriceHistory.price).filter(
+            PriceHistory.strain_id == strain_id,
+            PriceHistory.timestamp >= yesterday
+        ).order_by(PriceHistory.timestamp).limit(1)
+
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    @app.get("/sync/strains")
+    def sync_strains(limit: int = 20, db: Session = Depends(get_db)):
+        strains = db.scalars(strains_query(limit)).all()
+        return [{"id": s.id, "price": s.current_price, "old": db.scalar(first_price_query(s.id))} for s in strains]
+
+    @app.get("/async/strains")
+    async def async_strains(limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+        strains = (await db.scalars(strains_query(limit))).all()
+        return [{"id": s.id, "price": s.current_price, "old": await db.scalar(first_price_query(s.id))} for s in strains]
+
+    return app
+
+
+def serve(port: int):
+    import uvicorn
+    uvicorn.run(create_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("benchmark server did not start")
+
+
+async def client_loop(client, path, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+
+
+async def drive(base_url: str, path: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Warm the pool and caches before measuring
+        await asyncio.gather(*[client.get(path) for _ in range(min(concurrency, 50))])
+
+        latencies, errors = [], []
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*[client_loop(client, path, deadline, latencies, errors) for _ in range(concurrency)])
+
+    print(f"{path:16} ok={len(latencies):8,}  rps={len(latencies) / duration:8.1f}  "
+          f"p50={percentile(latencies, 50) * 1000:8.1f}ms  p99={percentile(latencies, 99) * 1000:8.1f}ms  "
+          f"errors={len(errors):,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--port", str(args.port)])
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        print(f"{args.concurrency} concurrent clients, {args.duration:.0f}s per path")
+        for path in PATHS:
+            asyncio.run(drive(base_url, path, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
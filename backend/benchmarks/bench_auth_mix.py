@@ -0,0 +1,110 @@
+"""
+Mixed login and trade traffic against a running API.
+
+Runs a login storm alongside steady trading and reports trade latency,
+so the effect of password hashing on unrelated endpoints is visible.
+Logins shed with 503 are counted separately from failures.
+
+Usage:
+    uvicorn app.main:app --workers 2 &
+    python seed_data.py
+    python benchmarks/bench_auth_mix.py --base-url http://localhost:8000 \\
+        --login-concurrency 64 --trade-concurrency 16 --duration 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+PASSWORD = "bench-password"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/auth/register", json={
+        "email": email,
+        "username": email.split("@")[0],
+        "password": PASSWORD
+    })
+    response.raise_for_status()
+    return email
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+
+
+async def login_storm(client, emails, deadline, stats):
+    i = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = await login(client, emails[i % len(emails)])
+        i += 1
+        if response.status_code == 200:
+            stats["login_ok"].append(time.perf_counter() - start)
+        elif response.status_code == 503:
+            stats["login_shed"] += 1
+        else:
+            stats["login_failed"] += 1
+
+
+async def trader(client, token, strain_id, deadline, stats):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = await client.post(
+            "/trading/trades/buy", json={"strain_id": strain_id, "shares": 0.01}, headers=headers
+        )
+        if response.status_code == 200:
+            stats["trade_ok"].append(time.perf_counter() - start)
+        else:
+            stats["trade_failed"] += 1
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.login_concurrency + args.trade_concurrency + 8)
+    async with httpx.AsyncClient(base_url=f"{args.base_url}/api/v1", limits=limits, timeout=60) as client:
+        emails = [await register(client) for _ in range(args.users)]
+        token = (await login(client, emails[0])).json()["access_token"]
+
+        stats = {"login_ok": [], "login_shed": 0, "login_failed": 0, "trade_ok": [], "trade_failed": 0}
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            *[login_storm(client, emails, deadline, stats) for _ in range(args.login_concurrency)],
+            *[trader(client, token, args.strain_id, deadline, stats) for _ in range(args.trade_concurrency)]
+        )
+
+    for name in ("login_ok", "trade_ok"):
+        samples = stats[name]
+        label = name.replace("_ok", "")
+        print(f"{label:6} ok={len(samples):7,}  rps={len(samples) / args.duration:8.1f}  "
+              f"p50={percentile(samples, 50) * 1000:7.1f}ms  p99={percentile(samples, 99) * 1000:7.1f}ms  "
+              f"mean={statistics.fmean(samples) * 1000 if samples else 0:7.1f}ms")
+    print(f"login  shed(503)={stats['login_shed']:,}  failed={stats['login_failed']:,}")
+    print(f"trade  failed={stats['trade_failed']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--strain-id", type=int, default=1)
+    parser.add_argument("--login-concurrency", type=int, default=64)
+    parser.add_argument("--trade-concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
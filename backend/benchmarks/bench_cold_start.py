@@ -0,0 +1,75 @@
+"""
+Cold-start time of an API worker.
+
+Repeatedly starts a single-worker uvicorn process and measures the time
+from spawn to the first successful /health response, plus the time to
+just import ``app.main`` in a fresh interpreter. Each run is a fresh
+process, so this is what every worker pays on deploy, restart or scale-up.
+
+Usage:
+    python benchmarks/bench_cold_start.py --runs 10
+    DB_BOOTSTRAP_SCHEMA=true python benchmarks/bench_cold_start.py   # compare with create_all
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - start
+
+
+def time_first_request(port: int, timeout: float) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get("/health").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {server.returncode}")
+                time.sleep(0.005)
+        raise RuntimeError("worker did not serve /health in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(label, samples):
+    print(f"{label:20} min={min(samples) * 1000:8.1f}ms  median={statistics.median(samples) * 1000:8.1f}ms  "
+          f"max={max(samples) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_requests = [time_first_request(args.port, args.timeout) for _ in range(args.runs)]
+
+    print(f"{args.runs} runs")
+    report("import app.main", imports)
+    report("first /health", first_requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Mixed-traffic load test of the API.
+
+Simulates traders that browse strains, buy and sell, place futures bets
+and poll their portfolio, in proportions set by --mix, while --ws-clients
+connections hold the WebSocket feed open and ping it. Reports requests/s,
+p50/p95/p99 latency and database queries per request for every endpoint,
+and writes the results as JSON (tagged with the git commit) so runs can
+be compared across commits with --compare.
+
+By default the API is started in a subprocess with a query counter
+installed, against DATABASE_URL (run migrations and seed_data.py first),
+or against a throwaway SQLite database with --sqlite. Redis must be
+running either way. With --base-url an already running API is tested
+instead; queries per request are then not available.
+
+Usage:
+    python benchmarks/loadtest.py --sqlite --users 50 --duration 30
+    python benchmarks/loadtest.py --mix browse=6,trade=2,bet=1,portfolio=3 \\
+        --output benchmarks/results/after.json --compare benchmarks/results/before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_auth_mix import percentile  # noqa: E402
+
+PASSWORD = "loadtest-password"
+QUERY_COUNT_HEADER = "X-DB-Queries"
+SQLITE_PATH = os.path.join(BACKEND_DIR, "benchmarks", ".loadtest.db")
+DEFAULT_MIX = "browse=5,trade=2,bet=1,portfolio=2"
+
+
+def serve(port: int, seed: bool):
+    """Run the real app with a per-request SQL statement counter (subprocess mode)."""
+    from contextvars import ContextVar
+    import uvicorn
+    from sqlalchemy import event
+    from app.db import session as db_session
+    from app.main import app
+
+    if seed:
+        from app.db.base import Base
+        import seed_data
+        Base.metadata.create_all(bind=db_session.engine)
+        seed_data.create_sample_strains()
+        seed_data.create_achievements()
+
+    # A mutable cell per request: threadpool and run_sync calls copy the
+    # context, but still increment the same list
+    queries = ContextVar("loadtest_queries", default=None)
+
+    def count(*args, **kwargs):
+        counter = queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    engines = [db_session.engine, db_session.async_engine.sync_engine]
+    if db_session.async_replica_engine is not None:
+        engines.append(db_session.async_replica_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", count)
+
+    @app.middleware("http")
+    async def query_count_header(request, call_next):
+        counter = [0]
+        token = queries.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            queries.reset(token)
+        response.headers[QUERY_COUNT_HEADER] = str(counter[0])
+        return response
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("load test server did not start")
+
+
+class Recorder:
+    """Latency, status and query samples per endpoint label."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.errors[label][type(exc).__name__] += 1
+            return None
+
+        if response.status_code >= 400:
+            self.errors[label][str(response.status_code)] += 1
+        else:
+            self.latencies[label].append(time.perf_counter() - start)
+        if QUERY_COUNT_HEADER in response.headers:
+            self.queries[label].append(int(response.headers[QUERY_COUNT_HEADER]))
+        return response
+
+    def summary(self, duration: float) -> dict:
+        results = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            latencies = self.latencies[label]
+            queries = self.queries[label]
+            results[label] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / duration, 1),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+                "errors": dict(self.errors[label])
+            }
+        return results
+
+
+class Trader:
+    """One simulated user; each action is one scenario step of a few requests."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, token: str, strain_ids, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.strain_ids = strain_ids
+        self.rng = rng
+
+    async def browse(self):
+        await self.recorder.request(self.client, "GET /trading/strains", "GET", "/trading/strains",
+                                    params={"skip": 0, "limit": 20})
+        strain_id = self.rng.choice(self.strain_ids)
+        await self.recorder.request(self.client, "GET /trading/strains/{id}", "GET", f"/trading/strains/{strain_id}")
+
+    async def trade(self):
+        order = {"strain_id": self.rng.choice(self.strain_ids), "shares": 0.01}
+        await self.recorder.request(self.client, "POST /trading/trades/buy", "POST", "/trading/trades/buy",
+                                    json=order, headers=self.headers)
+        await self.recorder.request(self.client, "POST /trading/trades/sell", "POST", "/trading/trades/sell",
+                                    json=order, headers=self.headers)
+
+    async def bet(self):
+        await self.recorder.request(self.client, "POST /betting/bets/futures", "POST", "/betting/bets/futures", json={
+            "bet_type": "price",
+            "target_strain_id": self.rng.choice(self.strain_ids),
+            "prediction": self.rng.choice(["up", "down"]),
+            "stake": 1,
+            "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        }, headers=self.headers)
+
+    async def portfolio(self):
+        await self.recorder.request(self.client, "GET /portfolio/portfolio", "GET", "/portfolio/portfolio",
+                                    headers=self.headers)
+
+    async def run(self, mix, deadline: float):
+        scenarios, weights = zip(*mix.items())
+        while time.monotonic() < deadline:
+            await getattr(self, self.rng.choices(scenarios, weights)[0])()
+
+
+async def hold_feed(ws_url: str, deadline: float, recorder: Recorder, interval: float):
+    import websockets
+
+    label = "WS /ws ping"
+    try:
+        async with websockets.connect(ws_url) as websocket:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await websocket.send("ping")
+                await websocket.recv()
+                recorder.latencies[label].append(time.perf_counter() - start)
+                await asyncio.sleep(interval)
+    except Exception as exc:
+        recorder.errors[label][type(exc).__name__] += 1
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post("/auth/register", json={
+        "email": email,
+        "username": email.split("@")[0],
+        "password": PASSWORD
+    })
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args, base_url: str, mix) -> dict:
+    limits = httpx.Limits(max_connections=args.users + 8, max_keepalive_connections=args.users + 8)
+    async with httpx.AsyncClient(base_url=f"{base_url}/api/v1", limits=limits, timeout=60) as client:
+        tokens = await asyncio.gather(*[register(client) for _ in range(args.users)])
+        strain_ids = [strain["id"] for strain in (await client.get("/trading/strains", params={"limit": 500})).json()]
+        if not strain_ids:
+            sys.exit("No strains to trade; seed the database first (or pass --sqlite)")
+
+        recorder = Recorder()
+        traders = [
+            Trader(client, recorder, token, strain_ids, random.Random(args.seed + i))
+            for i, token in enumerate(tokens)
+        ]
+
+        # Warm pools and caches before measuring
+        await asyncio.gather(*[trader.browse() for trader in traders])
+        recorder = Recorder()
+        for trader in traders:
+            trader.recorder = recorder
+
+        ws_url = base_url.replace("http", "ws", 1) + "/ws"
+        deadline = time.monotonic() + args.duration
+        started = time.monotonic()
+        await asyncio.gather(
+            *[trader.run(mix, deadline) for trader in traders],
+            *[hold_feed(ws_url, deadline, recorder, args.ws_interval) for _ in range(args.ws_clients)]
+        )
+        return recorder.summary(time.monotonic() - started)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict, baseline: dict = None):
+    print(f"{'endpoint':32} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} errors")
+    for label, row in results.items():
+        queries = row["queries_per_request"]
+        print(f"{label:32} {row['rps']:8.1f} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} "
+              f"{queries if queries is not None else '-':>8} {sum(row['errors'].values()) or ''}")
+        before = (baseline or {}).get(label)
+        if before:
+            def delta(key):
+                return f"{(row[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else "n/a"
+            print(f"{'  vs baseline':32} {delta('rps'):>8} {delta('p50_ms'):>8} {delta('p95_ms'):>8} {delta('p99_ms'):>8}")
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("browse", "trade", "bet", "portfolio"):
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="test a running API instead of starting one")
+    parser.add_argument("--sqlite", action="store_true", help="start the API on a fresh, seeded SQLite database")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated traders")
+    parser.add_argument("--ws-clients", type=int, default=50, help="WebSocket connections held open")
+    parser.add_argument("--ws-interval", type=float, default=1.0, help="seconds between WebSocket pings")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1, help="random seed for scenario choices")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/loadtest-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="results JSON of a previous run to compare against")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--seed-data", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    mix = args.mix
+
+    if args.serve:
+        serve(args.port, args.seed_data)
+        return
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        # Registration is setup, not load: keep hashing cheap. Rate limits
+        # would cap the offered load, so they are off for the test server.
+        env = dict(os.environ, BCRYPT_ROUNDS="4", RATE_LIMIT_ENABLED="false")
+        command = [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(args.port)]
+        if args.sqlite:
+            if os.path.exists(SQLITE_PATH):
+                os.remove(SQLITE_PATH)
+            env["DATABASE_URL"] = f"sqlite:///{SQLITE_PATH}"
+            command.append("--seed-data")
+        server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    try:
+        if server is not None:
+            asyncio.run(wait_until_ready(base_url))
+        print(f"{args.users} traders, {args.ws_clients} WebSocket clients, {args.duration:.0f}s, mix {mix}")
+        results = asyncio.run(run(args, base_url, mix))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"loadtest-{commit}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "started_at": datetime.utcnow().isoformat(),
+            "database": "sqlite" if args.sqlite else ("external" if args.base_url else "DATABASE_URL"),
+            "config": {
+                "users": args.users,
+                "ws_clients": args.ws_clients,
+                "duration": args.duration,
+                "mix": mix,
+                "seed": args.seed
+            },
+            "results": results
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
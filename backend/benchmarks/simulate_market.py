@@ -0,0 +1,532 @@
+"""
+Multi-process market simulation with synthetic bot traders.
+
+A population of bots trades and bets through MarketEngine and
+BettingEngine directly, without the HTTP layer, spread over --processes
+worker processes, each with its own database session. Every bot follows
+one strategy:
+
+    momentum        buys what rose over the last few ticks, sells what fell
+    mean_reversion  buys below the moving average, sells above it
+    random          buys or sells at random
+
+A separate market process turns the net order flow of each tick into price
+moves (and price history rows), so the strategies react to each other
+instead of to the random demand of sync_strain_data_task. Use it as a
+load generator for benchmarks, or with a long --duration to soak-test the
+engines. Reports trades and bets per second, engine latency percentiles
+and rejections, and writes the results as JSON like loadtest.py.
+
+Runs against DATABASE_URL (migrated and seeded), or a fresh SQLite
+database with --sqlite (use one process there: SQLite has a single
+writer, so --sqlite also keeps prices fixed as --no-market does). Redis must be running for odds, exposure and settlement.
+
+Usage:
+    python benchmarks/simulate_market.py --processes 8 --bots 2000 --duration 60
+    python benchmarks/simulate_market.py --strategies momentum=1,random=1 --target-tps 1500
+    python benchmarks/simulate_market.py --sqlite --processes 1 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_auth_mix import percentile  # noqa: E402
+from loadtest import git_commit  # noqa: E402
+
+SQLITE_PATH = os.path.join(BACKEND_DIR, "benchmarks", ".simulate.db")
+DEFAULT_STRATEGIES = "momentum=4,mean_reversion=3,random=3"
+LATENCY_SAMPLES = 100_000  # per operation and worker
+
+
+class Momentum:
+    """Follow the trend of the last ``lookback`` ticks."""
+
+    name = "momentum"
+
+    def __init__(self, lookback: int = 5, threshold: float = 0.002):
+        self.lookback = lookback
+        self.threshold = threshold
+
+    def decide(self, rng: random.Random, prices: deque):
+        if len(prices) <= self.lookback:
+            return None
+        change = prices[-1] / prices[-1 - self.lookback] - 1
+        if change > self.threshold:
+            return "buy"
+        if change < -self.threshold:
+            return "sell"
+        return None
+
+
+class MeanReversion:
+    """Trade back towards the ``window``-tick moving average."""
+
+    name = "mean_reversion"
+
+    def __init__(self, window: int = 20, band: float = 0.005):
+        self.window = window
+        self.band = band
+
+    def decide(self, rng: random.Random, prices: deque):
+        if len(prices) < self.window:
+            return None
+        recent = list(prices)[-self.window:]
+        deviation = prices[-1] / (sum(recent) / len(recent)) - 1
+        if deviation < -self.band:
+            return "buy"
+        if deviation > self.band:
+            return "sell"
+        return None
+
+
+class RandomTrader:
+    """Noise trader."""
+
+    name = "random"
+
+    def decide(self, rng: random.Random, prices: deque):
+        return "buy" if rng.random() < 0.5 else "sell"
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (Momentum, MeanReversion, RandomTrader)}
+
+
+class Bot:
+    __slots__ = ("user_id", "strategy", "holdings")
+
+    def __init__(self, user_id: int, strategy):
+        self.user_id = user_id
+        self.strategy = strategy
+        self.holdings = defaultdict(float)
+
+
+class Recorder:
+    """Counts and a bounded latency sample per operation, for one worker."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.counts = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.seen = defaultdict(int)
+        self.per_second = defaultdict(int)
+
+    def record(self, operation: str, seconds: float, second: int):
+        self.counts[operation] += 1
+        self.per_second[second] += 1
+        # Reservoir sampling keeps memory flat on long soak runs
+        self.seen[operation] += 1
+        samples = self.latencies[operation]
+        if len(samples) < LATENCY_SAMPLES:
+            samples.append(seconds)
+        else:
+            slot = self.rng.randrange(self.seen[operation])
+            if slot < LATENCY_SAMPLES:
+                samples[slot] = seconds
+
+    def result(self) -> dict:
+        return {
+            "counts": dict(self.counts),
+            "latencies": dict(self.latencies),
+            "per_second": dict(self.per_second)
+        }
+
+
+def setup(args) -> dict:
+    """Create the bot users and return the run's bot and strain ids."""
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.core.money import to_micros
+    from app.db.session import SessionLocal, engine
+    from app.models.strain import Strain
+    from app.models.user import User
+    from app.services.ledger import Ledger
+
+    if args.sqlite:
+        from app.db.base import Base
+        import seed_data
+        Base.metadata.create_all(bind=engine)
+        seed_data.create_sample_strains()
+
+    db = SessionLocal()
+    try:
+        strain_ids = list(db.scalars(select(Strain.id).order_by(Strain.id)))
+        if not strain_ids:
+            raise SystemExit("No strains found; run migrations and seed_data.py first")
+
+        run_id = uuid.uuid4().hex[:8]
+        users = [
+            User(email=f"sim-{run_id}-{i}@example.com", username=f"sim-{run_id}-{i}", hashed_password="!")
+            for i in range(args.bots)
+        ]
+        db.add_all(users)
+        db.flush()
+        # The starting grant goes through the ledger, as it does at signup
+        ledger = Ledger(db)
+        grant = to_micros(args.starting_coins or settings.INITIAL_WEEDCOINS)
+        for user in users:
+            ledger.credit(user.id, grant, "signup")
+        db.commit()
+        return {"run_id": run_id, "user_ids": [user.id for user in users], "strain_ids": strain_ids}
+    finally:
+        db.close()
+
+
+def load_prices(db, strain_ids) -> dict:
+    from sqlalchemy import select
+    from app.models.strain import Strain
+
+    return dict(db.execute(select(Strain.id, Strain.current_price).where(Strain.id.in_(strain_ids))).all())
+
+
+def trade_worker(index: int, args, bot_specs, strain_ids, start_at: float, results):
+    """Run a share of the bots for --duration from ``start_at`` (one process, one session)."""
+    from sqlalchemy.exc import SQLAlchemyError
+    from app.core.money import to_micros
+    from app.db.session import SessionLocal
+    from app.models.bet import BetType
+    from app.services.betting_engine import BettingEngine
+    from app.services.market_engine import MarketEngine
+    from app.services import achievement_engine  # noqa: F401  (registers event subscribers)
+
+    rng = random.Random(args.seed * 1000 + index)
+    strategies = {name: strategy() for name, strategy in STRATEGIES.items()}
+    bots = [Bot(user_id, strategies[name]) for user_id, name in bot_specs]
+    recorder = Recorder(rng)
+    db = SessionLocal()
+    market = MarketEngine(db)
+    betting = BettingEngine(db)
+
+    history = {strain_id: deque(maxlen=64) for strain_id in strain_ids}
+    refresh_at = 0.0
+    # Paces this worker to its share of --target-tps, if set
+    interval = args.processes / args.target_tps if args.target_tps else 0.0
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    deadline = start_at + args.duration
+    next_op = time.monotonic()
+    i = 0
+
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= refresh_at:
+                for strain_id, price in load_prices(db, strain_ids).items():
+                    history[strain_id].append(price)
+                db.commit()
+                refresh_at = now + args.tick
+            if interval:
+                if now < next_op:
+                    time.sleep(next_op - now)
+                next_op = max(next_op + interval, time.monotonic() - 1.0)
+
+            bot = bots[i % len(bots)]
+            i += 1
+            strain_id = strain_ids[rng.randrange(len(strain_ids))]
+            side = bot.strategy.decide(rng, history[strain_id])
+            if side is None:
+                recorder.counts["idle"] += 1
+                continue
+
+            start = time.perf_counter()
+            try:
+                if rng.random() < args.bet_ratio:
+                    operation = "bet"
+                    betting.place_futures_bet(
+                        bot.user_id,
+                        BetType.PRICE,
+                        strain_id,
+                        "up" if side == "buy" else "down",
+                        to_micros(rng.randint(1, args.max_stake)),
+                        datetime.utcnow() + timedelta(minutes=args.bet_minutes)
+                    )
+                elif side == "buy":
+                    operation = "buy"
+                    shares = rng.randint(1, args.max_shares)
+                    market.execute_market_buy(bot.user_id, strain_id, shares)
+                    bot.holdings[strain_id] += shares
+                else:
+                    operation = "sell"
+                    shares = min(rng.randint(1, args.max_shares), bot.holdings[strain_id])
+                    if shares <= 0:
+                        recorder.counts["idle"] += 1
+                        continue
+                    market.execute_market_sell(bot.user_id, strain_id, shares)
+                    bot.holdings[strain_id] -= shares
+            except ValueError:
+                # Insufficient balance or shares, or the odds moved: part of the market
+                db.rollback()
+                recorder.counts[f"{operation}_rejected"] += 1
+                continue
+            except SQLAlchemyError as e:
+                db.rollback()
+                recorder.counts[f"{operation}_error"] += 1
+                recorder.counts[f"error:{type(e).__name__}"] += 1
+                continue
+            recorder.record(operation, time.perf_counter() - start, int(time.monotonic() - start_at))
+    finally:
+        db.close()
+        results.put((index, recorder.result()))
+
+
+def market_worker(args, strain_ids, start_at: float, results):
+    """
+    Move prices by each tick's net order flow.
+
+    Net shares bought per strain move its price by ``impact`` per ``depth``
+    shares, capped at ``max_move`` per tick; each move is committed with a
+    price history row, which also invalidates the strain cache as a sync does.
+    """
+    from sqlalchemy import case, func, select
+    from app.core.money import MICROS_PER_COIN
+    from app.db.session import SessionLocal
+    from app.models.strain import Strain, PriceHistory
+    from app.models.trade import Trade, TradeType
+
+    db = SessionLocal()
+    ticks = 0
+    # Replaced by the price changes once the run completes
+    result = {"failed": True, "price_change_pct": {}}
+
+    try:
+        time.sleep(max(0.0, start_at - time.monotonic()))
+        deadline = start_at + args.duration
+        opening = load_prices(db, strain_ids)
+        last_trade_id = db.scalar(select(func.coalesce(func.max(Trade.id), 0)))
+        db.commit()
+
+        while time.monotonic() < deadline:
+            time.sleep(args.tick)
+            flow = db.execute(
+                select(
+                    Trade.strain_id,
+                    func.sum(case((Trade.type == TradeType.BUY, Trade.shares), else_=-Trade.shares)),
+                    func.sum(Trade.shares),
+                    func.max(Trade.id)
+                ).where(Trade.id > last_trade_id).group_by(Trade.strain_id)
+            ).all()
+            if not flow:
+                continue
+
+            strains = {strain.id: strain for strain in db.scalars(
+                select(Strain).where(Strain.id.in_([row[0] for row in flow]))
+            )}
+            for strain_id, net, volume, max_id in flow:
+                last_trade_id = max(last_trade_id, max_id)
+                strain = strains.get(strain_id)
+                if strain is None:
+                    continue
+                move = max(-args.max_move, min(args.max_move, args.impact * net / args.depth))
+                strain.current_price = max(MICROS_PER_COIN // 100, round(strain.current_price * (1 + move)))
+                strain.last_updated = datetime.utcnow()
+                db.add(PriceHistory(strain_id=strain_id, price=strain.current_price, volume=int(volume)))
+            db.commit()
+            ticks += 1
+
+        closing = load_prices(db, strain_ids)
+        result = {
+            "price_change_pct": {
+                str(strain_id): round((closing[strain_id] - opening[strain_id]) / opening[strain_id] * 100, 2)
+                for strain_id in strain_ids if opening.get(strain_id)
+            }
+        }
+    finally:
+        db.close()
+        results.put(("market", {"ticks": ticks, **result}))
+
+
+def collect_results(processes: dict, results) -> dict:
+    """
+    Results keyed like ``processes`` (worker index or "market"). A process
+    that exits without reporting, e.g. killed or failing at import, is
+    dropped with a warning instead of blocking the run forever.
+    """
+    collected = {}
+    pending = dict(processes)
+    while pending:
+        # Only a process that had exited before the wait can no longer report:
+        # its queue writes are flushed before it exits
+        exited = [key for key, process in pending.items() if process.exitcode is not None]
+        try:
+            key, result = results.get(timeout=1.0)
+        except queue.Empty:
+            for key in exited:
+                print(f"{key} worker exited with code {pending.pop(key).exitcode} without results", file=sys.stderr)
+            continue
+        collected[key] = result
+        pending.pop(key, None)
+    return collected
+
+
+def assign_strategies(user_ids, weights: dict, rng: random.Random):
+    names = list(weights)
+    return [(user_id, rng.choices(names, [weights[name] for name in names])[0]) for user_id in user_ids]
+
+
+def summarize(worker_results, duration: float) -> dict:
+    counts = defaultdict(int)
+    latencies = defaultdict(list)
+    per_second = defaultdict(int)
+    for result in worker_results:
+        for key, value in result["counts"].items():
+            counts[key] += value
+        for key, samples in result["latencies"].items():
+            latencies[key].extend(samples)
+        for second, value in result["per_second"].items():
+            per_second[second] += value
+
+    operations = {}
+    for operation in ("buy", "sell", "bet"):
+        samples = latencies.get(operation, [])
+        operations[operation] = {
+            "count": counts.get(operation, 0),
+            "per_second": round(counts.get(operation, 0) / duration, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            "rejected": counts.get(f"{operation}_rejected", 0),
+            "errors": counts.get(f"{operation}_error", 0)
+        }
+    trades = counts.get("buy", 0) + counts.get("sell", 0)
+    # Whole seconds only: the last one is partial
+    steady = [per_second[second] for second in sorted(per_second)[:-1]] or [0]
+    return {
+        "trades_per_second": round(trades / duration, 1),
+        "operations_per_second_min": min(steady),
+        "operations_per_second_max": max(steady),
+        "idle_decisions": counts.get("idle", 0),
+        "error_types": {key[6:]: value for key, value in counts.items() if key.startswith("error:")},
+        "operations": operations
+    }
+
+
+def print_results(summary: dict, market: dict):
+    print(f"{'operation':10} {'count':>9} {'per s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rejected':>9} errors")
+    for operation, row in summary["operations"].items():
+        print(f"{operation:10} {row['count']:9} {row['per_second']:9.1f} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['rejected']:9} {row['errors'] or ''}")
+    print(f"trades/s {summary['trades_per_second']:.1f} (operations per second "
+          f"{summary['operations_per_second_min']}-{summary['operations_per_second_max']})")
+    if summary["error_types"]:
+        print(f"errors: {summary['error_types']}")
+    if market and market.get("failed"):
+        print(f"market worker failed after {market['ticks']} price ticks")
+    elif market:
+        moves = sorted(market["price_change_pct"].values())
+        if moves:
+            print(f"{market['ticks']} price ticks, price change {moves[0]:+.2f}% to {moves[-1]:+.2f}%")
+
+
+def parse_strategies(spec: str) -> dict:
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in STRATEGIES:
+            raise argparse.ArgumentTypeError(f"unknown strategy {name!r}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite", action="store_true", help="run on a fresh, seeded SQLite database")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 4, help="trading processes")
+    parser.add_argument("--bots", type=int, default=1000, help="bot traders, split across the processes")
+    parser.add_argument("--strategies", type=parse_strategies, default=DEFAULT_STRATEGIES,
+                        help=f"strategy weights (default {DEFAULT_STRATEGIES})")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--target-tps", type=float, help="cap on operations per second across all processes")
+    parser.add_argument("--bet-ratio", type=float, default=0.05, help="share of decisions placed as futures bets")
+    parser.add_argument("--max-shares", type=int, default=5)
+    parser.add_argument("--max-stake", type=int, default=20, help="largest bet stake, in WeedCoins")
+    parser.add_argument("--bet-minutes", type=float, default=60.0, help="futures bet expiry")
+    parser.add_argument("--starting-coins", type=float, help="bot balance (default INITIAL_WEEDCOINS)")
+    parser.add_argument("--tick", type=float, default=1.0, help="seconds between price moves")
+    parser.add_argument("--impact", type=float, default=0.01, help="price move per --depth net shares")
+    parser.add_argument("--depth", type=float, default=1000.0)
+    parser.add_argument("--max-move", type=float, default=0.05, help="largest price move per tick")
+    parser.add_argument("--no-market", action="store_true", help="keep prices fixed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/simulate-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        if os.path.exists(SQLITE_PATH):
+            os.remove(SQLITE_PATH)
+        os.environ["DATABASE_URL"] = f"sqlite:///{SQLITE_PATH}"
+        # The market process's price commits would contend with the traders'
+        # for SQLite's single write lock and fail them with "database is locked"
+        args.no_market = True
+    args.processes = max(1, min(args.processes, args.bots))
+
+    population = setup(args)
+    specs = assign_strategies(population["user_ids"], args.strategies, random.Random(args.seed))
+    strain_ids = population["strain_ids"]
+    print(f"{args.bots} bots ({', '.join(f'{name}={weight:g}' for name, weight in args.strategies.items())}) "
+          f"on {len(strain_ids)} strains, {args.processes} processes, {args.duration:.0f}s")
+
+    # Spawned, so no process inherits the parent's connection pool
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Leaves the workers time to import the app, so they all start together
+    start_at = time.monotonic() + 5.0
+    processes = {
+        index: context.Process(target=trade_worker, args=(index, args, specs[index::args.processes], strain_ids, start_at, results))
+        for index in range(args.processes)
+    }
+    if not args.no_market:
+        processes["market"] = context.Process(target=market_worker, args=(args, strain_ids, start_at, results))
+    for process in processes.values():
+        process.start()
+
+    collected = collect_results(processes, results)
+    for process in processes.values():
+        process.join()
+    market = collected.pop("market", None)
+    worker_results = list(collected.values())
+
+    summary = summarize(worker_results, args.duration)
+    print_results(summary, market)
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"simulate-{commit}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "started_at": datetime.utcnow().isoformat(),
+            "database": "sqlite" if args.sqlite else "DATABASE_URL",
+            "run_id": population["run_id"],
+            "config": {
+                "processes": args.processes,
+                "bots": args.bots,
+                "strategies": args.strategies,
+                "duration": args.duration,
+                "target_tps": args.target_tps,
+                "bet_ratio": args.bet_ratio,
+                "tick": args.tick,
+                "impact": args.impact,
+                "depth": args.depth,
+                "seed": args.seed
+            },
+            "results": summary,
+            "market": market
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,40 @@
 """
 Seed script to populate initial strain data.
 Run this after database migrations to create sample strains.
+
+With --scale it instead generates a benchmark-sized dataset (users,
+strains, months of price history, trades, portfolios, bets and their
+ledger entries) from a deterministic seed, streamed through COPY on
+PostgreSQL and batched executemany elsewhere:
+
+    python seed_data.py --scale --users 100000 --strains 400 --days 180 --interval-minutes 10
 """
-from app.db.session import SessionLocal
-from app.models.strain import Strain
+from sqlalchemy import bindparam, func, select, update
+from app.db.session import SessionLocal, engine
+from app.models.strain import Strain, PriceHistory
 from app.models.gamification import Achievement
+from app.models.user import User
+from app.models.trade import Trade, TradeType
+from app.models.portfolio import Portfolio
+from app.models.bet import FuturesBet, BetType, BetOutcome
+from app.models.ledger import LedgerEntry
 from app.services.price_calculator import PriceCalculator
+from app.core.config import settings
+from app.core.money import to_micros, from_micros, mul, div
+from app.core.security import get_password_hash
+from app.core.cache import strain_cache
+from datetime import datetime, timedelta
+import argparse
+import csv
+import enum
+import io
+import math
 import random
+import time
+
+# Every generated user logs in with this password
+SCALE_PASSWORD = "seed-password"
+BULK_BATCH_ROWS = 50_000
 
 
 def create_sample_strains():
@@ -33,10 +61,12 @@ def create_sample_strains():
     ]
     
     try:
+        # One query for the strains that already exist instead of one per strain
+        existing_names = set(db.scalars(
+            select(Strain.name).where(Strain.name.in_([strain_data["name"] for strain_data in sample_strains]))
+        ))
         for strain_data in sample_strains:
-            # Check if strain already exists
-            existing = db.query(Strain).filter(Strain.name == strain_data["name"]).first()
-            if existing:
+            if strain_data["name"] in existing_names:
                 print(f"Strain '{strain_data['name']}' already exists, skipping...")
                 continue
             
@@ -59,7 +89,7 @@ def create_sample_strains():
                 name=strain_data["name"],
                 slug=slug,
                 current_price=initial_price,
-                base_price=strain_data["base_price_per_gram"] * 10,
+                base_price=to_micros(strain_data["base_price_per_gram"] * 10),
                 popularity_score=strain_data["favorites"] / 10,
                 volatility_score=volatility_spread,
                 favorite_count=strain_data["favorites"],
@@ -67,7 +97,7 @@ def create_sample_strains():
             )
             
             db.add(strain)
-            print(f"Created strain: {strain_data['name']} @ {initial_price} WC")
+            print(f"Created strain: {strain_data['name']} @ {from_micros(initial_price)} WC")
         
         db.commit()
         print(f"\n✓ Successfully seeded {len(sample_strains)} strains!")
@@ -95,9 +125,11 @@ def create_achievements():
     ]
     
     try:
+        existing_names = set(db.scalars(
+            select(Achievement.name).where(Achievement.name.in_([ach_data["name"] for ach_data in achievements]))
+        ))
         for ach_data in achievements:
-            existing = db.query(Achievement).filter(Achievement.name == ach_data["name"]).first()
-            if existing:
+            if ach_data["name"] in existing_names:
                 print(f"Achievement '{ach_data['name']}' already exists, skipping...")
                 continue
             
@@ -115,8 +147,307 @@ def create_achievements():
         db.close()
 
 
+def _copy_value(value):
+    # COPY's CSV format: enums as their stored names, NULL as an empty field
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+class BulkWriter:
+    """
+    Streams generated rows into several tables over one connection.
+
+    Rows are buffered per table and written in batches: with COPY on
+    PostgreSQL, with an executemany INSERT elsewhere. Buffers are always
+    flushed in the order their tables were added, so parent rows reach the
+    database before the rows referencing them. Everything is committed at
+    the end, and ids are assigned by the caller so that related rows can be
+    generated without reading them back.
+    """
+
+    def __init__(self, batch_rows: int = BULK_BATCH_ROWS):
+        self.batch_rows = batch_rows
+        self.copy = engine.dialect.name == "postgresql"
+        self.tables = {}
+        self.counts = {}
+
+    def __enter__(self):
+        if self.copy:
+            self.raw = engine.raw_connection()
+        else:
+            self.connection = engine.connect()
+            self.transaction = self.connection.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        connection = self.raw if self.copy else self.transaction
+        try:
+            if exc_type is None:
+                self.flush()
+                self._reset_sequences()
+                connection.commit()
+            else:
+                connection.rollback()
+        finally:
+            if self.copy:
+                self.raw.close()
+            else:
+                self.connection.close()
+
+    def add_table(self, model, columns):
+        self.tables[model.__table__] = (columns, [])
+        self.counts[model.__tablename__] = 0
+
+    def add(self, model, row: tuple):
+        rows = self.tables[model.__table__][1]
+        rows.append(row)
+        if len(rows) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        for table, (columns, rows) in self.tables.items():
+            if not rows:
+                continue
+            if self.copy:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow([_copy_value(value) for value in row])
+                buffer.seek(0)
+                with self.raw.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                    )
+            else:
+                self.connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+            self.counts[table.name] += len(rows)
+            rows.clear()
+
+    def _reset_sequences(self):
+        # Ids were given explicitly, so PostgreSQL's sequences have not moved
+        if not self.copy:
+            return
+        with self.raw.cursor() as cursor:
+            for table in self.tables:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                )
+
+
+def _next_id(db, model) -> int:
+    return db.scalar(select(func.coalesce(func.max(model.id), 0))) + 1
+
+
+def seed_at_scale(
+    users: int,
+    strains: int,
+    days: int,
+    interval_minutes: int,
+    trades_per_user: int,
+    bets_per_user: int,
+    seed: int,
+    end: datetime
+):
+    """
+    Generate a benchmark dataset. The same arguments (including ``end``)
+    always produce the same rows; run it on a database without them.
+    """
+    calculator = PriceCalculator()
+    rng = random.Random(seed)
+    start = end - timedelta(days=days)
+    step = timedelta(minutes=interval_minutes)
+    points = days * 24 * 60 // interval_minutes
+    points_per_day = max(1, points // days)
+    grant = to_micros(settings.INITIAL_WEEDCOINS)
+
+    db = SessionLocal()
+    try:
+        if db.scalar(select(User.id).where(User.email == f"seed{seed}-0@example.com")) is not None:
+            raise SystemExit(f"Seed {seed} is already loaded; use another --seed or a fresh database")
+        ids = {model: _next_id(db, model) for model in (Strain, PriceHistory, User, Trade, Portfolio, FuturesBet, LedgerEntry)}
+    finally:
+        db.close()
+
+    def next_id(model) -> int:
+        value = ids[model]
+        ids[model] += 1
+        return value
+
+    # Hashed once: bcrypt per row would dominate the run
+    hashed_password = get_password_hash(SCALE_PASSWORD)
+    started = time.perf_counter()
+
+    with BulkWriter() as writer:
+        writer.add_table(Strain, ("id", "name", "slug", "current_price", "base_price", "popularity_score",
+                                  "volatility_score", "favorite_count", "pharmacy_count", "last_updated", "created_at"))
+        writer.add_table(PriceHistory, ("id", "strain_id", "price", "volume", "timestamp"))
+        writer.add_table(User, ("id", "email", "username", "hashed_password", "weedcoins_balance",
+                                "ledger_through_id", "is_active", "is_admin", "created_at", "updated_at"))
+        writer.add_table(Trade, ("id", "user_id", "strain_id", "type", "shares", "price", "total_cost", "timestamp"))
+        writer.add_table(Portfolio, ("id", "user_id", "strain_id", "shares_owned", "avg_buy_price",
+                                     "total_invested", "created_at", "updated_at"))
+        writer.add_table(FuturesBet, ("id", "user_id", "bet_type", "target_strain_id", "prediction", "stake", "odds",
+                                      "potential_payout", "expires_at", "settled", "outcome", "created_at"))
+        writer.add_table(LedgerEntry, ("id", "user_id", "amount", "reason", "reference", "created_at"))
+
+        # Strains and a random walk of their prices; daily closes price the trades
+        strain_ids, daily_closes, closing_prices = [], [], {}
+        for i in range(strains):
+            strain_id = next_id(Strain)
+            price_per_gram = round(rng.uniform(5.0, 12.0), 2)
+            favorites = rng.randint(20, 400)
+            volatility = rng.uniform(0.5, 4.0)
+            opening = calculator.calculate_stock_price({
+                "avg_price_per_gram": price_per_gram,
+                "favorite_count": favorites,
+                "volatility_spread": volatility
+            })
+            name = f"Seed {seed} Strain {i}"
+            writer.add(Strain, (
+                strain_id, name, name.lower().replace(" ", "-"), opening, to_micros(price_per_gram * 10),
+                favorites / 10, volatility, favorites, rng.randint(3, 25), end, start
+            ))
+
+            walk = random.Random(f"{seed}:prices:{i}")
+            sigma = 0.0005 * volatility * math.sqrt(interval_minutes)
+            price = float(opening)
+            closes = []
+            for point in range(points):
+                # Log-normal steps, pulled gently back towards the opening price
+                price *= math.exp(walk.gauss(0.0, sigma)) * (1 + 0.001 * (opening / price - 1))
+                writer.add(PriceHistory, (
+                    next_id(PriceHistory), strain_id, round(price), walk.randint(0, 100), start + step * (point + 1)
+                ))
+                if point % points_per_day == points_per_day - 1:
+                    closes.append(round(price))
+            strain_ids.append(strain_id)
+            daily_closes.append(closes or [opening])
+            closing_prices[strain_id] = round(price)
+
+        # Users with their trades, resulting positions, bets and every ledger entry
+        for i in range(users):
+            user_id = next_id(User)
+            user_rng = random.Random(f"{seed}:user:{i}")
+            writer.add(User, (
+                user_id, f"seed{seed}-{i}@example.com", f"seed{seed}-{i}", hashed_password,
+                0, 0, True, False, start, start
+            ))
+            writer.add(LedgerEntry, (next_id(LedgerEntry), user_id, grant, "signup", None, start))
+            cash = grant
+
+            holdings = {}  # strain index -> [shares, total invested]
+            offsets = sorted(user_rng.random() for _ in range(user_rng.randint(0, 2 * trades_per_user)))
+            for offset in offsets:
+                at = start + (end - start) * offset
+                index = user_rng.randrange(strains)
+                closes = daily_closes[index]
+                price = closes[min(len(closes) - 1, int(offset * len(closes)))]
+                position = holdings.get(index)
+                trade_id = next_id(Trade)
+
+                if position and position[0] > 0 and user_rng.random() < 0.4:
+                    shares = user_rng.randint(1, int(position[0]))
+                    proceeds = mul(price, shares)
+                    cost_basis = mul(div(position[1], position[0]), shares)
+                    position[0] -= shares
+                    position[1] -= cost_basis
+                    cash += proceeds
+                    writer.add(Trade, (trade_id, user_id, strain_ids[index], TradeType.SELL, shares, price, proceeds, at))
+                    writer.add(LedgerEntry, (next_id(LedgerEntry), user_id, proceeds, "trade_sell", f"trade:{trade_id}", at))
+                else:
+                    shares = user_rng.randint(1, 10)
+                    cost = mul(price, shares)
+                    if cost > cash:
+                        continue
+                    position = holdings.setdefault(index, [0, 0])
+                    position[0] += shares
+                    position[1] += cost
+                    cash -= cost
+                    writer.add(Trade, (trade_id, user_id, strain_ids[index], TradeType.BUY, shares, price, cost, at))
+                    writer.add(LedgerEntry, (next_id(LedgerEntry), user_id, -cost, "trade_buy", f"trade:{trade_id}", at))
+
+            for index, (shares, invested) in holdings.items():
+                if shares > 0:
+                    writer.add(Portfolio, (
+                        next_id(Portfolio), user_id, strain_ids[index], shares, div(invested, shares), invested, start, end
+                    ))
+
+            for _ in range(user_rng.randint(0, 2 * bets_per_user)):
+                stake = to_micros(user_rng.randint(1, 50))
+                if stake > cash:
+                    break
+                bet_id = next_id(FuturesBet)
+                placed = start + (end - start) * user_rng.random()
+                expires = placed + timedelta(days=user_rng.uniform(1, 14))
+                odds = round(user_rng.uniform(1.3, 5.0), 2)
+                payout = mul(stake, odds)
+                outcome = BetOutcome.PENDING
+                if expires <= end:
+                    outcome = BetOutcome.WON if user_rng.random() < 1 / odds else BetOutcome.LOST
+                cash -= stake
+                writer.add(FuturesBet, (
+                    bet_id, user_id, BetType.PRICE, strain_ids[user_rng.randrange(strains)],
+                    user_rng.choice(("up", "down")), stake, odds, payout, expires,
+                    outcome != BetOutcome.PENDING, outcome, placed
+                ))
+                writer.add(LedgerEntry, (next_id(LedgerEntry), user_id, -stake, "bet_stake", f"futures:{bet_id}", placed))
+                if outcome == BetOutcome.WON:
+                    cash += payout
+                    writer.add(LedgerEntry, (next_id(LedgerEntry), user_id, payout, "bet_payout", f"futures:{bet_id}", expires))
+
+    # Strains were written at their opening price; they trade at the walk's last one
+    with engine.begin() as connection:
+        connection.execute(
+            update(Strain.__table__).where(Strain.__table__.c.id == bindparam("strain_id")).values(
+                current_price=bindparam("price")
+            ),
+            [{"strain_id": strain_id, "price": price} for strain_id, price in closing_prices.items()]
+        )
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+    for table, count in writer.counts.items():
+        print(f"{table:20} {count:>12,}")
+    print(f"\n✓ Wrote {total:,} rows in {elapsed:.0f}s ({total / elapsed:,.0f} rows/s) "
+          f"via {'COPY' if writer.copy else 'executemany'}; users log in with {SCALE_PASSWORD!r}")
+
+    # Bulk writes skip the ORM events that invalidate cached strain listings
+    try:
+        strain_cache.generation.bump()
+    except Exception as e:
+        print(f"Could not invalidate the strain cache: {e}")
+
+
 if __name__ == "__main__":
-    print("Seeding database with initial data...\n")
-    create_sample_strains()
-    create_achievements()
-    print("\n✓ Database seeding complete!")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", action="store_true", help="generate a benchmark dataset instead of the sample data")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--strains", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90, help="days of price history")
+    parser.add_argument("--interval-minutes", type=int, default=15, help="minutes between price history points")
+    parser.add_argument("--trades-per-user", type=int, default=20, help="average trades per user")
+    parser.add_argument("--bets-per-user", type=int, default=3, help="average futures bets per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", type=datetime.fromisoformat,
+                        help="last price history timestamp (default: this hour); fix it to reproduce a dataset exactly")
+    args = parser.parse_args()
+
+    if args.scale:
+        end = args.end or datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        print(f"Seeding at scale: {args.users:,} users, {args.strains:,} strains, "
+              f"{args.strains * (args.days * 24 * 60 // args.interval_minutes):,} price history rows...\n")
+        seed_at_scale(
+            args.users, args.strains, args.days, args.interval_minutes,
+            args.trades_per_user, args.bets_per_user, args.seed, end
+        )
+        create_achievements()
+        print("\n✓ Database seeding complete!")
+    else:
+        print("Seeding database with initial data...\n")
+        create_sample_strains()
+        create_achievements()
+        print("\n✓ Database seeding complete!")
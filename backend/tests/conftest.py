@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+# The caller's database, used only by tests that need PostgreSQL itself
+CONFIGURED_DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+# Settings are read when app modules are first imported
+_db_dir = tempfile.mkdtemp(prefix="strainexchange-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.api.v1.endpoints.auth import get_current_user  # noqa: E402
+from app.core.principal import Principal  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def postgres_url():
+    """DATABASE_URL as given to pytest; skips unless it is a (migrated) PostgreSQL database."""
+    if not CONFIGURED_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("needs DATABASE_URL pointing at a PostgreSQL database migrated with alembic")
+    return CONFIGURED_DATABASE_URL
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="trader@example.com", username="trader", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(user):
+    app.dependency_overrides[get_current_user] = lambda: Principal.from_user(user)
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
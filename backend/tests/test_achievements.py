@@ -0,0 +1,43 @@
+from app.db.session import SessionLocal, engine
+from app.models.gamification import AchievementProgress
+from app.services.achievement_engine import AchievementEngine
+from sqlalchemy import event
+import threading
+
+
+def test_concurrent_first_events_share_one_progress_row(db, user):
+    # Hold both events after their progress lookup, so each sees no row
+    # yet and both go on to create it
+    looked_up = threading.Barrier(2, timeout=10)
+    waiting = threading.local()
+
+    def hold_after_lookup(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and "FROM achievement_progress" in statement and not getattr(waiting, "done", False):
+            waiting.done = True
+            looked_up.wait()
+
+    errors = []
+
+    def trade_event():
+        session = SessionLocal()
+        try:
+            AchievementEngine(session).on_trade_executed({"user_id": user.id, "trade_value": 5_000_000})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    event.listen(engine, "after_cursor_execute", hold_after_lookup)
+    try:
+        threads = [threading.Thread(target=trade_event) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+    finally:
+        event.remove(engine, "after_cursor_execute", hold_after_lookup)
+
+    assert errors == []
+    progress = db.query(AchievementProgress).filter(AchievementProgress.user_id == user.id).all()
+    assert len(progress) == 1
+    assert progress[0].trades_count == 2
@@ -0,0 +1,55 @@
+from app.models.bet import BetType, FuturesBet, HeadToHeadBet, PropBet
+from app.models.strain import Strain
+from datetime import datetime, timedelta
+
+
+def add_bets(db, user):
+    strains = [
+        Strain(name=name, slug=name.lower(), current_price=1_000_000, base_price=1_000_000)
+        for name in ("Alpha", "Beta")
+    ]
+    db.add_all(strains)
+    db.flush()
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    common = {"user_id": user.id, "stake": 1_000_000, "odds": 2.0, "potential_payout": 2_000_000,
+              "expires_at": expires_at}
+    # Interleaved across kinds and added in one go, so they share a timestamp down to the second
+    bets = []
+    for _ in range(3):
+        bets.append(FuturesBet(bet_type=BetType.PRICE, target_strain_id=strains[0].id, prediction="up", **common))
+        bets.append(HeadToHeadBet(strain_a_id=strains[0].id, strain_b_id=strains[1].id, metric="price",
+                                  prediction=str(strains[0].id), **common))
+        bets.append(PropBet(bet_description="Alpha tops the chart", bet_type="yes", **common))
+    db.add_all(bets)
+    db.commit()
+    return {(kind, bet.id) for kind, bet in zip(("futures", "head_to_head", "prop") * 3, bets)}
+
+
+def test_bet_history_cursor_walks_every_bet_once(client, db, user):
+    placed = add_bets(db, user)
+
+    seen = []
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/betting/bets/my-bets", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend((bet["kind"], bet["id"]) for bet in page["bets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(placed)
+    assert set(seen) == placed
+
+
+def test_bet_history_reports_futures_bet_type_values(client, db, user):
+    add_bets(db, user)
+
+    bets = client.get("/api/v1/betting/bets/my-bets").json()["bets"]
+
+    assert {bet["bet_type"] for bet in bets if bet["kind"] == "futures"} == {"price"}
+    assert {bet["bet_type"] for bet in bets if bet["kind"] == "prop"} == {"yes"}
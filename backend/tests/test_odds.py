@@ -0,0 +1,30 @@
+from app.core.money import to_micros
+from app.services.ledger import Ledger
+
+
+def test_odds_quotes_reject_outcomes_outside_the_market(client):
+    rejected = [
+        ("/api/v1/betting/bets/odds/futures",
+         {"bet_type": "price", "target_strain_id": 1, "prediction": "to the moon"}),
+        ("/api/v1/betting/bets/odds/head-to-head",
+         {"strain_a_id": 1, "strain_b_id": 2, "metric": "price", "prediction": "3"}),
+        ("/api/v1/betting/bets/odds/prop",
+         {"bet_type": "maybe", "bet_description": "Alpha tops the chart"}),
+    ]
+    for path, params in rejected:
+        assert client.get(path, params=params).status_code == 400
+
+
+def test_backing_one_prop_outcome_lengthens_the_other(client, db, user):
+    Ledger(db).credit(user.id, to_micros(1000), "signup")
+    db.commit()
+    quote = {"bet_description": "Alpha tops the chart"}
+
+    placed = client.post("/api/v1/betting/bets/prop", json={
+        **quote, "bet_type": "yes", "stake": 100, "expires_at": "2099-01-01T00:00:00"
+    })
+    assert placed.status_code == 200
+
+    yes = client.get("/api/v1/betting/bets/odds/prop", params={**quote, "bet_type": "yes"}).json()["odds"]
+    no = client.get("/api/v1/betting/bets/odds/prop", params={**quote, "bet_type": "No"}).json()["odds"]
+    assert yes < placed.json()["odds"] < no
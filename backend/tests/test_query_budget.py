@@ -0,0 +1,47 @@
+from app.core.query_budget import assert_max_queries, statement_shape
+from app.models.strain import Strain
+from sqlalchemy import select, text
+import pytest
+
+
+def add_strains(db, count):
+    db.add_all([
+        Strain(name=f"Strain {i}", slug=f"strain-{i}", current_price=1_000_000, base_price=1_000_000)
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def test_assert_max_queries_fails_over_budget(db):
+    with pytest.raises(AssertionError, match="3 SQL statements, budget is 2"):
+        with assert_max_queries(2):
+            for _ in range(3):
+                db.execute(text("SELECT 1"))
+
+
+def test_assert_max_queries_flags_repeated_statement_shapes(db):
+    add_strains(db, 3)
+    ids = db.scalars(select(Strain.id)).all()
+    db.expire_all()
+
+    with pytest.raises(AssertionError, match="possible N\\+1, 3x") as failure:
+        with assert_max_queries(10, repeat_threshold=3):
+            for strain_id in ids:
+                db.execute(select(Strain).where(Strain.id == strain_id)).scalar_one()
+
+    assert "FROM strains" in str(failure.value)
+
+
+def test_statement_shape_collapses_literals_and_in_lists():
+    assert statement_shape("SELECT * FROM t WHERE a = 'x' AND b IN (%(b_1)s, %(b_2)s) LIMIT 5") == \
+        statement_shape("SELECT *  FROM t WHERE a = 'y' AND b IN (%(b_1)s) LIMIT 10")
+
+
+def test_strain_listing_stays_within_its_budget(client, db):
+    add_strains(db, 30)
+
+    with assert_max_queries(3):
+        response = client.get("/api/v1/trading/strains", params={"limit": 100})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 30
@@ -0,0 +1,103 @@
+"""
+Query plan regression check for the hot queries.
+
+Runs EXPLAIN for each hot query against the PostgreSQL database in
+DATABASE_URL (skipped for any other database) and fails if it would read
+its main table with a sequential scan. Sequential scans are disabled for
+the check (SET LOCAL enable_seqscan = off), so on small local data the
+planner still picks an index whenever a usable one exists; a Seq Scan in
+the plan means the index this query depends on is missing or no longer
+matches.
+
+    alembic upgrade head
+    DATABASE_URL=postgresql://... pytest tests/test_query_plans.py
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, desc, select
+from app.models.bet import BET_MODELS
+from app.models.gamification import Leaderboard
+from app.models.strain import PriceHistory
+from app.models.trade import Trade
+from app.models.user import User
+import json
+import pytest
+
+
+def hot_queries():
+    """(name, statement, tables that must not be sequentially scanned)"""
+    now = datetime.utcnow()
+    queries = [
+        ("strain 24h reference price", select(PriceHistory).filter(
+            PriceHistory.strain_id == 1,
+            PriceHistory.timestamp >= now - timedelta(hours=24)
+        ).order_by(PriceHistory.timestamp).limit(1), {"price_history"}),
+        ("strain 90d price history", select(PriceHistory).filter(
+            PriceHistory.strain_id == 1,
+            PriceHistory.timestamp >= now - timedelta(days=90)
+        ).order_by(PriceHistory.timestamp), {"price_history"}),
+        ("trade history", select(Trade).filter(
+            Trade.user_id == 1
+        ).order_by(desc(Trade.timestamp), desc(Trade.id)).limit(51), {"trades"}),
+        ("trade export", select(Trade.id, Trade.timestamp).filter(
+            Trade.user_id == 1
+        ).order_by(Trade.timestamp, Trade.id), {"trades"}),
+    ]
+
+    for column in ("weekly_profit", "all_time_profit", "prediction_accuracy"):
+        period = "weekly" if column == "weekly_profit" else "all_time"
+        queries.append((f"leaderboard by {column}", select(Leaderboard, User).join(
+            User, Leaderboard.user_id == User.id
+        ).filter(
+            Leaderboard.period == period
+        ).order_by(desc(getattr(Leaderboard, column))).limit(100), {"leaderboards", "users"}))
+
+    for kind, model in BET_MODELS.items():
+        table = model.__tablename__
+        queries.append((f"{kind} bet history", select(model).filter(
+            model.user_id == 1
+        ).order_by(desc(model.created_at), desc(model.id)).limit(51), {table}))
+        queries.append((f"{kind} expired open bets", select(model).filter(
+            model.expires_at <= now,
+            model.settled == False
+        ), {table}))
+        queries.append((f"{kind} open bets rebuild", select(model.id, model.expires_at).filter(
+            model.settled == False
+        ), {table}))
+
+    return queries
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect)
+    row = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def postgres_engine(postgres_url):
+    engine = create_engine(postgres_url)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("name, statement, guarded", hot_queries(), ids=[query[0] for query in hot_queries()])
+def test_hot_query_uses_an_index(postgres_engine, name, statement, guarded):
+    with postgres_engine.connect() as connection:
+        with connection.begin():
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            plan = explain(connection, statement)
+
+    scans = [
+        node["Relation Name"] for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in guarded
+    ]
+    assert not scans, f"{name} sequentially scans {', '.join(scans)}:\n{json.dumps(plan, indent=2)}"
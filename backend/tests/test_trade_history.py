@@ -0,0 +1,53 @@
+from app.models.strain import Strain
+from app.models.trade import Trade, TradeType
+import json
+
+
+def add_trades(db, user, count):
+    strain = Strain(name="Blue Dream", slug="blue-dream", current_price=1_000_000, base_price=1_000_000)
+    db.add(strain)
+    db.flush()
+    # Added in one go, so most share a timestamp down to the second
+    db.add_all([
+        Trade(user_id=user.id, strain_id=strain.id, type=TradeType.BUY, shares=1.0,
+              price=1_000_000, total_cost=1_000_000)
+        for _ in range(count)
+    ])
+    db.commit()
+
+
+def test_trade_history_cursor_walks_every_trade_once(client, db, user):
+    add_trades(db, user, 7)
+
+    seen = []
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/trading/trades/history", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(trade["id"] for trade in page["trades"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_trade_history_rejects_malformed_cursor(client, user):
+    response = client.get("/api/v1/trading/trades/history", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_trade_export_streams_every_trade_oldest_first(client, db, user):
+    add_trades(db, user, 5)
+
+    response = client.get("/api/v1/trading/trades/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    trades = [json.loads(line) for line in response.text.splitlines()]
+    assert [trade["id"] for trade in trades] == [1, 2, 3, 4, 5]
+    assert trades[0]["price"] == 1.0
@@ -1,9 +1,16 @@
 import { useQuery } from '@tanstack/react-query';
 import { bettingApi } from '@/services/api';
 import { Dice5 } from 'lucide-react';
+import { BetHistoryEntry, BetHistoryPage } from '@/types';
+
+const BET_KIND_LABELS: Record<BetHistoryEntry['kind'], string> = {
+  futures: 'Futures',
+  head_to_head: 'Head-to-Head',
+  prop: 'Prop',
+};
 
 export default function BettingPage() {
-  const { data: myBets } = useQuery({
+  const { data: myBets } = useQuery<BetHistoryPage>({
     queryKey: ['my-bets'],
     queryFn: async () => {
       const response = await bettingApi.getMyBets();
@@ -48,44 +55,37 @@ export default function BettingPage() {
       </div>
 
       {/* My Bets */}
-      {myBets && (myBets.futures_bets?.length > 0 || myBets.head_to_head_bets?.length > 0 || myBets.prop_bets?.length > 0) && (
+      {myBets && myBets.bets?.length > 0 && (
         <div className="card">
-          <h2 className="text-xl font-bold text-white mb-4">My Active Bets</h2>
-          
-          {/* Futures Bets */}
-          {myBets.futures_bets?.length > 0 && (
-            <div className="mb-6">
-              <h3 className="text-lg font-semibold text-white mb-3">Futures Bets</h3>
-              <div className="space-y-2">
-                {myBets.futures_bets.map((bet: any) => (
-                  <div key={bet.id} className="bg-dark-700 p-4 rounded-lg">
-                    <div className="flex justify-between items-start">
-                      <div>
-                        <p className="text-white font-medium">{bet.prediction}</p>
-                        <p className="text-sm text-gray-400">
-                          Stake: {bet.stake} WC | Odds: {bet.odds}x
-                        </p>
-                      </div>
-                      <span
-                        className={`px-3 py-1 rounded-full text-xs font-bold ${
-                          bet.outcome === 'pending'
-                            ? 'bg-yellow-500/20 text-yellow-500'
-                            : bet.outcome === 'won'
-                            ? 'bg-green-500/20 text-green-500'
-                            : 'bg-red-500/20 text-red-500'
-                        }`}
-                      >
-                        {bet.outcome.toUpperCase()}
-                      </span>
-                    </div>
-                    <p className="text-sm text-gray-400 mt-2">
-                      Expires: {new Date(bet.expires_at).toLocaleString()}
+          <h2 className="text-xl font-bold text-white mb-4">My Bets</h2>
+          <div className="space-y-2">
+            {myBets.bets.map((bet: BetHistoryEntry) => (
+              <div key={`${bet.kind}-${bet.id}`} className="bg-dark-700 p-4 rounded-lg">
+                <div className="flex justify-between items-start">
+                  <div>
+                    <p className="text-white font-medium">{bet.prediction ?? bet.bet_description}</p>
+                    <p className="text-sm text-gray-400">
+                      {BET_KIND_LABELS[bet.kind]} | Stake: {bet.stake} WC | Odds: {bet.odds}x
                     </p>
                   </div>
-                ))}
+                  <span
+                    className={`px-3 py-1 rounded-full text-xs font-bold ${
+                      bet.outcome === 'pending'
+                        ? 'bg-yellow-500/20 text-yellow-500'
+                        : bet.outcome === 'won'
+                        ? 'bg-green-500/20 text-green-500'
+                        : 'bg-red-500/20 text-red-500'
+                    }`}
+                  >
+                    {bet.outcome.toUpperCase()}
+                  </span>
+                </div>
+                <p className="text-sm text-gray-400 mt-2">
+                  Expires: {new Date(bet.expires_at).toLocaleString()}
+                </p>
               </div>
-            </div>
-          )}
+            ))}
+          </div>
         </div>
       )}
     </div>
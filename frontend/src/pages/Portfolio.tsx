@@ -1,5 +1,6 @@
 import { useQuery } from '@tanstack/react-query';
 import { portfolioApi, tradingApi } from '@/services/api';
+import { TradeHistoryPage } from '@/types';
 import { Link } from 'react-router-dom';
 import { TrendingUp, TrendingDown, Briefcase } from 'lucide-react';
 
@@ -20,10 +21,10 @@ export default function Portfolio() {
     },
   });
 
-  const { data: tradeHistory } = useQuery({
+  const { data: tradeHistory } = useQuery<TradeHistoryPage>({
     queryKey: ['trade-history'],
     queryFn: async () => {
-      const response = await tradingApi.getTradeHistory();
+      const response = await tradingApi.getTradeHistory(undefined, 10);
       return response.data;
     },
   });
@@ -185,7 +186,7 @@ export default function Portfolio() {
       {/* Trade History */}
       <div className="card">
         <h2 className="text-xl font-bold text-white mb-4">Recent Trades</h2>
-        {tradeHistory && tradeHistory.length > 0 ? (
+        {tradeHistory && tradeHistory.trades.length > 0 ? (
           <div className="overflow-x-auto">
             <table className="w-full">
               <thead>
@@ -198,7 +199,7 @@ export default function Portfolio() {
                 </tr>
               </thead>
               <tbody>
-                {tradeHistory.slice(0, 10).map((trade: any) => (
+                {tradeHistory.trades.map((trade) => (
                   <tr key={trade.id} className="border-b border-dark-700">
                     <td className="py-3 px-4 text-gray-400">
                       {new Date(trade.timestamp).toLocaleString()}
@@ -55,8 +55,8 @@ export const tradingApi = {
   sellShares: (strain_id: number, shares: number) =>
     api.post('/trading/trades/sell', { strain_id, shares }),
   
-  getTradeHistory: (skip = 0, limit = 50) =>
-    api.get('/trading/trades/history', { params: { skip, limit } }),
+  getTradeHistory: (cursor?: string, limit = 50) =>
+    api.get('/trading/trades/history', { params: { cursor, limit } }),
 };
 
 // Portfolio endpoints
@@ -68,6 +68,15 @@ export const portfolioApi = {
 
 // Betting endpoints
 export const bettingApi = {
+  getFuturesOdds: (bet_type: string, target_strain_id: number, prediction: string) =>
+    api.get('/betting/bets/odds/futures', { params: { bet_type, target_strain_id, prediction } }),
+  
+  getHeadToHeadOdds: (strain_a_id: number, strain_b_id: number, metric: string, prediction: string) =>
+    api.get('/betting/bets/odds/head-to-head', { params: { strain_a_id, strain_b_id, metric, prediction } }),
+  
+  getPropOdds: (bet_type: string, bet_description: string) =>
+    api.get('/betting/bets/odds/prop', { params: { bet_type, bet_description } }),
+  
   placeFuturesBet: (data: any) =>
     api.post('/betting/bets/futures', data),
   
@@ -77,8 +86,8 @@ export const bettingApi = {
   placePropBet: (data: any) =>
     api.post('/betting/bets/prop', data),
   
-  getMyBets: (skip = 0, limit = 50) =>
-    api.get('/betting/bets/my-bets', { params: { skip, limit } }),
+  getMyBets: (cursor?: string, limit = 50) =>
+    api.get('/betting/bets/my-bets', { params: { cursor, limit } }),
 };
 
 // Leaderboard endpoints
@@ -38,6 +38,11 @@ export interface Trade {
   timestamp: string;
 }
 
+export interface TradeHistoryPage {
+  trades: Trade[];
+  next_cursor: string | null;
+}
+
 export interface Portfolio {
   weedcoins_balance: number;
   holdings_value: number;
@@ -88,7 +93,26 @@ export interface HeadToHeadBet {
 export interface PropBet {
   id: number;
   bet_description: string;
-  bet_type: string;
+  bet_type: 'yes' | 'no';
+  stake: number;
+  odds: number;
+  potential_payout: number;
+  expires_at: string;
+  settled: boolean;
+  outcome: 'pending' | 'won' | 'lost';
+  created_at: string;
+}
+
+export interface BetHistoryEntry {
+  id: number;
+  kind: 'futures' | 'head_to_head' | 'prop';
+  bet_type?: string;
+  target_strain_id?: number;
+  strain_a_id?: number;
+  strain_b_id?: number;
+  metric?: string;
+  prediction?: string;
+  bet_description?: string;
   stake: number;
   odds: number;
   potential_payout: number;
@@ -98,6 +122,11 @@ export interface PropBet {
   created_at: string;
 }
 
+export interface BetHistoryPage {
+  bets: BetHistoryEntry[];
+  next_cursor: string | null;
+}
+
 export interface LeaderboardEntry {
   rank: number;
   user_id: number;